@@ -8,5 +8,8 @@ pip install -r requirements.txt
 # Convert static asset files
 python manage.py collectstatic --no-input
 
+# Encode resized WebP/AVIF variants of the collected images
+python manage.py optimize_images
+
 # Apply any outstanding database migrations
 python manage.py migrate
@@ -1,11 +1,29 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.admin.widgets import (
+    AutocompleteSelect,
+    AutocompleteSelectMultiple,
+)
 from django.contrib.auth.admin import UserAdmin
+from django.db import router
+from django.db.models import F, Prefetch
+from django.db.models.functions import Round
+
+from kitchen import analytics, search, versioning
+from kitchen.assignments import reassign
 from kitchen.models import Cook, Dish, DishType, Ingredient
+from kitchen.pagination import EstimatedCountPaginator
 
 
 @admin.register(Cook)
 class CookAdmin(UserAdmin):
-    list_display = UserAdmin.list_display + ("years_of_experience",)
+    list_display = UserAdmin.list_display + (
+        "years_of_experience",
+        "dish_count",
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     fieldsets = UserAdmin.fieldsets + (
         ("Additional info", {"fields": ("years_of_experience",)}),
     )
@@ -24,6 +42,32 @@ class CookAdmin(UserAdmin):
     )
 
 
+class DishActionForm(ActionForm):
+    """Inputs for the bulk dish actions, shown next to the action menu."""
+
+    dish_type = forms.ModelChoiceField(
+        DishType.objects.all(),
+        required=False,
+        widget=AutocompleteSelect(
+            Dish._meta.get_field("dish_type"), admin.site
+        ),
+    )
+    price_change = forms.DecimalField(
+        required=False,
+        max_digits=5,
+        decimal_places=2,
+        min_value=-99,
+        label="Price change %",
+    )
+    cooks = forms.ModelMultipleChoiceField(
+        Cook.objects.all(),
+        required=False,
+        widget=AutocompleteSelectMultiple(
+            Dish._meta.get_field("cooks"), admin.site
+        ),
+    )
+
+
 @admin.register(Dish)
 class DishAdmin(admin.ModelAdmin):
     search_fields = ("name",)
@@ -32,14 +76,98 @@ class DishAdmin(admin.ModelAdmin):
         "price",
         "dish_type",
         "display_cooks",
+        "cook_count",
+        "ingredient_count",
     )
-    filter_horizontal = ("cooks", "ingredients")
+    list_select_related = ("dish_type",)
+    autocomplete_fields = ("dish_type", "cooks", "ingredients")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = DishActionForm
+    actions = ("retype_dishes", "reprice_dishes", "reassign_dishes")
+
+    def get_queryset(self, request):
+        return (
+            super()
+            .get_queryset(request)
+            .prefetch_related(
+                Prefetch("cooks", queryset=Cook.objects.only("username"))
+            )
+        )
 
     def display_cooks(self, obj):
         return ", ".join([cook.username for cook in obj.cooks.all()])
 
     display_cooks.short_description = "Cooks"
 
+    def _action_input(self, request, name):
+        form = self.action_form(request.POST)
+        form.is_valid()
+        if not request.POST.getlist(name) or name not in form.cleaned_data:
+            label = form.fields[name].label or name.replace("_", " ")
+            self.message_user(
+                request,
+                f"Enter a valid '{label}' before running this action.",
+                messages.WARNING,
+            )
+            return None
+        return form.cleaned_data[name]
+
+    def _dish_type_ids(self, queryset):
+        return set(
+            queryset.order_by().values_list("dish_type_id", flat=True)
+        )
+
+    def _dishes_changed(self, dish_ids, dish_type_ids):
+        # QuerySet.update() sends no post_save, so do what its receivers
+        # would have done.
+        using = router.db_for_write(Dish)
+        search.index_dishes(dish_ids, using=using)
+        analytics.rebuild_menu_analytics(using, dish_type_ids=dish_type_ids)
+        versioning.bump_version(versioning.version_label(Dish))
+
+    @admin.action(description="Change dish type of selected dishes")
+    def retype_dishes(self, request, queryset):
+        dish_type = self._action_input(request, "dish_type")
+        if dish_type is None:
+            return
+        dish_ids = list(queryset.values_list("pk", flat=True))
+        dish_type_ids = {dish_type.pk, *self._dish_type_ids(queryset)}
+        updated = queryset.update(dish_type=dish_type)
+        self._dishes_changed(dish_ids, dish_type_ids)
+        self.message_user(
+            request, f"Moved {updated} dishes to '{dish_type}'."
+        )
+
+    @admin.action(description="Change price of selected dishes by percent")
+    def reprice_dishes(self, request, queryset):
+        change = self._action_input(request, "price_change")
+        if change is None:
+            return
+        dish_type_ids = self._dish_type_ids(queryset)
+        updated = queryset.update(
+            price=Round(F("price") * (1 + change / 100), 2)
+        )
+        analytics.rebuild_menu_analytics(
+            router.db_for_write(Dish), dish_type_ids=dish_type_ids
+        )
+        versioning.bump_version(versioning.version_label(Dish))
+        self.message_user(request, f"Repriced {updated} dishes by {change}%.")
+
+    @admin.action(description="Replace cooks of selected dishes")
+    def reassign_dishes(self, request, queryset):
+        cooks = self._action_input(request, "cooks")
+        if cooks is None:
+            return
+        added, removed = reassign(
+            cooks.values_list("pk", flat=True),
+            queryset.values_list("pk", flat=True),
+            using=router.db_for_write(Dish),
+        )
+        self.message_user(
+            request, f"Added {added} and removed {removed} cook assignments."
+        )
+
 
 @admin.register(DishType)
 class DishTypeAdmin(admin.ModelAdmin):
@@ -0,0 +1,258 @@
+"""
+Price analytics per dish type, read in constant time.
+
+``DishTypeStats`` keeps the dish count, price total, minimum and maximum of
+each dish type, and ``DishTypePriceBucket`` a histogram of its prices over
+``PRICE_BUCKETS``. The receivers in ``kitchen.signals`` adjust both in
+place as dishes are created, repriced, retyped and deleted; code that
+bypasses the signals (``QuerySet.update()``, ``bulk_create()``) calls
+``rebuild_menu_analytics()`` for the dish types it touched. Quantiles are
+interpolated from the histogram, so their error is bounded by the bucket
+width rather than exact.
+"""
+from bisect import bisect_left
+from decimal import Decimal
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import (
+    Case,
+    Count,
+    DecimalField,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from kitchen.models import Dish, DishTypePriceBucket, DishTypeStats
+
+# Upper bounds of the price buckets; the last bucket takes everything
+# above the last bound.
+PRICE_BUCKETS = tuple(
+    Decimal(bound)
+    for bound in (
+        1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 12, 14, 16, 18, 20, 25, 30, 35, 40,
+        50, 60, 80, 100, 150, 200, 300, 500, 1000,
+    )
+)
+QUANTILES = {"p25": 0.25, "p50": 0.5, "p75": 0.75, "p90": 0.9}
+CENT = Decimal("0.01")
+
+
+def bucket_for(price):
+    return bisect_left(PRICE_BUCKETS, price)
+
+
+def _price(value):
+    return Value(
+        value, output_field=DecimalField(max_digits=7, decimal_places=2)
+    )
+
+
+def _bucket_bounds(bucket):
+    lower = PRICE_BUCKETS[bucket - 1] if bucket else None
+    upper = PRICE_BUCKETS[bucket] if bucket < len(PRICE_BUCKETS) else None
+    return lower, upper
+
+
+def _adjust_bucket(dish_type_id, bucket, delta, using):
+    buckets = DishTypePriceBucket.objects.using(using)
+    updated = buckets.filter(dish_type_id=dish_type_id, bucket=bucket).update(
+        dish_count=F("dish_count") + delta
+    )
+    if not updated and delta > 0:
+        # Seed a missing bucket from a real count, which already includes
+        # the dish being added.
+        lower, upper = _bucket_bounds(bucket)
+        dishes = Dish.objects.using(using).filter(dish_type_id=dish_type_id)
+        if lower is not None:
+            dishes = dishes.filter(price__gt=lower)
+        if upper is not None:
+            dishes = dishes.filter(price__lte=upper)
+        buckets.get_or_create(
+            dish_type_id=dish_type_id,
+            bucket=bucket,
+            defaults={"dish_count": dishes.count()},
+        )
+
+
+def add_dish(dish_type_id, price, using=DEFAULT_DB_ALIAS):
+    """Count a dish that now has ``dish_type_id`` and ``price``."""
+    price = Decimal(str(price))
+    updated = (
+        DishTypeStats.objects.using(using)
+        .filter(dish_type_id=dish_type_id)
+        .update(
+            dish_count=F("dish_count") + 1,
+            price_total=F("price_total") + _price(price),
+            price_min=Least(
+                Coalesce(F("price_min"), _price(price)), _price(price)
+            ),
+            price_max=Greatest(
+                Coalesce(F("price_max"), _price(price)), _price(price)
+            ),
+        )
+    )
+    if updated:
+        _adjust_bucket(dish_type_id, bucket_for(price), 1, using)
+    else:
+        rebuild_menu_analytics(using, dish_type_ids=[dish_type_id])
+
+
+def remove_dish(dish_type_id, price, using=DEFAULT_DB_ALIAS):
+    """Stop counting a dish that had ``dish_type_id`` and ``price``."""
+    price = Decimal(str(price))
+    stats = DishTypeStats.objects.using(using).filter(
+        dish_type_id=dish_type_id
+    )
+    if not stats.update(
+        dish_count=F("dish_count") - 1,
+        price_total=F("price_total") - _price(price),
+    ):
+        return  # the dish type is gone along with its stats
+    _adjust_bucket(dish_type_id, bucket_for(price), -1, using)
+    # Only losing an extreme needs a look at the dishes, and the
+    # (dish_type, price) index answers that without a scan.
+    dishes = Dish.objects.using(using).filter(dish_type_id=OuterRef("pk"))
+    stats.filter(Q(price_min__gte=price) | Q(price_max__lte=price)).update(
+        price_min=Subquery(
+            dishes.order_by("price").values("price")[:1]
+        ),
+        price_max=Subquery(
+            dishes.order_by("-price").values("price")[:1]
+        ),
+    )
+
+
+def move_dish(before, after, using=DEFAULT_DB_ALIAS):
+    """Recount a dish whose ``(dish_type_id, price)`` changed."""
+    if before[0] == after[0] and Decimal(str(before[1])) == Decimal(
+        str(after[1])
+    ):
+        return
+    remove_dish(*before, using=using)
+    add_dish(*after, using=using)
+
+
+def rebuild_menu_analytics(using=DEFAULT_DB_ALIAS, dish_type_ids=None):
+    """
+    Recompute the analytics of ``dish_type_ids``, or of every dish type,
+    from the dishes in two grouped queries. Return the dish types
+    summarized.
+    """
+    dishes = Dish.objects.using(using).order_by()
+    stats = DishTypeStats.objects.using(using)
+    buckets = DishTypePriceBucket.objects.using(using)
+    if dish_type_ids is not None:
+        dish_type_ids = set(dish_type_ids)
+        dishes = dishes.filter(dish_type_id__in=dish_type_ids)
+        stats = stats.filter(dish_type_id__in=dish_type_ids)
+        buckets = buckets.filter(dish_type_id__in=dish_type_ids)
+    summaries = dishes.values("dish_type_id").annotate(
+        count=Count("pk"),
+        total=Sum("price"),
+        low=Min("price"),
+        high=Max("price"),
+    )
+    histogram = (
+        dishes.annotate(
+            bucket=Case(
+                *(
+                    When(price__lte=bound, then=Value(index))
+                    for index, bound in enumerate(PRICE_BUCKETS)
+                ),
+                default=Value(len(PRICE_BUCKETS)),
+            )
+        )
+        .values("dish_type_id", "bucket")
+        .annotate(count=Count("pk"))
+    )
+    with transaction.atomic(using=using):
+        stats.delete()
+        buckets.delete()
+        created = DishTypeStats.objects.using(using).bulk_create(
+            DishTypeStats(
+                dish_type_id=row["dish_type_id"],
+                dish_count=row["count"],
+                price_total=row["total"],
+                price_min=row["low"],
+                price_max=row["high"],
+            )
+            for row in summaries
+        )
+        DishTypePriceBucket.objects.using(using).bulk_create(
+            DishTypePriceBucket(
+                dish_type_id=row["dish_type_id"],
+                bucket=row["bucket"],
+                dish_count=row["count"],
+            )
+            for row in histogram
+        )
+    return len(created)
+
+
+def _quantile(counts, total, low, high, q):
+    rank = q * total
+    seen = 0
+    for bucket, count in enumerate(counts):
+        if count and seen + count >= rank:
+            lower, upper = _bucket_bounds(bucket)
+            lower = low if lower is None else max(lower, low)
+            upper = high if upper is None else min(upper, high)
+            share = Decimal(str((rank - seen) / count))
+            return (lower + (upper - lower) * share).quantize(CENT)
+        seen += count
+    return high
+
+
+def menu_analytics(using=None, limit=None):
+    """
+    Per dish type, most dishes first: dish count, average, minimum and
+    maximum price and estimated price quantiles. Reads the summary
+    tables only, so the cost does not grow with the menu.
+    """
+    stats = DishTypeStats.objects.select_related("dish_type").filter(
+        dish_count__gt=0
+    )
+    if using is not None:
+        stats = stats.using(using)
+    stats = list(stats.order_by("-dish_count", "dish_type__name")[:limit])
+    counts = {
+        row.dish_type_id: [0] * (len(PRICE_BUCKETS) + 1) for row in stats
+    }
+    buckets = DishTypePriceBucket.objects.filter(
+        dish_type_id__in=counts, dish_count__gt=0
+    )
+    if using is not None:
+        buckets = buckets.using(using)
+    for dish_type_id, bucket, count in buckets.values_list(
+        "dish_type_id", "bucket", "dish_count"
+    ):
+        counts[dish_type_id][bucket] = count
+    return [
+        {
+            "dish_type_id": row.dish_type_id,
+            "dish_type": row.dish_type.name,
+            "dishes": row.dish_count,
+            "price_avg": (row.price_total / row.dish_count).quantize(CENT),
+            "price_min": row.price_min,
+            "price_max": row.price_max,
+            "price_quantiles": {
+                name: _quantile(
+                    counts[row.dish_type_id],
+                    row.dish_count,
+                    row.price_min,
+                    row.price_max,
+                    q,
+                )
+                for name, q in QUANTILES.items()
+            },
+        }
+        for row in stats
+    ]
@@ -0,0 +1,133 @@
+import hashlib
+from collections import defaultdict
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, JsonResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    quote_etag,
+)
+from django.views import generic
+
+from kitchen.analytics import menu_analytics
+from kitchen.models import Cook, Dish, DishType, Ingredient
+from kitchen.pagination import InvalidCursor, KeysetPaginator
+from kitchen.versioning import get_versions
+
+
+class MenuApiView(LoginRequiredMixin, generic.View):
+    """
+    Read-only, keyset-paginated JSON listing of one model.
+
+    The strong ETag is derived from the version stamps of every model the
+    payload depends on, so a poll with a matching If-None-Match is
+    answered with 304 before any row is read.
+    """
+
+    model = None
+    fields = ()
+    version_labels = ()
+    default_limit = 100
+    max_limit = 500
+
+    def get_etag(self, request):
+        parts = [*get_versions(self.version_labels), request.get_full_path()]
+        digest = hashlib.md5(
+            ":".join(str(part) for part in parts).encode(),
+            usedforsecurity=False,
+        ).hexdigest()
+        return quote_etag(digest)
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.GET.get("limit", self.default_limit))
+        except ValueError:
+            raise Http404("Invalid limit.")
+        return max(1, min(limit, self.max_limit))
+
+    def get_queryset(self):
+        return self.model.objects.values(*self.fields)
+
+    def serialize(self, rows):
+        return rows
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            paginator = KeysetPaginator(
+                self.get_queryset(), self.get_limit(request), ("id",)
+            )
+            try:
+                page = paginator.page(request.GET.get("cursor"))
+            except InvalidCursor:
+                raise Http404("Invalid cursor.")
+            response = JsonResponse(
+                {
+                    "results": self.serialize(list(page)),
+                    "next": page.next_cursor,
+                },
+                json_dumps_params={"separators": (",", ":")},
+            )
+        response["ETag"] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+def _related_ids(through, source, target, ids):
+    related = defaultdict(list)
+    pairs = through.objects.filter(**{f"{source}__in": ids}).values_list(
+        source, target
+    )
+    for source_id, target_id in pairs.order_by(target):
+        related[source_id].append(target_id)
+    return related
+
+
+class DishApiView(MenuApiView):
+    model = Dish
+    fields = ("id", "name", "description", "price", "dish_type_id")
+    version_labels = ("dish", "dishtype", "ingredient", "cook")
+
+    def serialize(self, rows):
+        ids = [row["id"] for row in rows]
+        ingredients = _related_ids(
+            Dish.ingredients.through, "dish_id", "ingredient_id", ids
+        )
+        cooks = _related_ids(Dish.cooks.through, "dish_id", "cook_id", ids)
+        for row in rows:
+            row["ingredient_ids"] = ingredients[row["id"]]
+            row["cook_ids"] = cooks[row["id"]]
+        return rows
+
+
+class DishTypeApiView(MenuApiView):
+    model = DishType
+    fields = ("id", "name")
+    version_labels = ("dishtype",)
+
+
+class IngredientApiView(MenuApiView):
+    model = Ingredient
+    fields = ("id", "name")
+    version_labels = ("ingredient",)
+
+
+class CookApiView(MenuApiView):
+    model = Cook
+    fields = (
+        "id",
+        "username",
+        "first_name",
+        "last_name",
+        "years_of_experience",
+    )
+    version_labels = ("cook",)
+
+
+class MenuAnalyticsApiView(LoginRequiredMixin, generic.View):
+    """Price analytics of every dish type, from the summary tables."""
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse({"results": menu_analytics()})
@@ -0,0 +1,114 @@
+"""
+The static files the templates actually reference.
+
+Templates point at files under ``static/assets`` through the ``asset``,
+``background_image`` and ``image_srcset`` tags (and at anything else through
+``static``), so the set of files a page can request is known up front.
+``ReferencedAssetsFinder`` hands collectstatic only those files plus what
+the collected stylesheets pull in themselves, and the ``kitchen.E001``
+check fails when a template names a file that does not exist.
+"""
+import posixpath
+import re
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.finders import FileSystemFinder
+from django.template.utils import get_app_template_dirs
+from django.templatetags.static import static
+
+ASSETS_DIR = "assets"
+TEMPLATE_REFERENCE = re.compile(
+    r"""{%\s*(asset|background_image|image_srcset|static)\s+"""
+    r"""["']([^"']+)["']"""
+)
+# References ManifestStaticFilesStorage rewrites to hashed names, and so
+# must be able to find once collected.
+STYLESHEET_REFERENCE = re.compile(
+    r"""url\(\s*["']?([^"')\s]+)|@import\s+["']([^"']+)["']"""
+    r"""|sourceMappingURL=([^\s*]+)"""
+)
+SCRIPT_REFERENCE = re.compile(r"^//# sourceMappingURL=(\S+)", re.MULTILINE)
+EXTERNAL_PREFIXES = ("data:", "#", "/", "http:", "https:")
+# Names ending in a 12 character content hash never change contents.
+HASHED_NAME = re.compile(r"\.[0-9a-f]{12}\.\w+$")
+
+
+def asset_path(name):
+    return f"{ASSETS_DIR}/{name}"
+
+
+def asset_url(name):
+    """URL of ``name`` under ``static/assets``, hashed once collected."""
+    return static(asset_path(name))
+
+
+def template_dirs():
+    dirs = []
+    for engine in settings.TEMPLATES:
+        dirs.extend(Path(path) for path in engine.get("DIRS", ()))
+    dirs.extend(Path(path) for path in get_app_template_dirs("templates"))
+    return dirs
+
+
+def template_references():
+    """Yield ``(template, static path)`` for every literal asset tag."""
+    for directory in template_dirs():
+        for path in sorted(directory.rglob("*.html")):
+            template = path.relative_to(directory).as_posix()
+            for tag, name in TEMPLATE_REFERENCE.findall(path.read_text()):
+                yield template, name if tag == "static" else asset_path(name)
+
+
+def _file_references(name, path):
+    if name.endswith(".css"):
+        pattern = STYLESHEET_REFERENCE
+    elif name.endswith(".js"):
+        pattern = SCRIPT_REFERENCE
+    else:
+        return
+    for match in pattern.finditer(Path(path).read_text(errors="replace")):
+        target = next(group for group in match.groups() if group)
+        if target.startswith(EXTERNAL_PREFIXES):
+            continue
+        target = target.split("?")[0].split("#")[0]
+        yield posixpath.normpath(
+            posixpath.join(posixpath.dirname(name), target)
+        )
+
+
+def referenced_files(find):
+    """
+    Return the static paths the templates reference, plus every file the
+    referenced stylesheets and scripts reference in turn. ``find`` maps a
+    static path to a file on disk, or to a falsy value.
+    """
+    pending = [name for _, name in template_references()]
+    seen = set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        path = find(name)
+        if path:
+            pending.extend(_file_references(name, path))
+    return seen
+
+
+class ReferencedAssetsFinder(FileSystemFinder):
+    """
+    ``FileSystemFinder`` that lists only the referenced files of
+    ``STATICFILES_DIRS`` for collectstatic, leaving SCSS sources, build
+    scripts and unused images behind. Lookups by name still see every
+    file, so the development server serves the whole tree.
+    """
+
+    def list(self, ignore_patterns):
+        referenced = referenced_files(self.find)
+        for path, storage in super().list(ignore_patterns):
+            name = Path(path).as_posix()
+            if getattr(storage, "prefix", None):
+                name = f"{storage.prefix}/{name}"
+            if name in referenced:
+                yield path, storage
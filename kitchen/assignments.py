@@ -0,0 +1,295 @@
+import heapq
+from collections import defaultdict
+
+from django.db import DEFAULT_DB_ALIAS, IntegrityError, transaction
+from django.db.models.signals import m2m_changed
+
+from kitchen import counters, routers, versioning
+from kitchen.models import Cook, Dish
+
+DishCook = Dish.cooks.through
+BATCH_SIZE = 1000
+# Attempts at inserting the missing links before a conflict is raised.
+INSERT_ATTEMPTS = 3
+# How much more of the menu a year of experience lets a cook carry: a
+# cook with ten years takes twice the share of a newcomer.
+EXPERIENCE_WEIGHT = 0.1
+
+
+def _send_m2m_changed(action, dish, cook_ids, using):
+    m2m_changed.send(
+        sender=DishCook,
+        instance=dish,
+        action=action,
+        reverse=False,
+        model=Cook,
+        pk_set=set(cook_ids),
+        using=using,
+    )
+
+
+def _links_changed(added=(), removed=(), using=DEFAULT_DB_ALIAS):
+    """
+    Do what the m2m_changed receivers would have done for through rows
+    written directly: adjust the stored counts with one update per distinct
+    change rather than one per dish, and bump the dish version once.
+    """
+    if not added and not removed:
+        return
+    if added:
+        counters.adjust_relation_pairs(DishCook, added, 1, using)
+    if removed:
+        counters.adjust_relation_pairs(DishCook, removed, -1, using)
+    routers.mark_write()
+    versioning.bump_version("dish")
+    transaction.on_commit(
+        lambda: versioning.bump_version("dish"), using=using
+    )
+
+
+def toggle_assignment(cook_id, dish_id, using=DEFAULT_DB_ALIAS):
+    """
+    Assign the cook to the dish, or unassign them if already assigned.
+    Return True if the cook ends up assigned.
+    """
+    # A single link goes through the same signals as dish.cooks would
+    # send, the pre_ one before the write and on the same instance.
+    dish = Dish(pk=dish_id)
+    rows = DishCook.objects.using(using)
+    link = rows.filter(dish_id=dish_id, cook_id=cook_id)
+    with transaction.atomic(using=using):
+        if link.exists():
+            _send_m2m_changed("pre_remove", dish, [cook_id], using)
+            deleted, _ = link.delete()
+            if deleted:
+                # Otherwise a concurrent request removed it first.
+                _send_m2m_changed("post_remove", dish, [cook_id], using)
+            return False
+        _send_m2m_changed("pre_add", dish, [cook_id], using)
+        try:
+            with transaction.atomic(using=using):
+                rows.create(dish_id=dish_id, cook_id=cook_id)
+        except IntegrityError:
+            # A concurrent request assigned the same pair first.
+            return True
+        _send_m2m_changed("post_add", dish, [cook_id], using)
+        return True
+
+
+def _existing_pairs(cook_ids, dish_ids, using):
+    existing = defaultdict(set)
+    pairs = (
+        DishCook.objects.using(using)
+        .filter(dish_id__in=dish_ids, cook_id__in=cook_ids)
+        .values_list("dish_id", "cook_id")
+    )
+    for dish_id, cook_id in pairs.iterator(chunk_size=BATCH_SIZE):
+        existing[dish_id].add(cook_id)
+    return existing
+
+
+def _insert_missing(cook_ids, dish_ids, using):
+    """
+    Write the links that don't exist yet and return exactly those pairs;
+    the caller reports them with _links_changed(). A pair linked by a
+    concurrent request after the read fails the insert rather than being
+    skipped but still counted, so the insert is retried from a new read.
+    """
+    for attempt in range(1, INSERT_ATTEMPTS + 1):
+        existing = _existing_pairs(cook_ids, dish_ids, using)
+        added = [
+            (dish_id, cook_id)
+            for dish_id in dish_ids
+            for cook_id in cook_ids - existing[dish_id]
+        ]
+        try:
+            with transaction.atomic(using=using):
+                DishCook.objects.using(using).bulk_create(
+                    (
+                        DishCook(dish_id=dish_id, cook_id=cook_id)
+                        for dish_id, cook_id in added
+                    ),
+                    batch_size=BATCH_SIZE,
+                )
+        except IntegrityError:
+            if attempt == INSERT_ATTEMPTS:
+                raise
+        else:
+            return added
+
+
+def _delete_links(links, using):
+    """
+    Delete the through rows in ``links`` and return their pairs. The rows
+    are locked as they are read, so none can be deleted concurrently and
+    counted twice.
+    """
+    rows = list(
+        links.select_for_update().values_list("pk", "dish_id", "cook_id")
+    )
+    for start in range(0, len(rows), BATCH_SIZE):
+        DishCook.objects.using(using).filter(
+            pk__in=[pk for pk, _, _ in rows[start:start + BATCH_SIZE]]
+        ).delete()
+    return [(dish_id, cook_id) for _, dish_id, cook_id in rows]
+
+
+def bulk_assign(cook_ids, dish_ids, using=DEFAULT_DB_ALIAS):
+    """Assign every cook to every dish; return the number of new rows."""
+    cook_ids, dish_ids = set(cook_ids), set(dish_ids)
+    with transaction.atomic(using=using):
+        added = _insert_missing(cook_ids, dish_ids, using)
+        _links_changed(added=added, using=using)
+    return len(added)
+
+
+def bulk_unassign(cook_ids, dish_ids, using=DEFAULT_DB_ALIAS):
+    """Unassign every cook from every dish; return the removed row count."""
+    cook_ids, dish_ids = set(cook_ids), set(dish_ids)
+    with transaction.atomic(using=using):
+        removed = _delete_links(
+            DishCook.objects.using(using).filter(
+                dish_id__in=dish_ids, cook_id__in=cook_ids
+            ),
+            using,
+        )
+        _links_changed(removed=removed, using=using)
+    return len(removed)
+
+
+def reassign(cook_ids, dish_ids, using=DEFAULT_DB_ALIAS):
+    """
+    Make ``cook_ids`` the only cooks of every dish; return the numbers of
+    added and removed rows.
+    """
+    cook_ids, dish_ids = set(cook_ids), set(dish_ids)
+    with transaction.atomic(using=using):
+        stale = (
+            DishCook.objects.using(using)
+            .filter(dish_id__in=dish_ids)
+            .exclude(cook_id__in=cook_ids)
+        )
+        removed = _delete_links(stale, using)
+        added = _insert_missing(cook_ids, dish_ids, using)
+        # One count pass and one version bump for both halves.
+        _links_changed(added=added, removed=removed, using=using)
+    return len(added), len(removed)
+
+
+def _capacity(years_of_experience):
+    return 1 + EXPERIENCE_WEIGHT * max(years_of_experience, 0)
+
+
+def balance(needs, cooks, existing=None):
+    """
+    Spread open dish slots over cooks in proportion to their experience.
+
+    ``needs`` maps dish ids to the number of cooks each still needs,
+    ``cooks`` maps cook ids to ``(years_of_experience, load)``, the load
+    being the dishes they already hold, and ``existing`` maps dish ids to
+    the cooks already on them. Each slot goes to the cook whose load,
+    counting the new dish, is the smallest share of their capacity; a heap
+    keyed on that share makes every pick O(log cooks). Return the
+    ``(dish_id, cook_id)`` pairs to add, in dish order.
+    """
+    existing = existing or {}
+    capacity = {
+        cook_id: _capacity(years) for cook_id, (years, _) in cooks.items()
+    }
+    heap = [
+        ((load + 1) / capacity[cook_id], cook_id, load)
+        for cook_id, (_, load) in cooks.items()
+    ]
+    heapq.heapify(heap)
+    pairs = []
+    for dish_id in sorted(needs):
+        on_dish = existing.get(dish_id, ())
+        held, picked = [], 0
+        while picked < needs[dish_id] and heap:
+            entry = heapq.heappop(heap)
+            _, cook_id, load = entry
+            if cook_id in on_dish:
+                held.append(entry)
+                continue
+            pairs.append((dish_id, cook_id))
+            picked += 1
+            # Held back until the dish is done so nobody takes it twice.
+            held.append(((load + 2) / capacity[cook_id], cook_id, load + 1))
+        for entry in held:
+            heapq.heappush(heap, entry)
+    return pairs
+
+
+def plan_auto_assignment(
+    dish_ids=None, cook_ids=None, cooks_per_dish=1, using=DEFAULT_DB_ALIAS
+):
+    """
+    Pick cooks for the dishes in ``dish_ids`` (default: every dish) that
+    have fewer than ``cooks_per_dish`` cooks, from the active cooks in
+    ``cook_ids`` (default: every active cook). Reads the stored relation
+    counts and the links of the understaffed dishes, writes nothing and
+    returns the ``(dish_id, cook_id)`` pairs to add.
+    """
+    dishes = Dish.objects.using(using).filter(cook_count__lt=cooks_per_dish)
+    if dish_ids is not None:
+        dishes = dishes.filter(pk__in=dish_ids)
+    cooks = Cook.objects.using(using).filter(is_active=True)
+    if cook_ids is not None:
+        cooks = cooks.filter(pk__in=cook_ids)
+    needs = {
+        dish_id: cooks_per_dish - cook_count
+        for dish_id, cook_count in dishes.values_list("pk", "cook_count")
+    }
+    if not needs:
+        return []
+    existing = defaultdict(set)
+    pairs = (
+        DishCook.objects.using(using)
+        .filter(dish__in=dishes.values("pk"))
+        .values_list("dish_id", "cook_id")
+    )
+    for dish_id, cook_id in pairs.iterator(chunk_size=BATCH_SIZE):
+        existing[dish_id].add(cook_id)
+    roster = {
+        cook_id: (years, load)
+        for cook_id, years, load in cooks.values_list(
+            "pk", "years_of_experience", "dish_count"
+        )
+    }
+    return balance(needs, roster, existing)
+
+
+def apply_assignment(pairs, using=DEFAULT_DB_ALIAS):
+    """
+    Write planned ``(dish_id, cook_id)`` pairs in one batched insert and
+    return how many there were. A pair linked since it was planned fails
+    the insert, and with it the whole assignment.
+    """
+    with transaction.atomic(using=using):
+        DishCook.objects.using(using).bulk_create(
+            (
+                DishCook(dish_id=dish_id, cook_id=cook_id)
+                for dish_id, cook_id in pairs
+            ),
+            batch_size=BATCH_SIZE,
+        )
+        _links_changed(added=pairs, using=using)
+    return len(pairs)
+
+
+def auto_assign(
+    dish_ids=None,
+    cook_ids=None,
+    cooks_per_dish=1,
+    dry_run=False,
+    using=DEFAULT_DB_ALIAS,
+):
+    """
+    Plan a balanced assignment with ``plan_auto_assignment()`` and, unless
+    ``dry_run``, apply it. Return the planned pairs either way.
+    """
+    with transaction.atomic(using=using):
+        pairs = plan_auto_assignment(dish_ids, cook_ids, cooks_per_dish, using)
+        if not dry_run:
+            apply_assignment(pairs, using)
+    return pairs
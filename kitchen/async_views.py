@@ -0,0 +1,186 @@
+"""
+Native async versions of the read-heavy kitchen views.
+
+``kitchen.urls`` serves these in place of the class-based views when
+``KITCHEN_ASYNC_VIEWS`` is enabled, which the ASGI settings profile does.
+Templates are returned as ``TemplateResponse`` so the handler renders them
+after the view, where lazy session and cache access is allowed.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.template.response import TemplateResponse
+from django.urls import reverse
+
+from .assignments import toggle_assignment
+from .counters import read_counters
+from .exports import ASYNC_WRITERS, WRITERS, aiter_dishes
+from .forms import (
+    CookSearchForm,
+    DishSearchForm,
+    DishTypeSearchForm,
+    IngredientSearchForm,
+)
+from .ingredient_index import filter_dishes
+from .models import Cook, Dish, DishType, Ingredient
+from .pagination import InvalidCursor, KeysetPaginator
+from .search import search_dishes
+from .views import COOK_SORTS, DISH_SORTS, ingredient_ids
+
+PAGE_SIZE = 5
+
+
+async def _paginate(request, queryset, ordering, context_object_name):
+    paginator = KeysetPaginator(
+        queryset, PAGE_SIZE, tuple(ordering) + ("pk",)
+    )
+    try:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor:
+        raise Http404("Invalid cursor.")
+    return {
+        "paginator": paginator,
+        "page_obj": page,
+        "is_paginated": page.has_other_pages(),
+        "object_list": page.object_list,
+        context_object_name: page.object_list,
+    }
+
+
+@login_required
+async def dish_type_list(request):
+    name = request.GET.get("name", "")
+    queryset = DishType.objects.all()
+    if name:
+        queryset = queryset.filter(name__trigram_contains=name)
+    context = await _paginate(
+        request, queryset, DishType._meta.ordering, "dish_type_list"
+    )
+    context["search_form"] = DishTypeSearchForm(initial={"name": name})
+    return TemplateResponse(request, "kitchen/dish_type_list.html", context)
+
+
+@login_required
+async def ingredient_list(request):
+    name = request.GET.get("name", "")
+    queryset = Ingredient.objects.all()
+    if name:
+        queryset = queryset.filter(name__trigram_contains=name)
+    context = await _paginate(
+        request, queryset, Ingredient._meta.ordering, "ingredient_list"
+    )
+    context["search_form"] = IngredientSearchForm(initial={"name": name})
+    return TemplateResponse(
+        request, "kitchen/ingredient_list.html", context
+    )
+
+
+@login_required
+async def dish_list(request):
+    name = request.GET.get("name", "")
+    query = request.GET.get("q", "")
+    # The table shows the stored relation counts, not the relations.
+    queryset = Dish.objects.select_related("dish_type")
+    with_ingredients = ingredient_ids(request, "with_ingredients")
+    without_ingredients = ingredient_ids(request, "without_ingredients")
+    # Reads the ingredient postings to narrow the queryset.
+    queryset = await sync_to_async(filter_dishes)(
+        queryset, all_of=with_ingredients, none_of=without_ingredients
+    )
+    ordering = DISH_SORTS.get(request.GET.get("sort"), Dish._meta.ordering)
+    if query:
+        queryset = search_dishes(queryset, query)
+        ordering = ("-search_rank",)
+    if name:
+        queryset = queryset.filter(name__trigram_contains=name)
+    context = await _paginate(request, queryset, ordering, "dish_list")
+    # A keyset page doesn't know the total; the maintained counter does.
+    context["total_dishes"] = (await sync_to_async(read_counters)())[
+        "dishes"
+    ]
+    context["search_form"] = DishSearchForm(
+        initial={
+            "name": name,
+            "q": query,
+            "with_ingredients": with_ingredients,
+            "without_ingredients": without_ingredients,
+        }
+    )
+    return TemplateResponse(request, "kitchen/dish_list.html", context)
+
+
+@login_required
+async def export_menu(request):
+    """
+    Stream every dish as CSV or JSON Lines through an async iterator,
+    which ASGI sends chunk by chunk.
+    """
+    fmt = request.GET.get("format", "csv")
+    if fmt not in WRITERS:
+        raise Http404("Unknown export format.")
+    _, content_type = WRITERS[fmt]
+    response = StreamingHttpResponse(
+        ASYNC_WRITERS[fmt](aiter_dishes()), content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="menu.{fmt}"'
+    return response
+
+
+@login_required
+async def cook_list(request):
+    username = request.GET.get("username", "")
+    queryset = Cook.objects.all()
+    if username:
+        queryset = queryset.filter(username__trigram_contains=username)
+    ordering = COOK_SORTS.get(request.GET.get("sort"), Cook._meta.ordering)
+    context = await _paginate(request, queryset, ordering, "cook_list")
+    context["total_cooks"] = (await sync_to_async(read_counters)())["cooks"]
+    context["username"] = username
+    context["search_form"] = CookSearchForm(initial={"username": username})
+    return TemplateResponse(request, "kitchen/cook_list.html", context)
+
+
+@login_required
+async def dish_detail(request, pk):
+    dish = await aget_object_or_404(
+        Dish.objects.select_related("dish_type"), pk=pk
+    )
+    user = await request.auser()
+    context = {
+        "object": dish,
+        "dish": dish,
+        # Left lazy: only a fragment cache miss fetches them, while the
+        # response renders.
+        "cooks": dish.cooks.all(),
+        "ingredients": dish.ingredients.all(),
+        "is_cooking": await dish.cooks.filter(pk=user.pk).aexists(),
+    }
+    return TemplateResponse(request, "kitchen/dish_detail.html", context)
+
+
+@login_required
+async def cook_detail(request, pk):
+    cook = await aget_object_or_404(Cook, pk=pk)
+    context = {
+        "object": cook,
+        "cook": cook,
+        "dishes": cook.dishes.select_related("dish_type"),
+    }
+    return TemplateResponse(request, "kitchen/cook_detail.html", context)
+
+
+@login_required
+async def toggle_assign_to_dish(request, pk):
+    user = await request.auser()
+    dish = await aget_object_or_404(Dish.objects.only("name"), id=pk)
+
+    # The toggle and the signal receivers it fires share one transaction,
+    # which Django can only run on a single thread.
+    if await sync_to_async(toggle_assignment)(user.id, dish.id):
+        messages.success(request, f"You are now cooking '{dish.name}'")
+    else:
+        messages.success(request, f"You are no longer cooking '{dish.name}'")
+
+    return HttpResponseRedirect(reverse("kitchen:dish-detail", args=[pk]))
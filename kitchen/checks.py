@@ -0,0 +1,22 @@
+from django.contrib.staticfiles import finders
+from django.core.checks import Error, Tags, register
+
+from kitchen.assets import template_references
+
+
+@register(Tags.staticfiles, Tags.templates)
+def check_template_assets(app_configs, **kwargs):
+    """Fail when a template references a static file that does not exist."""
+    errors = []
+    for template, name in dict.fromkeys(template_references()):
+        if not finders.find(name):
+            errors.append(
+                Error(
+                    f"Template '{template}' references missing static file "
+                    f"'{name}'.",
+                    hint="Add the file under static/ or fix the reference.",
+                    obj=template,
+                    id="kitchen.E001",
+                )
+            )
+    return errors
@@ -0,0 +1,170 @@
+from collections import Counter, defaultdict
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from kitchen.models import Cook, DashboardCounter, Dish, DishType, Ingredient
+
+COUNTED_MODELS = {
+    "cooks": Cook,
+    "dishes": Dish,
+    "dish_types": DishType,
+    "ingredients": Ingredient,
+}
+CHUNK_SIZE = 500
+
+
+def counter_name(model):
+    for name, counted_model in COUNTED_MODELS.items():
+        if counted_model is model:
+            return name
+    return None
+
+
+def adjust_counter(name, delta, using=DEFAULT_DB_ALIAS):
+    """
+    Atomically add ``delta`` to a counter inside the caller's transaction,
+    seeding it from a real count the first time it is touched.
+    """
+    counters = DashboardCounter.objects.using(using)
+    if not counters.filter(name=name).update(value=F("value") + delta):
+        counters.get_or_create(
+            name=name,
+            defaults={
+                "value": COUNTED_MODELS[name].objects.using(using).count()
+            },
+        )
+
+
+def read_counters(using=DEFAULT_DB_ALIAS):
+    values = dict(
+        DashboardCounter.objects.using(using).values_list("name", "value")
+    )
+    missing = COUNTED_MODELS.keys() - values.keys()
+    if missing:
+        values.update(reconcile_counters(using=using, names=missing))
+    return values
+
+
+def reconcile_counters(using=DEFAULT_DB_ALIAS, names=None):
+    """Recount the counted tables and overwrite any drifted counters."""
+    values = {}
+    for name in sorted(names or COUNTED_MODELS):
+        values[name] = COUNTED_MODELS[name].objects.using(using).count()
+        DashboardCounter.objects.using(using).update_or_create(
+            name=name, defaults={"value": values[name]}
+        )
+    return values
+
+
+# Stored m2m counts, keyed by through model: for each side, the model, the
+# field counting its rows on the other side (None if it keeps no count) and
+# its column in the through table.
+RELATION_COUNTS = {
+    Dish.cooks.through: (
+        (Dish, "cook_count", "dish_id"),
+        (Cook, "dish_count", "cook_id"),
+    ),
+    Dish.ingredients.through: (
+        (Dish, "ingredient_count", "dish_id"),
+        (Ingredient, None, "ingredient_id"),
+    ),
+}
+
+
+def _sides(through, reverse):
+    source, target = RELATION_COUNTS[through]
+    return (target, source) if reverse else (source, target)
+
+
+def counted_relations(model):
+    """Yield ``(through, reverse)`` for relations whose other side counts."""
+    for through, (source, target) in RELATION_COUNTS.items():
+        if source[0] is model and target[1]:
+            yield through, False
+        if target[0] is model and source[1]:
+            yield through, True
+
+
+def related_ids(through, reverse, pk, using=DEFAULT_DB_ALIAS, among=None):
+    """Return the ids linked to ``pk`` through ``through``."""
+    (_, _, column), (_, _, other_column) = _sides(through, reverse)
+    rows = through.objects.using(using).filter(**{column: pk})
+    if among is not None:
+        rows = rows.filter(**{f"{other_column}__in": among})
+    return set(rows.values_list(other_column, flat=True))
+
+
+def adjust_relation_counts(
+    through, reverse, instance, pk_set, delta, using=DEFAULT_DB_ALIAS
+):
+    """
+    Atomically add ``delta`` per linked row to the stored counts on both
+    sides after ``instance`` gained or lost the links to ``pk_set``.
+    """
+    if not pk_set:
+        return
+    (model, field, _), (other_model, other_field, _) = _sides(
+        through, reverse
+    )
+    if field:
+        change = delta * len(pk_set)
+        model.objects.using(using).filter(pk=instance.pk).update(
+            **{field: F(field) + change}
+        )
+        # Keep the instance in step so a later save() does not undo this.
+        setattr(instance, field, getattr(instance, field) + change)
+    if other_field:
+        other_model.objects.using(using).filter(pk__in=pk_set).update(
+            **{other_field: F(other_field) + delta}
+        )
+
+
+def adjust_relation_pairs(through, pairs, delta, using=DEFAULT_DB_ALIAS):
+    """
+    Add ``delta`` per link to the stored counts on both sides for links
+    written without ``m2m_changed``, given as ``(source_id, target_id)``
+    pairs in the column order of ``RELATION_COUNTS``. Rows changing by the
+    same amount share one update, so the cost follows the spread of the
+    changes rather than the number of rows.
+    """
+    for (model, field, _), ids in zip(RELATION_COUNTS[through], zip(*pairs)):
+        if not field:
+            continue
+        by_change = defaultdict(list)
+        for pk, links in Counter(ids).items():
+            by_change[delta * links].append(pk)
+        for change, pks in by_change.items():
+            for start in range(0, len(pks), CHUNK_SIZE):
+                model.objects.using(using).filter(
+                    pk__in=pks[start:start + CHUNK_SIZE]
+                ).update(**{field: F(field) + change})
+
+
+def reconcile_relation_counts(using=DEFAULT_DB_ALIAS):
+    """
+    Recount the stored m2m counts and overwrite the drifted ones. Return
+    how many rows were fixed per ``model.field``.
+    """
+    fixed = {}
+    for through, sides in RELATION_COUNTS.items():
+        for model, field, column in sides:
+            if not field:
+                continue
+            actual = Coalesce(
+                Subquery(
+                    through.objects.filter(**{column: OuterRef("pk")})
+                    .order_by()
+                    .values(column)
+                    .annotate(count=Count("pk"))
+                    .values("count")
+                ),
+                0,
+            )
+            fixed[f"{model._meta.model_name}.{field}"] = (
+                model.objects.using(using)
+                .exclude(**{field: actual})
+                .update(**{field: actual})
+            )
+    return fixed
@@ -0,0 +1,124 @@
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Prefetch
+
+from kitchen.models import Cook, Dish, Ingredient
+
+FIELDS = (
+    "id",
+    "name",
+    "description",
+    "price",
+    "dish_type",
+    "ingredients",
+    "cooks",
+)
+CHUNK_SIZE = 2000
+
+
+class Echo:
+    """File-like object whose write() hands the value straight back."""
+
+    def write(self, value):
+        return value
+
+
+def _dishes(using):
+    return (
+        Dish.objects.using(using)
+        .select_related("dish_type")
+        .only("name", "description", "price", "dish_type__name")
+        .prefetch_related(
+            Prefetch("ingredients", queryset=Ingredient.objects.only("name")),
+            Prefetch("cooks", queryset=Cook.objects.only("username")),
+        )
+        .order_by("pk")
+    )
+
+
+def _as_dict(dish):
+    return {
+        "id": dish.pk,
+        "name": dish.name,
+        "description": dish.description,
+        "price": str(dish.price),
+        "dish_type": dish.dish_type.name,
+        "ingredients": [i.name for i in dish.ingredients.all()],
+        "cooks": [cook.username for cook in dish.cooks.all()],
+    }
+
+
+def iter_dishes(using=DEFAULT_DB_ALIAS, chunk_size=CHUNK_SIZE):
+    """
+    Yield every dish as a dict with its dish type, ingredient names and
+    cook usernames. Rows are fetched ``chunk_size`` at a time and the
+    M2M data is prefetched once per chunk, so memory stays flat.
+    """
+    for dish in _dishes(using).iterator(chunk_size=chunk_size):
+        yield _as_dict(dish)
+
+
+def _chunk(queryset):
+    return [_as_dict(dish) for dish in queryset]
+
+
+async def aiter_dishes(using=DEFAULT_DB_ALIAS, chunk_size=CHUNK_SIZE):
+    """
+    ``iter_dishes()`` for async code. Each chunk of ``chunk_size`` dishes
+    after the last pk seen is fetched in a worker thread, so only one
+    chunk is held at a time. Django would buffer a sync iterator whole
+    before streaming it under ASGI.
+    """
+    dishes = _dishes(using)
+    last_pk = None
+    while True:
+        queryset = dishes if last_pk is None else dishes.filter(pk__gt=last_pk)
+        chunk = await sync_to_async(_chunk)(queryset[:chunk_size])
+        for dish in chunk:
+            yield dish
+        if len(chunk) < chunk_size:
+            return
+        last_pk = chunk[-1]["id"]
+
+
+def _csv_values(dish):
+    return [
+        ";".join(dish[field])
+        if field in ("ingredients", "cooks")
+        else dish[field]
+        for field in FIELDS
+    ]
+
+
+def iter_csv(dishes):
+    writer = csv.writer(Echo())
+    yield writer.writerow(FIELDS)
+    for dish in dishes:
+        yield writer.writerow(_csv_values(dish))
+
+
+async def aiter_csv(dishes):
+    writer = csv.writer(Echo())
+    yield writer.writerow(FIELDS)
+    async for dish in dishes:
+        yield writer.writerow(_csv_values(dish))
+
+
+def iter_jsonl(dishes):
+    for dish in dishes:
+        yield json.dumps(dish, ensure_ascii=False) + "\n"
+
+
+async def aiter_jsonl(dishes):
+    async for dish in dishes:
+        yield json.dumps(dish, ensure_ascii=False) + "\n"
+
+
+WRITERS = {
+    "csv": (iter_csv, "text/csv"),
+    "jsonl": (iter_jsonl, "application/x-ndjson"),
+}
+ASYNC_WRITERS = {"csv": aiter_csv, "jsonl": aiter_jsonl}
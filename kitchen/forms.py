@@ -2,20 +2,59 @@ from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
 
 from kitchen.models import Dish, Cook, Ingredient, DishType
 
 
+class AutocompleteSelectMultiple(forms.SelectMultiple):
+    """
+    Multi-select that renders only the currently selected options and
+    leaves looking up the rest to a JSON autocomplete endpoint.
+    """
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    def build_attrs(self, base_attrs, extra_attrs=None):
+        attrs = super().build_attrs(base_attrs, extra_attrs)
+        attrs["data-autocomplete-url"] = str(self.url)
+        return attrs
+
+    def optgroups(self, name, value, attrs=None):
+        selected_ids = [pk for pk in value if str(pk).isdigit()]
+        if not selected_ids:
+            return []
+        queryset = self.choices.queryset.filter(pk__in=selected_ids)
+        return [
+            (
+                None,
+                [
+                    self.create_option(
+                        name, obj.pk, str(obj), True, index, attrs=attrs
+                    )
+                ],
+                index,
+            )
+            for index, obj in enumerate(queryset)
+        ]
+
+
 class DishForm(forms.ModelForm):
     cooks = forms.ModelMultipleChoiceField(
         queryset=get_user_model().objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple(
+            reverse_lazy("kitchen:cook-autocomplete")
+        ),
         required=False,
     )
 
     ingredients = forms.ModelMultipleChoiceField(
         queryset=Ingredient.objects.all(),
-        widget=forms.CheckboxSelectMultiple,
+        widget=AutocompleteSelectMultiple(
+            reverse_lazy("kitchen:ingredient-autocomplete")
+        ),
         required=False,
     )
 
@@ -72,6 +111,30 @@ class DishSearchForm(forms.Form):
         label="",
         widget=forms.TextInput(attrs={"placeholder": "Search by dish name"}),
     )
+    q = forms.CharField(
+        max_length=100,
+        required=False,
+        label="",
+        widget=forms.TextInput(
+            attrs={"placeholder": "Search dishes, types and ingredients"}
+        ),
+    )
+    with_ingredients = forms.ModelMultipleChoiceField(
+        queryset=Ingredient.objects.all(),
+        widget=AutocompleteSelectMultiple(
+            reverse_lazy("kitchen:ingredient-autocomplete")
+        ),
+        required=False,
+        label="Made with all of",
+    )
+    without_ingredients = forms.ModelMultipleChoiceField(
+        queryset=Ingredient.objects.all(),
+        widget=AutocompleteSelectMultiple(
+            reverse_lazy("kitchen:ingredient-autocomplete")
+        ),
+        required=False,
+        label="Made with none of",
+    )
 
 
 class DishTypeSearchForm(forms.Form):
@@ -90,3 +153,33 @@ class IngredientSearchForm(forms.Form):
         label="",
         widget=forms.TextInput(attrs={"placeholder": "Search by ingredient"}),
     )
+
+
+class BulkAssignmentForm(forms.Form):
+    ASSIGN = "assign"
+    UNASSIGN = "unassign"
+
+    action = forms.ChoiceField(
+        choices=((ASSIGN, "Assign"), (UNASSIGN, "Unassign"))
+    )
+    cooks = forms.ModelMultipleChoiceField(
+        queryset=get_user_model().objects.only("pk")
+    )
+    dishes = forms.ModelMultipleChoiceField(
+        queryset=Dish.objects.only("pk")
+    )
+
+
+class AutoAssignmentForm(forms.Form):
+    cooks = forms.ModelMultipleChoiceField(
+        queryset=get_user_model().objects.only("pk"),
+        required=False,
+        help_text="Leave empty to draw on every active cook.",
+    )
+    dishes = forms.ModelMultipleChoiceField(
+        queryset=Dish.objects.only("pk"),
+        required=False,
+        help_text="Leave empty to staff the whole menu.",
+    )
+    cooks_per_dish = forms.IntegerField(min_value=1, max_value=10, initial=1)
+    dry_run = forms.BooleanField(required=False)
@@ -0,0 +1,192 @@
+"""
+Resized WebP/AVIF variants of the raster images under ``assets/img``.
+
+``optimize_images`` writes the variants into ``STATIC_ROOT`` after
+collectstatic, together with a JSON manifest that maps each source image
+(relative to ``ASSETS_ROOT``) to its variants. Variant names carry a hash
+of the source image and encoder options, like the names collectstatic
+hashes, so they can be cached forever. The ``kitchen_images`` template
+tags read the manifest to point browsers at the smallest variant that
+still covers the rendered width, and fall back to the original image when
+no manifest has been built.
+"""
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from PIL import Image, features
+
+from kitchen.assets import HASHED_NAME, template_dirs
+
+SOURCE_DIR = "img"
+VARIANT_DIR = "img/variants"
+MANIFEST_NAME = "img/variants.json"
+SOURCE_SUFFIXES = (".jpg", ".jpeg", ".png")
+WIDTHS = (480, 960, 1440, 1920)
+# Rendered width assumed for the full-bleed page header backgrounds.
+BACKGROUND_WIDTH = 1920
+# Format, Pillow save options and MIME type, best compression first.
+FORMATS = (
+    ("avif", {"quality": 60, "speed": 8}, "image/avif"),
+    ("webp", {"quality": 80, "method": 6}, "image/webp"),
+)
+MIME_TYPES = {name: mime for name, _, mime in FORMATS}
+
+
+def assets_root():
+    return Path(settings.STATIC_ROOT) / "assets"
+
+
+def manifest_path():
+    return assets_root() / MANIFEST_NAME
+
+
+def available_formats():
+    return [fmt for fmt in FORMATS if features.check(fmt[0])]
+
+
+def _target_widths(width):
+    # Never upscale, and skip re-encoding huge originals at full size.
+    return [w for w in WIDTHS if w < width] + [min(width, WIDTHS[-1])]
+
+
+def _digest(content, options):
+    digest = hashlib.md5(content, usedforsecurity=False)
+    digest.update(json.dumps(options, sort_keys=True).encode())
+    return digest.hexdigest()[:12]
+
+
+def _variant_name(source, width, fmt, digest):
+    relative = source.relative_to(SOURCE_DIR)
+    stem = relative.with_suffix("")
+    return f"{VARIANT_DIR}/{stem}-{width}.{digest}.{fmt}"
+
+
+def _resize(image, width):
+    height = max(1, round(image.height * width / image.width))
+    return image.resize((width, height), Image.Resampling.LANCZOS)
+
+
+def _is_stale(output, force):
+    # A changed source or encoder setting changes the name instead.
+    return force or not output.exists()
+
+
+def build_variants(root=None, force=False):
+    """
+    Write every missing or outdated variant under ``root`` and the
+    manifest describing them, and delete variants nothing refers to any
+    more. Return the manifest.
+    """
+    root = Path(root or assets_root())
+    formats = available_formats()
+    manifest = {}
+    sources = sorted(
+        path
+        for path in (root / SOURCE_DIR).rglob("*")
+        if path.suffix.lower() in SOURCE_SUFFIXES
+        and root / VARIANT_DIR not in path.parents
+        # Skip the hashed copies ManifestStaticFilesStorage collects.
+        and not HASHED_NAME.search(path.name)
+    )
+    written = set()
+    for path in sources:
+        source = path.relative_to(root)
+        variants = []
+        content = path.read_bytes()
+        with Image.open(path) as image:
+            image = image.convert(
+                "RGBA" if image.has_transparency_data else "RGB"
+            )
+        for width in _target_widths(image.width):
+            resized = None
+            for fmt, options, _ in formats:
+                digest = _digest(content, [width, fmt, options])
+                name = _variant_name(source, width, fmt, digest)
+                output = root / name
+                written.add(output)
+                if _is_stale(output, force):
+                    if resized is None:
+                        resized = _resize(image, width)
+                    output.parent.mkdir(parents=True, exist_ok=True)
+                    resized.save(output, fmt.upper(), **options)
+                variants.append(
+                    {
+                        "path": name,
+                        "width": width,
+                        "format": fmt,
+                        "bytes": output.stat().st_size,
+                    }
+                )
+        manifest[source.as_posix()] = {
+            "width": image.width,
+            "bytes": path.stat().st_size,
+            "variants": variants,
+        }
+    for path in (root / VARIANT_DIR).rglob("*"):
+        if path.is_file() and path not in written:
+            path.unlink()
+    (root / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2))
+    load_manifest.cache_clear()
+    return manifest
+
+
+@lru_cache(maxsize=1)
+def load_manifest():
+    try:
+        return json.loads(manifest_path().read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def pick_variant(entry, width, fmt):
+    """Return the smallest ``fmt`` variant at least ``width`` wide."""
+    candidates = sorted(
+        (v for v in entry["variants"] if v["format"] == fmt),
+        key=lambda variant: variant["width"],
+    )
+    for variant in candidates:
+        if variant["width"] >= width:
+            return variant
+    return candidates[-1] if candidates else None
+
+
+def best_variant(entry, width):
+    """Return the smallest file among the formats' picks for ``width``."""
+    picks = [pick_variant(entry, width, fmt) for fmt, _, _ in FORMATS]
+    picks = [variant for variant in picks if variant]
+    return min(picks, key=lambda variant: variant["bytes"], default=None)
+
+
+BACKGROUND_TAG = re.compile(
+    r"""{%\s*background_image\s+["']([^"']+)["'](?:\s+(\d+))?\s*%}"""
+)
+
+
+def page_savings(manifest, default_width=BACKGROUND_WIDTH):
+    """
+    Yield ``(template, original bytes, optimized bytes)`` for every
+    template that renders a background image through the tag.
+    """
+    for directory in template_dirs():
+        for path in sorted(directory.rglob("*.html")):
+            original = optimized = 0
+            for source, width in BACKGROUND_TAG.findall(path.read_text()):
+                entry = manifest.get(source)
+                if entry is None:
+                    continue
+                variant = best_variant(entry, int(width or default_width))
+                original += entry["bytes"]
+                optimized += min(
+                    entry["bytes"],
+                    variant["bytes"] if variant else entry["bytes"],
+                )
+            if original:
+                yield (
+                    path.relative_to(directory).as_posix(),
+                    original,
+                    optimized,
+                )
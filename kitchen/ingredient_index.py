@@ -0,0 +1,319 @@
+"""
+Inverted index from ingredients to the dishes made with them.
+
+``IngredientPostings`` keeps, per ingredient, the sorted ids of its dishes
+packed into one binary column. Link changes do not rewrite that column:
+the receivers in ``kitchen.signals`` append them to ``IngredientPostingDelta``
+as ``m2m_changed`` reports them, and code that bypasses the signals
+(``bulk_create()`` of through rows) calls ``add_links()`` or
+``rebuild_ingredient_index()``. Readers apply an ingredient's pending
+deltas on top of its postings. An ingredient with neither has no dishes.
+
+Once an ingredient has ``COMPACT_AFTER`` pending deltas they are compacted
+into its postings, so a link change costs one small insert plus, every
+``COMPACT_AFTER`` changes, one rewrite of the packed column -- instead of
+a locked rewrite each time, which serialized edits to popular ingredients.
+
+``filter_dishes()`` answers "made with all of these and none of those" by
+reading one row per ingredient and combining the id sets in memory, so the
+cost follows the size of the postings read rather than the joins a
+multi-ingredient filter needs in SQL.
+"""
+import sys
+from array import array
+from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Subquery
+
+from kitchen.models import (
+    Dish,
+    Ingredient,
+    IngredientPostingDelta,
+    IngredientPostings,
+)
+
+DishIngredient = Dish.ingredients.through
+
+# Results larger than this are filtered with semi-joins on the through
+# table rather than sent to the database as a list of ids.
+MAX_ID_LIST = 5000
+BATCH_SIZE = 500
+# Pending deltas an ingredient collects before they are compacted into its
+# postings. Readers apply up to this many changes per ingredient in memory.
+COMPACT_AFTER = 100
+
+
+def encode(dish_ids):
+    """Pack ``dish_ids`` sorted into little-endian 64-bit integers."""
+    packed = array("q", sorted(dish_ids))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def decode(data):
+    packed = array("q")
+    packed.frombytes(bytes(data))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed
+
+
+def _by_ingredient(pairs):
+    grouped = defaultdict(set)
+    for dish_id, ingredient_id in pairs:
+        grouped[ingredient_id].add(dish_id)
+    return grouped
+
+
+def _record(pairs, added, using):
+    grouped = _by_ingredient(pairs)
+    if not grouped:
+        return
+    deltas = IngredientPostingDelta.objects.using(using)
+    deltas.bulk_create(
+        [
+            IngredientPostingDelta(
+                ingredient_id=ingredient_id, dish_id=dish_id, added=added
+            )
+            for ingredient_id, dish_ids in grouped.items()
+            for dish_id in sorted(dish_ids)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    due = list(
+        deltas.filter(ingredient_id__in=grouped)
+        .values("ingredient_id")
+        .annotate(pending=Count("pk"))
+        .filter(pending__gte=COMPACT_AFTER)
+        .values_list("ingredient_id", flat=True)
+    )
+    if due:
+        compact_ingredient_index(using, ingredient_ids=due)
+
+
+def add_links(pairs, using=DEFAULT_DB_ALIAS):
+    """Index the ``(dish_id, ingredient_id)`` links in ``pairs``."""
+    _record(pairs, True, using)
+
+
+def remove_links(pairs, using=DEFAULT_DB_ALIAS):
+    """Drop the ``(dish_id, ingredient_id)`` links in ``pairs``."""
+    _record(pairs, False, using)
+
+
+def _pending(ingredient_ids, using):
+    """Map each ingredient to its ``(pk, dish_id, added)`` deltas in order."""
+    deltas = IngredientPostingDelta.objects.using(using)
+    if ingredient_ids is not None:
+        deltas = deltas.filter(ingredient_id__in=ingredient_ids)
+    pending = defaultdict(list)
+    for ingredient_id, *delta in deltas.order_by("pk").values_list(
+        "ingredient_id", "pk", "dish_id", "added"
+    ):
+        pending[ingredient_id].append(delta)
+    return pending
+
+
+def _apply(dish_ids, deltas):
+    # Deltas are idempotent and applied in insertion order, so the last
+    # change recorded for a dish wins.
+    for _, dish_id, added in deltas:
+        if added:
+            dish_ids.add(dish_id)
+        else:
+            dish_ids.discard(dish_id)
+    return dish_ids
+
+
+def compact_ingredient_index(using=DEFAULT_DB_ALIAS, ingredient_ids=None):
+    """
+    Merge the pending deltas of ``ingredient_ids``, or of every ingredient
+    that has some, into their postings. Return the ingredients compacted.
+    """
+    postings = IngredientPostings.objects.using(using)
+    deltas = IngredientPostingDelta.objects.using(using)
+    ingredients = Ingredient.objects.using(using)
+    if ingredient_ids is None:
+        ingredients = ingredients.filter(
+            pk__in=Subquery(deltas.values("ingredient_id"))
+        )
+    else:
+        ingredients = ingredients.filter(pk__in=set(ingredient_ids))
+    with transaction.atomic(using=using):
+        # Lock the ingredients rather than their postings, which may not
+        # exist yet. Compactions of one ingredient queue up; link changes
+        # keep appending deltas and are picked up by the next compaction.
+        locked = list(
+            ingredients.select_for_update().values_list("pk", flat=True)
+        )
+        pending = _pending(locked, using)
+        rows = {
+            row.pk: row
+            for row in postings.filter(ingredient_id__in=pending)
+        }
+        created = []
+        for ingredient_id, changes in pending.items():
+            row = rows.get(ingredient_id)
+            if row is None:
+                row = IngredientPostings(ingredient_id=ingredient_id)
+                created.append(row)
+            dish_ids = _apply(set(decode(row.dish_ids)), changes)
+            row.dish_ids = encode(dish_ids)
+            row.dish_count = len(dish_ids)
+        postings.bulk_update(
+            [row for row in rows.values() if row.dish_count],
+            ["dish_ids", "dish_count"],
+            batch_size=BATCH_SIZE,
+        )
+        postings.bulk_create(
+            [row for row in created if row.dish_count],
+            batch_size=BATCH_SIZE,
+        )
+        # An ingredient without dishes has no row.
+        emptied = [pk for pk, row in rows.items() if not row.dish_count]
+        if emptied:
+            postings.filter(ingredient_id__in=emptied).delete()
+        # Only the deltas applied above: newer ones wait for the next run.
+        applied = [
+            pk for changes in pending.values() for pk, _, _ in changes
+        ]
+        for start in range(0, len(applied), BATCH_SIZE):
+            batch = applied[start:start + BATCH_SIZE]
+            deltas.filter(pk__in=batch).delete()
+    return len(pending)
+
+
+def rebuild_ingredient_index(using=DEFAULT_DB_ALIAS, ingredient_ids=None):
+    """
+    Recompute the postings of ``ingredient_ids``, or of every ingredient,
+    from the through table in one ordered pass, dropping their pending
+    deltas. Return the ingredients indexed.
+    """
+    links = DishIngredient.objects.using(using)
+    postings = IngredientPostings.objects.using(using)
+    deltas = IngredientPostingDelta.objects.using(using)
+    if ingredient_ids is not None:
+        ingredient_ids = set(ingredient_ids)
+        links = links.filter(ingredient_id__in=ingredient_ids)
+        postings = postings.filter(ingredient_id__in=ingredient_ids)
+        deltas = deltas.filter(ingredient_id__in=ingredient_ids)
+    links = links.order_by("ingredient_id", "dish_id").values_list(
+        "ingredient_id", "dish_id"
+    )
+    indexed = 0
+    with transaction.atomic(using=using):
+        deltas.delete()
+        postings.delete()
+        batch = []
+        for ingredient_id, rows in groupby(
+            links.iterator(chunk_size=10000), key=itemgetter(0)
+        ):
+            dish_ids = [dish_id for _, dish_id in rows]
+            batch.append(
+                IngredientPostings(
+                    ingredient_id=ingredient_id,
+                    dish_ids=encode(dish_ids),
+                    dish_count=len(dish_ids),
+                )
+            )
+            if len(batch) >= BATCH_SIZE:
+                indexed += _save(batch, using)
+        indexed += _save(batch, using)
+    return indexed
+
+
+def _save(batch, using):
+    # A concurrent compaction may have created the same row from deltas
+    # of the same links; either copy is current.
+    IngredientPostings.objects.using(using).bulk_create(
+        batch, ignore_conflicts=True
+    )
+    saved = len(batch)
+    batch.clear()
+    return saved
+
+
+def matching_dish_ids(all_of=(), none_of=(), using=DEFAULT_DB_ALIAS):
+    """
+    Return ``(dish_ids, excluded_ids)``: the ids of the dishes made with
+    every ingredient in ``all_of`` -- ``None`` when ``all_of`` is empty,
+    meaning every dish -- and the ids of the dishes made with any
+    ingredient in ``none_of``, which ``dish_ids`` already leaves out.
+    """
+    all_of, none_of = set(all_of), set(none_of)
+    postings = _current_postings(all_of | none_of, using)
+    excluded = set()
+    for ingredient_id in none_of:
+        excluded.update(postings.get(ingredient_id, ()))
+    if not all_of:
+        return None, excluded
+    if not all_of <= postings.keys():
+        return set(), excluded
+    # Start from the shortest set so every step only shrinks the result.
+    sets = sorted(
+        (postings[ingredient_id] for ingredient_id in all_of), key=len
+    )
+    dish_ids = sets[0].intersection(*sets[1:])
+    return dish_ids - excluded, excluded
+
+
+def _current_postings(ingredient_ids, using):
+    """
+    Map each of ``ingredient_ids`` that has dishes to the set of their ids,
+    with the pending deltas applied.
+    """
+    postings = dict(
+        IngredientPostings.objects.using(using)
+        .filter(ingredient_id__in=ingredient_ids)
+        .order_by()
+        .values_list("ingredient_id", "dish_ids")
+    )
+    current = {
+        ingredient_id: set(decode(dish_ids))
+        for ingredient_id, dish_ids in postings.items()
+    }
+    for ingredient_id, changes in _pending(ingredient_ids, using).items():
+        current[ingredient_id] = _apply(
+            current.get(ingredient_id, set()), changes
+        )
+    return {
+        ingredient_id: dish_ids
+        for ingredient_id, dish_ids in current.items()
+        if dish_ids
+    }
+
+
+def filter_dishes(queryset, all_of=(), none_of=()):
+    """
+    Narrow a dish ``queryset`` to the dishes made with every ingredient in
+    ``all_of`` and none in ``none_of``.
+    """
+    if not all_of and not none_of:
+        return queryset
+    using = queryset.db
+    dish_ids, excluded = matching_dish_ids(all_of, none_of, using)
+    if dish_ids is not None and len(dish_ids) <= MAX_ID_LIST:
+        return queryset.filter(pk__in=sorted(dish_ids))
+    if dish_ids is None and len(excluded) <= MAX_ID_LIST:
+        return queryset.exclude(pk__in=sorted(excluded))
+    # Too unselective for an id list: one semi-join per ingredient.
+    links = DishIngredient.objects.using(using)
+    for ingredient_id in set(all_of):
+        queryset = queryset.filter(
+            pk__in=Subquery(
+                links.filter(ingredient_id=ingredient_id).values("dish_id")
+            )
+        )
+    if none_of:
+        queryset = queryset.exclude(
+            pk__in=Subquery(
+                links.filter(ingredient_id__in=set(none_of)).values(
+                    "dish_id"
+                )
+            )
+        )
+    return queryset
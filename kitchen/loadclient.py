@@ -0,0 +1,197 @@
+"""
+The HTTP client and latency statistics shared by the ``loadtest`` and
+``benchmark_views`` commands.
+"""
+import asyncio
+import statistics
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from http.cookies import SimpleCookie
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management.base import CommandError
+
+
+class Session:
+    """
+    One logged-in client on a keep-alive HTTP/1.1 connection, spoken
+    directly over asyncio streams.
+    """
+
+    def __init__(self, base_url, timeout):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise CommandError(f"Not an http(s) URL: {base_url}")
+        self.ssl = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.ssl else 80)
+        self.netloc = parts.netloc
+        self.timeout = timeout
+        self.cookies = {}
+        self.reader = self.writer = None
+
+    def _store_cookies(self, header):
+        # Keep each cookie with the monotonic time it expires at, if any; a
+        # zero Max-Age or a past Expires removes it, as a browser would.
+        now = time.monotonic()
+        for morsel in SimpleCookie(header).values():
+            expires_at = None
+            if morsel["max-age"]:
+                expires_at = now + int(morsel["max-age"])
+            elif morsel["expires"]:
+                expires = parsedate_to_datetime(morsel["expires"])
+                expires_at = now + (
+                    expires - datetime.now(timezone.utc)
+                ).total_seconds()
+            if expires_at is not None and expires_at <= now:
+                self.cookies.pop(morsel.key, None)
+            else:
+                self.cookies[morsel.key] = (morsel.value, expires_at)
+
+    def _live_cookies(self):
+        now = time.monotonic()
+        self.cookies = {
+            name: (value, expires_at)
+            for name, (value, expires_at) in self.cookies.items()
+            if expires_at is None or expires_at > now
+        }
+        return {name: value for name, (value, _) in self.cookies.items()}
+
+    def cookie(self, name):
+        """The current value of cookie ``name``, or ``None``."""
+        return self._live_cookies().get(name)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.reader = self.writer = None
+
+    async def request(self, method, path, data=None):
+        """Send one request; return its status code and body."""
+        reused = self.writer is not None
+        try:
+            return await asyncio.wait_for(
+                self._exchange(method, path, data), self.timeout
+            )
+        except (ConnectionError, asyncio.IncompleteReadError):
+            await self.close()
+            if not reused:
+                raise
+        # The server dropped the idle keep-alive connection; retry fresh.
+        return await asyncio.wait_for(
+            self._exchange(method, path, data), self.timeout
+        )
+
+    async def timed_request(self, method, path, data=None):
+        """
+        Send one request; return its latency in seconds and whether it got
+        an answer below 400.
+        """
+        started = time.perf_counter()
+        try:
+            status, _ = await self.request(method, path, data)
+            ok = status < 400
+        except (OSError, ValueError, asyncio.TimeoutError,
+                asyncio.IncompleteReadError):
+            await self.close()
+            ok = False
+        return time.perf_counter() - started, ok
+
+    async def _exchange(self, method, path, data):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port, ssl=self.ssl
+            )
+        body = urlencode(data, doseq=True).encode() if data else b""
+        lines = [
+            f"{method} {path} HTTP/1.1",
+            f"Host: {self.netloc}",
+            "Accept-Encoding: identity",
+        ]
+        cookies = self._live_cookies()
+        if cookies:
+            lines.append(
+                "Cookie: " + "; ".join(f"{k}={v}" for k, v in cookies.items())
+            )
+        if method != "GET":
+            lines += [
+                "Content-Type: application/x-www-form-urlencoded",
+                f"Content-Length: {len(body)}",
+            ]
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by the server.")
+        status = int(status_line.split()[1])
+        headers = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "set-cookie":
+                self._store_cookies(value)
+            else:
+                headers[name] = value
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while size := int(
+                (await self.reader.readline()).split(b";")[0], 16
+            ):
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readexactly(2)
+            while await self.reader.readline() not in (b"\r\n", b""):
+                pass  # trailers
+            content = b"".join(chunks)
+        elif "content-length" in headers:
+            content = await self.reader.readexactly(
+                int(headers["content-length"])
+            )
+        elif status in (204, 304) or 100 <= status < 200:
+            content = b""
+        else:
+            content = await self.reader.read()
+            headers["connection"] = "close"
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, content
+
+    def form(self, **fields):
+        """``fields`` plus the CSRF token a Django form post needs."""
+        token = self.cookie(settings.CSRF_COOKIE_NAME) or ""
+        return {**fields, "csrfmiddlewaretoken": token}
+
+    async def login(self, username, password):
+        await self.request("GET", settings.LOGIN_URL)
+        await self.request(
+            "POST",
+            settings.LOGIN_URL,
+            self.form(username=username, password=password),
+        )
+        if self.cookie(settings.SESSION_COOKIE_NAME) is None:
+            raise CommandError(f"Could not log in as {username}.")
+
+
+def summarize(latencies, errors, elapsed):
+    """Request count, error count, req/s and p50/p95/p99 in ms."""
+    latencies = sorted(latencies)
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": p50 * 1000,
+        "p95_ms": p95 * 1000,
+        "p99_ms": p99 * 1000,
+    }
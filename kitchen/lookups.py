@@ -0,0 +1,37 @@
+from django.db.models import CharField
+from django.db.models.lookups import IContains, IStartsWith
+
+
+class TrigramPatternMixin:
+    """
+    Compile a case-insensitive pattern lookup to ``col ILIKE %s`` on
+    PostgreSQL so pg_trgm GIN indexes can serve it.
+
+    Django's own case-insensitive lookups compile to
+    ``UPPER(col::text) LIKE UPPER(%s)`` there, which no plain column index
+    matches. Every other backend gets the SQL of ``fallback``.
+    """
+
+    fallback = None
+
+    def as_sql(self, compiler, connection):
+        return self.fallback(self.lhs, self.rhs).as_sql(compiler, connection)
+
+    def as_postgresql(self, compiler, connection):
+        if not self.rhs_is_direct_value():
+            return self.as_sql(compiler, connection)
+        lhs_sql, lhs_params = self.process_lhs(compiler, connection)
+        rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs_sql} ILIKE {rhs_sql}", (*lhs_params, *rhs_params)
+
+
+@CharField.register_lookup
+class TrigramContains(TrigramPatternMixin, IContains):
+    lookup_name = "trigram_contains"
+    fallback = IContains
+
+
+@CharField.register_lookup
+class TrigramStartsWith(TrigramPatternMixin, IStartsWith):
+    lookup_name = "trigram_startswith"
+    fallback = IStartsWith
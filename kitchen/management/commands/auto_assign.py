@@ -0,0 +1,62 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, IntegrityError
+
+from kitchen.assignments import auto_assign
+
+
+class Command(BaseCommand):
+    help = (
+        "Staff every dish that has fewer than --cooks-per-dish cooks, "
+        "spreading the dishes over the active cooks by experience and "
+        "current load."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--cooks-per-dish",
+            type=int,
+            default=1,
+            help="Cooks every dish should end up with.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Plan and report the assignment without writing it.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to assign cooks on.",
+        )
+
+    def handle(self, *args, **options):
+        if options["cooks_per_dish"] < 1:
+            raise CommandError("--cooks-per-dish must be at least 1.")
+        started = time.monotonic()
+        try:
+            pairs = auto_assign(
+                cooks_per_dish=options["cooks_per_dish"],
+                dry_run=options["dry_run"],
+                using=options["database"],
+            )
+        except IntegrityError as error:
+            raise CommandError(
+                "Cooks were assigned while the plan was being applied; "
+                "nothing was written, run the command again."
+            ) from error
+        elapsed = time.monotonic() - started
+        new_dishes = Counter(cook_id for _, cook_id in pairs)
+        if options["verbosity"] >= 2:
+            for cook_id, count in new_dishes.most_common():
+                self.stdout.write(f"cook {cook_id}: +{count} dishes")
+        verb = "Would assign" if options["dry_run"] else "Assigned"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {len(pairs)} dish cooks over "
+                f"{len({dish_id for dish_id, _ in pairs})} dishes and "
+                f"{len(new_dishes)} cooks in {elapsed:.2f}s."
+            )
+        )
@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import reverse
+
+from kitchen.loadclient import Session, summarize
+from kitchen.models import Cook, Dish
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and latency of the kitchen pages served by a "
+        "WSGI server and by an ASGI server running the async views."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--wsgi-url",
+            default="http://127.0.0.1:8000",
+            help="Base URL of the gunicorn WSGI server.",
+        )
+        parser.add_argument(
+            "--asgi-url",
+            default="http://127.0.0.1:8001",
+            help="Base URL of the ASGI server.",
+        )
+        parser.add_argument("--username", required=True)
+        parser.add_argument("--password", required=True)
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Requests sent to each server.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=10,
+            help="Requests in flight at once.",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help="Path to request; repeat to cycle through several. "
+            "Defaults to the list pages and the first dish and cook.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=30.0,
+            help="Seconds to wait for each response.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to pick detail pages from.",
+        )
+
+    def default_paths(self, using):
+        paths = [
+            reverse("kitchen:dish-list"),
+            reverse("kitchen:cook-list"),
+            reverse("kitchen:dish-type-list"),
+            reverse("kitchen:ingredient-list"),
+        ]
+        dish_id = (
+            Dish.objects.using(using).values_list("pk", flat=True).first()
+        )
+        cook_id = (
+            Cook.objects.using(using).values_list("pk", flat=True).first()
+        )
+        if dish_id is not None:
+            paths.append(reverse("kitchen:dish-detail", args=[dish_id]))
+        if cook_id is not None:
+            paths.append(reverse("kitchen:cook-detail", args=[cook_id]))
+        return paths
+
+    async def worker(self, session, schedule, latencies):
+        errors = 0
+        while schedule:
+            latency, ok = await session.timed_request("GET", schedule.pop())
+            latencies.append(latency)
+            errors += not ok
+        return errors
+
+    async def run(self, url, options, paths):
+        sessions = [
+            Session(url, options["timeout"])
+            for _ in range(options["concurrency"])
+        ]
+        try:
+            # Log in once; every connection then shares the session.
+            await sessions[0].login(options["username"], options["password"])
+            for session in sessions[1:]:
+                session.cookies = dict(sessions[0].cookies)
+            for path in paths:
+                # Warm up caches and open the connections.
+                await asyncio.gather(
+                    *(session.request("GET", path) for session in sessions)
+                )
+            total = options["requests"]
+            schedule = [paths[index % len(paths)] for index in range(total)]
+            latencies = []
+            started = time.perf_counter()
+            errors = await asyncio.gather(
+                *(
+                    self.worker(session, schedule, latencies)
+                    for session in sessions
+                )
+            )
+            return summarize(
+                latencies, sum(errors), time.perf_counter() - started
+            )
+        finally:
+            await asyncio.gather(*(session.close() for session in sessions))
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2 or options["concurrency"] < 1:
+            raise CommandError(
+                "Need at least 2 requests and a concurrency of 1."
+            )
+        paths = options["paths"] or self.default_paths(options["database"])
+        results = {}
+        for name in ("wsgi", "asgi"):
+            url = options[f"{name}_url"]
+            try:
+                results[name] = result = asyncio.run(
+                    self.run(url, options, paths)
+                )
+            except OSError as error:
+                raise CommandError(f"{url} is not reachable: {error}")
+            self.stdout.write(
+                f"{name} {url}: "
+                f"{result['requests_per_second']:.1f} req/s, "
+                f"p50 {result['p50_ms']:.1f} ms, "
+                f"p95 {result['p95_ms']:.1f} ms, "
+                f"{result['errors']} errors"
+            )
+        speedup = (
+            results["asgi"]["requests_per_second"]
+            / results["wsgi"]["requests_per_second"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"ASGI throughput is {speedup:.2f}x WSGI.")
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from kitchen import ingredient_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Merge the pending link changes of every ingredient into its "
+        "inverted index postings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to compact the index on.",
+        )
+
+    def handle(self, *args, **options):
+        compacted = ingredient_index.compact_ingredient_index(
+            using=options["database"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Compacted {compacted} ingredients.")
+        )
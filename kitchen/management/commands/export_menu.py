@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from kitchen.exports import CHUNK_SIZE, WRITERS, iter_dishes
+
+
+class Command(BaseCommand):
+    help = "Stream the full menu to a CSV or JSON Lines file."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--format",
+            choices=sorted(WRITERS),
+            default="csv",
+            help="Output format.",
+        )
+        parser.add_argument(
+            "--output",
+            default="-",
+            help="File to write, or - for standard output.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_SIZE,
+            help="Dishes fetched per query.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to export from.",
+        )
+
+    def handle(self, *args, **options):
+        writer, _ = WRITERS[options["format"]]
+        dishes = iter_dishes(options["database"], options["chunk_size"])
+        output = options["output"]
+        if output == "-":
+            stream = self.stdout
+        else:
+            stream = open(output, "w", newline="", encoding="utf-8")
+        try:
+            for chunk in writer(dishes):
+                stream.write(chunk)
+        finally:
+            if stream is not self.stdout:
+                stream.close()
@@ -0,0 +1,293 @@
+import csv
+import itertools
+import json
+import sys
+import time
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from kitchen import analytics, counters, ingredient_index, search, versioning
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+DishCook = Dish.cooks.through
+DishIngredient = Dish.ingredients.through
+
+
+def split_names(column, value):
+    """A list of names, or a string of them separated by semicolons."""
+    if isinstance(value, str):
+        value = value.split(";")
+    if not isinstance(value, list) or not all(
+        isinstance(name, str) for name in value
+    ):
+        raise ValidationError(f"{column}: Expected a list of names.")
+    return [name.strip() for name in value if name.strip()]
+
+
+def clean_field(column, model, field, value):
+    """``value`` checked against the model field's type and limits."""
+    if isinstance(value, str):
+        value = value.strip()
+    try:
+        return model._meta.get_field(field).clean(value, None)
+    except ValidationError as error:
+        raise ValidationError(f"{column}: {' '.join(error.messages)}")
+
+
+def read_csv(stream):
+    yield from csv.DictReader(stream)
+
+
+def read_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            yield json.loads(line)
+
+
+READERS = {"csv": read_csv, "jsonl": read_jsonl}
+
+
+class NameMap:
+    """
+    In-memory ``name -> id`` lookup that fetches unseen names in one query
+    per batch and bulk-creates the ones still missing.
+    """
+
+    def __init__(self, model, field, using, create=True):
+        self.model = model
+        self.field = field
+        self.using = using
+        self.create = create
+        self.ids = {}
+        self.created = 0
+
+    def resolve(self, names):
+        missing = set(names) - self.ids.keys()
+        if not missing:
+            return
+        queryset = self.model.objects.using(self.using).filter(
+            **{f"{self.field}__in": missing}
+        )
+        for pk, name in queryset.order_by("-pk").values_list(
+            "pk", self.field
+        ):
+            self.ids[name] = pk
+        missing -= self.ids.keys()
+        if missing and self.create:
+            objs = self.model.objects.using(self.using).bulk_create(
+                self.model(**{self.field: name}) for name in sorted(missing)
+            )
+            for obj in objs:
+                self.ids[getattr(obj, self.field)] = obj.pk
+            self.created += len(objs)
+
+    def __getitem__(self, name):
+        return self.ids[name]
+
+    def get(self, name):
+        return self.ids.get(name)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream dishes from a CSV or JSON Lines file into the menu, "
+        "creating missing dish types and ingredients by name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path",
+            help="File to import, or - to read standard input.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="Input format. Defaults to the file extension.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Dishes inserted per transaction.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to import into.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or path.rsplit(".", 1)[-1].lower()
+        if fmt == "json":
+            fmt = "jsonl"
+        if fmt not in READERS:
+            raise CommandError(
+                "Cannot tell the input format; pass --format csv or jsonl."
+            )
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        self.using = options["database"]
+        self.verbosity = options["verbosity"]
+        self.dish_types = NameMap(DishType, "name", self.using)
+        self.ingredients = NameMap(Ingredient, "name", self.using)
+        self.cooks = NameMap(Cook, "username", self.using, create=False)
+        self.imported = self.skipped = self.unknown_cooks = 0
+        self.imported_dish_types = set()
+
+        stream = (
+            sys.stdin
+            if path == "-"
+            else open(path, newline="", encoding="utf-8")
+        )
+        started = time.monotonic()
+        try:
+            rows = enumerate(READERS[fmt](stream), start=1)
+            while batch := list(
+                itertools.islice(rows, options["batch_size"])
+            ):
+                self.import_batch(batch)
+                self.report(started)
+        except (json.JSONDecodeError, csv.Error) as error:
+            raise CommandError(f"Could not parse {path}: {error}")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        if self.dish_types.created or self.ingredients.created:
+            versioning.bump_version("dishtype")
+            versioning.bump_version("ingredient")
+        analytics.rebuild_menu_analytics(
+            self.using, dish_type_ids=self.imported_dish_types
+        )
+        versioning.bump_version("dish")
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {self.imported} dishes in {elapsed:.1f}s "
+                f"({self.imported / max(elapsed, 1e-9):.0f} rows/s); "
+                f"created {self.dish_types.created} dish types and "
+                f"{self.ingredients.created} ingredients; "
+                f"skipped {self.skipped} rows and "
+                f"{self.unknown_cooks} unknown cooks."
+            )
+        )
+
+    def clean_row(self, line, row):
+        """
+        Validate ``row`` against the model fields, so a bad row is skipped
+        here instead of failing its whole batch in the database.
+        """
+        try:
+            if not isinstance(row, dict):
+                raise ValidationError("Not an object.")
+            description = row.get("description") or ""
+            if not isinstance(description, str):
+                raise ValidationError("description: Not text.")
+            return {
+                "name": clean_field("name", Dish, "name", row.get("name")),
+                "description": description,
+                "price": clean_field(
+                    "price", Dish, "price", row.get("price")
+                ),
+                "dish_type": clean_field(
+                    "dish_type", DishType, "name", row.get("dish_type")
+                ),
+                "ingredients": [
+                    clean_field("ingredients", Ingredient, "name", name)
+                    for name in split_names(
+                        "ingredients", row.get("ingredients") or []
+                    )
+                ],
+                "cooks": split_names("cooks", row.get("cooks") or []),
+            }
+        except ValidationError as error:
+            self.stderr.write(
+                f"Row {line}: skipped ({' '.join(error.messages)})"
+            )
+            self.skipped += 1
+            return None
+
+    def import_batch(self, batch):
+        rows = [
+            cleaned
+            for cleaned in (self.clean_row(line, row) for line, row in batch)
+            if cleaned
+        ]
+        if not rows:
+            return
+        with transaction.atomic(using=self.using):
+            created = self.dish_types.created, self.ingredients.created
+            self.dish_types.resolve(row["dish_type"] for row in rows)
+            self.ingredients.resolve(
+                name for row in rows for name in row["ingredients"]
+            )
+            for name, name_map, before in zip(
+                ("dish_types", "ingredients"),
+                (self.dish_types, self.ingredients),
+                created,
+            ):
+                if name_map.created > before:
+                    counters.adjust_counter(
+                        name, name_map.created - before, self.using
+                    )
+            self.cooks.resolve(
+                username for row in rows for username in row["cooks"]
+            )
+            dishes = Dish.objects.using(self.using).bulk_create(
+                Dish(
+                    name=row["name"],
+                    description=row["description"],
+                    price=row["price"],
+                    dish_type_id=self.dish_types[row["dish_type"]],
+                    ingredient_count=len(
+                        {self.ingredients[name] for name in row["ingredients"]}
+                    ),
+                )
+                for row in rows
+            )
+            ingredient_pairs = {
+                (dish.pk, self.ingredients[name])
+                for dish, row in zip(dishes, rows)
+                for name in row["ingredients"]
+            }
+            DishIngredient.objects.using(self.using).bulk_create(
+                DishIngredient(dish_id=dish_id, ingredient_id=ingredient_id)
+                for dish_id, ingredient_id in ingredient_pairs
+            )
+            ingredient_index.add_links(ingredient_pairs, using=self.using)
+            cook_pairs = set()
+            for dish, row in zip(dishes, rows):
+                for username in row["cooks"]:
+                    cook_id = self.cooks.get(username)
+                    if cook_id is None:
+                        self.unknown_cooks += 1
+                    else:
+                        cook_pairs.add((dish.pk, cook_id))
+            DishCook.objects.using(self.using).bulk_create(
+                DishCook(dish_id=dish_id, cook_id=cook_id)
+                for dish_id, cook_id in cook_pairs
+            )
+            # The links bypass m2m_changed; cook_count is left at zero for
+            # this to fill in along with the cooks' dish_count.
+            counters.adjust_relation_pairs(DishCook, cook_pairs, 1, self.using)
+            dish_ids = [dish.pk for dish in dishes]
+            search.index_dishes(dish_ids, using=self.using)
+            self.imported_dish_types.update(
+                dish.dish_type_id for dish in dishes
+            )
+            counters.adjust_counter("dishes", len(dishes), self.using)
+        self.imported += len(dishes)
+
+    def report(self, started):
+        if self.verbosity < 2:
+            return
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            f"{self.imported} dishes "
+            f"({self.imported / max(elapsed, 1e-9):.0f} rows/s)"
+        )
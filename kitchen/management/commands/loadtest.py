@@ -0,0 +1,277 @@
+import asyncio
+import json
+import random
+import time
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS
+from django.urls import reverse
+
+from kitchen.loadclient import Session, summarize
+from kitchen.models import Cook, Dish
+
+# URL name -> share of requests, out of their sum.
+DEFAULT_MIX = {
+    "kitchen:dish-list": 30,
+    "kitchen:dish-detail": 20,
+    "kitchen:cook-detail": 15,
+    "kitchen:cook-list": 10,
+    "kitchen:toggle-dish-assign": 10,
+    "kitchen:ingredient-list": 5,
+    "kitchen:dish-type-list": 5,
+    "kitchen:ingredient-autocomplete": 5,
+}
+SAMPLE_SIZE = 1000  # dish and cook ids the detail scenarios pick from
+AUTOCOMPLETE_TERMS = ("a", "be", "ch", "on", "to")
+
+
+class Scenarios:
+    """Builds the request each URL name in the mix sends."""
+
+    def __init__(self, dish_ids, cook_ids):
+        self.dish_ids = dish_ids
+        self.cook_ids = cook_ids
+
+    def request(self, name, session, rng):
+        """``(method, path, data)`` for one request to ``name``."""
+        if name == "kitchen:toggle-dish-assign":
+            dish_id = rng.choice(self.dish_ids)
+            return "POST", reverse(name, args=[dish_id]), session.form()
+        if name == "kitchen:dish-detail":
+            dish_id = rng.choice(self.dish_ids)
+            return "GET", reverse(name, args=[dish_id]), None
+        if name == "kitchen:cook-detail":
+            cook_id = rng.choice(self.cook_ids)
+            return "GET", reverse(name, args=[cook_id]), None
+        if name.endswith("-autocomplete"):
+            term = urlencode({"term": rng.choice(AUTOCOMPLETE_TERMS)})
+            return "GET", f"{reverse(name)}?{term}", None
+        return "GET", reverse(name), None
+
+
+def parse_mix(entries):
+    """``NAME=WEIGHT`` entries as a mix, or the default one."""
+    if not entries:
+        return dict(DEFAULT_MIX)
+    mix = {}
+    for entry in entries:
+        name, _, weight = entry.rpartition("=")
+        if name not in DEFAULT_MIX:
+            raise CommandError(
+                f"Unknown scenario {name!r}; choose from "
+                f"{', '.join(DEFAULT_MIX)}."
+            )
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f"Invalid weight in {entry!r}.")
+    if not any(weight > 0 for weight in mix.values()):
+        raise CommandError("At least one scenario needs a positive weight.")
+    return mix
+
+
+class Command(BaseCommand):
+    help = (
+        "Load test a running server: log in as seeded cooks, drive a "
+        "weighted mix of kitchen pages from asyncio workers and report "
+        "latency percentiles and throughput per URL name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--url",
+            default="http://127.0.0.1:8000",
+            help="Base URL of the server under test.",
+        )
+        parser.add_argument(
+            "--password",
+            required=True,
+            help="Password shared by the cooks, as given to seed_kitchen.",
+        )
+        parser.add_argument(
+            "--users",
+            type=int,
+            default=10,
+            help="Cooks to log in as; workers share them round robin.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Requests sent in total.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=10,
+            help="Workers, each with one request in flight.",
+        )
+        parser.add_argument(
+            "--mix",
+            action="append",
+            metavar="NAME=WEIGHT",
+            help="Weight of a URL name in the scenario mix; repeat for "
+            "each. Defaults to "
+            + ", ".join(f"{k}={v}" for k, v in DEFAULT_MIX.items())
+            + ".",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed for the order of scenarios and the rows they use.",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=30.0,
+            help="Seconds to wait for each response.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results as JSON to this file.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to pick cooks and dishes from.",
+        )
+
+    def seeded_cooks(self, using, count):
+        return list(
+            Cook.objects.using(using)
+            .filter(is_active=True, is_superuser=False)
+            .order_by("pk")
+            .values_list("username", flat=True)[:count]
+        )
+
+    async def worker(self, session, scenarios, schedule, results, rng):
+        while schedule:
+            name = schedule.pop()
+            method, path, data = scenarios.request(name, session, rng)
+            latency, ok = await session.timed_request(method, path, data)
+            record = results[name]
+            record[0].append(latency)
+            if not ok:
+                record[1] += 1
+
+    async def run(self, options, usernames, scenarios, schedule):
+        sessions = [
+            Session(options["url"], options["timeout"])
+            for _ in range(options["concurrency"])
+        ]
+        try:
+            await asyncio.gather(
+                *(
+                    session.login(
+                        usernames[index % len(usernames)],
+                        options["password"],
+                    )
+                    for index, session in enumerate(sessions)
+                )
+            )
+            results = {name: [[], 0] for name in set(schedule)}
+            started = time.perf_counter()
+            await asyncio.gather(
+                *(
+                    self.worker(
+                        session,
+                        scenarios,
+                        schedule,
+                        results,
+                        random.Random(options["seed"] + index),
+                    )
+                    for index, session in enumerate(sessions)
+                )
+            )
+            return results, time.perf_counter() - started
+        finally:
+            await asyncio.gather(*(session.close() for session in sessions))
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1 or options["concurrency"] < 1:
+            raise CommandError(
+                "Need at least 1 request and a concurrency of 1."
+            )
+        mix = parse_mix(options["mix"])
+        using = options["database"]
+        usernames = self.seeded_cooks(using, options["users"])
+        if not usernames:
+            raise CommandError("No cooks to log in as; seed some first.")
+        dish_ids = list(
+            Dish.objects.using(using)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:SAMPLE_SIZE]
+        )
+        cook_ids = list(
+            Cook.objects.using(using)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:SAMPLE_SIZE]
+        )
+        if not dish_ids:
+            raise CommandError("No dishes to request; seed some first.")
+
+        rng = random.Random(options["seed"])
+        names = [name for name, weight in mix.items() if weight > 0]
+        schedule = rng.choices(
+            names, weights=[mix[name] for name in names],
+            k=options["requests"],
+        )
+        started_at = datetime.now(timezone.utc)
+        try:
+            results, elapsed = asyncio.run(
+                self.run(
+                    options, usernames, Scenarios(dish_ids, cook_ids),
+                    schedule,
+                )
+            )
+        except OSError as error:
+            raise CommandError(f"{options['url']} is not reachable: {error}")
+
+        summaries = {
+            name: summarize(latencies, errors, elapsed)
+            for name, (latencies, errors) in sorted(results.items())
+        }
+        total = summarize(
+            [t for latencies, _ in results.values() for t in latencies],
+            sum(errors for _, errors in results.values()),
+            elapsed,
+        )
+
+        width = max(len(name) for name in [*summaries, "total"])
+        self.stdout.write(
+            f"{'URL name'.ljust(width)}  {'requests':>8}  {'errors':>6}  "
+            f"{'req/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}"
+        )
+        for name, row in [*summaries.items(), ("total", total)]:
+            self.stdout.write(
+                f"{name.ljust(width)}  {row['requests']:>8}  "
+                f"{row['errors']:>6}  {row['requests_per_second']:>8.1f}  "
+                f"{row['p50_ms']:>8.1f}  {row['p95_ms']:>8.1f}  "
+                f"{row['p99_ms']:>8.1f}"
+            )
+
+        if options["output"]:
+            report = {
+                "started_at": started_at.isoformat(),
+                "url": options["url"],
+                "users": len(usernames),
+                "concurrency": options["concurrency"],
+                "seed": options["seed"],
+                "mix": mix,
+                "elapsed_seconds": elapsed,
+                "total": total,
+                "urls": summaries,
+            }
+            with open(options["output"], "w", encoding="utf-8") as stream:
+                json.dump(report, stream, indent=2)
+                stream.write("\n")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total['requests']} requests in {elapsed:.2f}s, "
+                f"{total['requests_per_second']:.1f} req/s, "
+                f"{total['errors']} errors."
+            )
+        )
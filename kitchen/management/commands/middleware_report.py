@@ -0,0 +1,159 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.handlers.base import BaseHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.test.utils import override_settings
+from django.urls import include, path
+
+# Imports each middleware module in MIDDLEWARE order after django.setup(),
+# the way a fresh worker does, and prints the seconds each one took.
+IMPORT_PROBE = """
+import importlib, json, sys, time
+import django
+django.setup()
+timings = []
+for module in sys.argv[1:]:
+    started = time.perf_counter()
+    importlib.import_module(module)
+    timings.append(time.perf_counter() - started)
+print(json.dumps(timings))
+"""
+
+
+def ok(request):
+    return HttpResponse("ok")
+
+
+class Probe:
+    """
+    Placed between every two middleware, records when a request passes it
+    on the way in and when the response passes it on the way out.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mark = [time.perf_counter(), None]
+        request.probe_marks.append(mark)
+        response = self.get_response(request)
+        mark[1] = time.perf_counter()
+        return response
+
+
+def exclusive_times(marks, count):
+    """
+    Seconds spent in each of ``count`` middleware, excluding the ones
+    inside it, from the marks of the probes around them.
+    """
+    times = []
+    for index in range(count):
+        if index >= len(marks):  # never reached
+            times.append(0.0)
+            continue
+        outer = marks[index]
+        inner = marks[index + 1] if index + 1 < len(marks) else None
+        if inner is None:  # answered without calling the next middleware
+            times.append(outer[1] - outer[0])
+        else:
+            times.append(inner[0] - outer[0] + outer[1] - inner[1])
+    return times
+
+
+# Requests are resolved against this module, so the view itself costs
+# next to nothing and the timings are the middleware's alone. The project
+# URLs stay reversible for middleware that renders links.
+urlpatterns = [path("", ok), path("", include(settings.ROOT_URLCONF))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Report how much import time and per-request overhead each entry "
+        "of MIDDLEWARE adds under the active settings profile."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Requests timed through each middleware chain.",
+        )
+
+    def import_times(self, modules):
+        result = subprocess.run(
+            [sys.executable, "-c", IMPORT_PROBE, *modules],
+            env={
+                **os.environ,
+                "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE,
+            },
+            capture_output=True,
+            text=True,
+        )
+        if result.returncode:
+            raise CommandError(
+                f"Could not import the middleware:\n{result.stderr}"
+            )
+        return json.loads(result.stdout.splitlines()[-1])
+
+    def request_times(self, middleware, requests):
+        """Median seconds each middleware adds to a request."""
+        probe = f"{__name__}.Probe"
+        chain = [probe]
+        for entry in middleware:
+            chain += [entry, probe]
+        with override_settings(
+            MIDDLEWARE=chain,
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+        ):
+            handler = BaseHandler()
+            handler.load_middleware()
+            factory = RequestFactory(REMOTE_ADDR="127.0.0.1")
+            samples = []
+            for _ in range(requests + 1):
+                request = factory.get("/")
+                request.urlconf = __name__
+                request.probe_marks = []
+                handler.get_response(request)
+                samples.append(
+                    exclusive_times(request.probe_marks, len(middleware))
+                )
+        # The first request pays for lazy imports and template loading.
+        return [statistics.median(column) for column in zip(*samples[1:])]
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("Need at least 1 request.")
+        middleware = list(settings.MIDDLEWARE)
+        imports = self.import_times(
+            [entry.rpartition(".")[0] for entry in middleware]
+        )
+
+        overheads = self.request_times(middleware, options["requests"])
+
+        width = max(len(entry) for entry in middleware)
+        self.stdout.write(
+            f"{'Middleware'.ljust(width)}  {'import ms':>9}  "
+            f"{'request us':>10}"
+        )
+        for entry, imported, overhead in zip(middleware, imports, overheads):
+            self.stdout.write(
+                f"{entry.ljust(width)}  {imported * 1000:>9.1f}  "
+                f"{overhead * 1e6:>10.1f}"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(middleware)} middleware add "
+                f"{sum(imports) * 1000:.1f} ms of imports and "
+                f"{sum(overheads) * 1e6:.1f} us to every request "
+                f"({settings.SETTINGS_MODULE})."
+            )
+        )
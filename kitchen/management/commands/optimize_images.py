@@ -0,0 +1,53 @@
+from django.core.management.base import BaseCommand
+
+from kitchen.images import (
+    assets_root,
+    available_formats,
+    build_variants,
+    page_savings,
+)
+
+
+def _size(count):
+    if count < 1024:
+        return f"{count} B"
+    if count < 1024 * 1024:
+        return f"{count / 1024:.1f} KB"
+    return f"{count / 1024 / 1024:.1f} MB"
+
+
+class Command(BaseCommand):
+    help = (
+        "Write resized WebP/AVIF variants of the collected images and the "
+        "manifest the kitchen_images template tags read. Run after "
+        "collectstatic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Re-encode variants that are already up to date.",
+        )
+
+    def handle(self, *args, **options):
+        formats = ", ".join(fmt for fmt, _, _ in available_formats())
+        self.stdout.write(f"Encoding {formats} variants in {assets_root()}")
+        manifest = build_variants(force=options["force"])
+        variants = sum(len(entry["variants"]) for entry in manifest.values())
+        self.stdout.write(f"{len(manifest)} images, {variants} variants")
+
+        total_original = total_optimized = 0
+        for template, original, optimized in page_savings(manifest):
+            total_original += original
+            total_optimized += optimized
+            self.stdout.write(
+                f"{template}: {_size(original)} -> {_size(optimized)} "
+                f"(saved {_size(original - optimized)})"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Pages load {_size(total_optimized)} of images instead of "
+                f"{_size(total_original)}."
+            )
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from kitchen import ingredient_index
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the ingredient to dish inverted index from all dish "
+        "ingredients in bulk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to rebuild the index on.",
+        )
+
+    def handle(self, *args, **options):
+        indexed = ingredient_index.rebuild_ingredient_index(
+            using=options["database"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {indexed} ingredients.")
+        )
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from kitchen import analytics
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per-dish-type price analytics from all dishes in "
+        "bulk."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to rebuild the analytics on.",
+        )
+
+    def handle(self, *args, **options):
+        summarized = analytics.rebuild_menu_analytics(
+            using=options["database"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Summarized {summarized} dish types.")
+        )
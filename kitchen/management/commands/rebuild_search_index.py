@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from kitchen import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for all dishes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to rebuild the index on.",
+        )
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        with transaction.atomic(using=using):
+            indexed = search.rebuild_index(using=using)
+        self.stdout.write(
+            self.style.SUCCESS(f"Indexed {indexed} dishes.")
+        )
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from kitchen.counters import (
+    read_counters,
+    reconcile_counters,
+    reconcile_relation_counts,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Recount cooks, dishes, dish types and ingredients and fix any "
+        "drift in the dashboard counters and the stored per-row cook, "
+        "dish and ingredient counts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to reconcile the counters on.",
+        )
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        with transaction.atomic(using=using):
+            before = read_counters(using=using)
+            after = reconcile_counters(using=using)
+            fixed = reconcile_relation_counts(using=using)
+        for name, value in after.items():
+            drift = value - before.get(name, value)
+            self.stdout.write(f"{name}: {value} (drift {drift:+d})")
+        for name, rows in fixed.items():
+            self.stdout.write(f"{name}: {rows} rows fixed")
+        self.stdout.write(self.style.SUCCESS("Counters reconciled."))
@@ -0,0 +1,332 @@
+import itertools
+import random
+import time
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from kitchen import analytics, counters, ingredient_index, search, versioning
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+DishCook = Dish.cooks.through
+DishIngredient = Dish.ingredients.through
+
+USERNAME_PREFIX = "seed_cook_"
+DISH_TYPES = (
+    "Appetizer", "Bread", "Breakfast", "Casserole", "Curry", "Dessert",
+    "Dumplings", "Grill", "Noodles", "Pasta", "Pastry", "Pie", "Pizza",
+    "Porridge", "Risotto", "Roast", "Salad", "Sandwich", "Sauce", "Seafood",
+    "Side", "Skewers", "Soup", "Stew", "Stir-fry", "Taco", "Tart",
+)
+PRODUCE = (
+    "Apple", "Asparagus", "Basil", "Bean", "Beef", "Beet", "Butter",
+    "Cabbage", "Carrot", "Cheese", "Chicken", "Chickpea", "Chili", "Cod",
+    "Corn", "Cream", "Cucumber", "Dill", "Duck", "Egg", "Eggplant", "Garlic",
+    "Ginger", "Honey", "Lamb", "Leek", "Lemon", "Lentil", "Mushroom",
+    "Mustard", "Noodle", "Oat", "Olive", "Onion", "Paprika", "Parsley",
+    "Pea", "Pepper", "Pork", "Potato", "Pumpkin", "Rice", "Salmon",
+    "Shrimp", "Spinach", "Tofu", "Tomato", "Walnut", "Wheat", "Yogurt",
+)
+VARIETIES = (
+    "", "Baby", "Black", "Dried", "Fresh", "Golden", "Green", "Pickled",
+    "Red", "Roasted", "Smoked", "Sweet", "White", "Wild", "Young",
+)
+STYLES = (
+    "Classic", "Country", "Crispy", "Festive", "Grandma's", "Hearty",
+    "Homestyle", "Rustic", "Spicy", "Summer", "Winter",
+)
+FIRST_NAMES = (
+    "Anna", "Boris", "Chloe", "Dmytro", "Elena", "Farid", "Greta", "Hugo",
+    "Iryna", "Jonas", "Kateryna", "Luca", "Maria", "Nikolai", "Olga",
+    "Pavlo", "Quentin", "Rosa", "Sofia", "Taras", "Uma", "Victor", "Wanda",
+    "Yusuf", "Zoe",
+)
+LAST_NAMES = (
+    "Bondar", "Costa", "Dubois", "Fischer", "Garcia", "Hoffmann", "Ivanova",
+    "Kovalenko", "Laurent", "Melnyk", "Novak", "Petrenko", "Rossi",
+    "Schmidt", "Shevchenko", "Tkachenko", "Weber", "Yamamoto",
+)
+
+
+def numbered(names):
+    """``names``, then ``names`` with 2, 3, ... appended, without end."""
+    yield from names
+    for number in itertools.count(2):
+        for name in names:
+            yield f"{name} {number}"
+
+
+def ingredient_names():
+    yield from numbered(
+        [
+            f"{variety} {produce}".strip()
+            for variety in VARIETIES
+            for produce in PRODUCE
+        ]
+    )
+
+
+def zipf_weights(count, exponent):
+    """
+    Cumulative weights that make the first rows the most popular: row
+    ``i`` is picked ``(i + 1) ** -exponent`` as often as the first.
+    """
+    return list(
+        itertools.accumulate(
+            (rank + 1) ** -exponent for rank in range(count)
+        )
+    )
+
+
+def degree(rng, mean, limit):
+    """A long-tailed link count of at least 1, averaging about ``mean``."""
+    if mean <= 1:
+        return 1
+    return min(limit, 1 + int(rng.expovariate(1 / (mean - 1))))
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the database with a reproducible synthetic menu at scale: "
+        "cooks, dish types, ingredients and dishes whose cook and "
+        "ingredient links follow a long-tailed popularity."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cooks", type=int, default=1000)
+        parser.add_argument("--dish-types", type=int, default=30)
+        parser.add_argument("--ingredients", type=int, default=2000)
+        parser.add_argument("--dishes", type=int, default=10000)
+        parser.add_argument(
+            "--cooks-per-dish",
+            type=float,
+            default=3,
+            help="Mean number of cooks per dish.",
+        )
+        parser.add_argument(
+            "--ingredients-per-dish",
+            type=float,
+            default=8,
+            help="Mean number of ingredients per dish.",
+        )
+        parser.add_argument(
+            "--skew",
+            type=float,
+            default=1.1,
+            help="Zipf exponent of cook and ingredient popularity; "
+            "0 picks uniformly.",
+        )
+        parser.add_argument(
+            "--password",
+            default="kitchen",
+            help="Password of every seeded cook.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=42,
+            help="Random seed; the same seed gives the same data.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Dishes inserted per transaction.",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to seed.",
+        )
+
+    def handle(self, *args, **options):
+        sizes = ("cooks", "dish_types", "ingredients", "batch_size")
+        if any(options[name] < 1 for name in sizes) or options["dishes"] < 0:
+            raise CommandError(
+                "Need at least 1 cook, dish type and ingredient and a "
+                "positive batch size."
+            )
+        self.using = options["database"]
+        self.verbosity = options["verbosity"]
+        cooks = Cook.objects.using(self.using)
+        if cooks.filter(username__startswith=USERNAME_PREFIX).exists():
+            raise CommandError(
+                "The database is already seeded; flush it to seed again."
+            )
+        self.rng = random.Random(options["seed"])
+        started = time.monotonic()
+
+        with transaction.atomic(using=self.using):
+            cook_ids = self.create_cooks(
+                options["cooks"], options["password"]
+            )
+            dish_type_ids = self.create_named(
+                DishType, numbered(DISH_TYPES), options["dish_types"]
+            )
+            ingredient_ids = self.create_named(
+                Ingredient, ingredient_names(), options["ingredients"]
+            )
+        self.ingredient_names = dict(
+            Ingredient.objects.using(self.using)
+            .filter(pk__in=ingredient_ids)
+            .values_list("pk", "name")
+        )
+        self.dish_type_names = dict(
+            DishType.objects.using(self.using)
+            .filter(pk__in=dish_type_ids)
+            .values_list("pk", "name")
+        )
+
+        cook_weights = zipf_weights(len(cook_ids), options["skew"])
+        ingredient_weights = zipf_weights(
+            len(ingredient_ids), options["skew"]
+        )
+        dish_counts = dict.fromkeys(cook_ids, 0)
+        links = created = 0
+        while created < options["dishes"]:
+            size = min(options["batch_size"], options["dishes"] - created)
+            plans = [
+                (
+                    self.pick(
+                        cook_ids, cook_weights, options["cooks_per_dish"]
+                    ),
+                    self.pick(
+                        ingredient_ids,
+                        ingredient_weights,
+                        options["ingredients_per_dish"],
+                    ),
+                )
+                for _ in range(size)
+            ]
+            links += self.create_dishes(plans, dish_type_ids, dish_counts)
+            created += size
+            if self.verbosity >= 2:
+                self.stdout.write(f"{created} dishes, {links} links")
+
+        with transaction.atomic(using=self.using):
+            Cook.objects.using(self.using).bulk_update(
+                [
+                    Cook(pk=cook_id, dish_count=count)
+                    for cook_id, count in dish_counts.items()
+                    if count
+                ],
+                ["dish_count"],
+                batch_size=options["batch_size"],
+            )
+            counters.reconcile_counters(using=self.using)
+            analytics.rebuild_menu_analytics(
+                self.using, dish_type_ids=dish_type_ids
+            )
+            ingredient_index.rebuild_ingredient_index(
+                self.using, ingredient_ids=ingredient_ids
+            )
+        for label in ("cook", "dish", "dishtype", "ingredient"):
+            versioning.bump_version(label)
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeded {len(cook_ids)} cooks, {len(dish_type_ids)} dish "
+                f"types, {len(ingredient_ids)} ingredients, {created} "
+                f"dishes and {links} dish links in {elapsed:.1f}s."
+            )
+        )
+
+    def create_cooks(self, count, password):
+        # Hashing once keeps seeding fast at any scale while the cooks
+        # can still log in through the configured hasher.
+        encoded = make_password(password)
+        width = len(str(count))
+        cooks = Cook.objects.using(self.using).bulk_create(
+            (
+                Cook(
+                    username=f"{USERNAME_PREFIX}{index:0{width}d}",
+                    password=encoded,
+                    first_name=self.rng.choice(FIRST_NAMES),
+                    last_name=self.rng.choice(LAST_NAMES),
+                    years_of_experience=self.rng.randint(0, 40),
+                )
+                for index in range(count)
+            ),
+            batch_size=1000,
+        )
+        return self.saved_ids(Cook, cooks)
+
+    def create_named(self, model, names, count):
+        objs = model.objects.using(self.using).bulk_create(
+            (model(name=name) for name in itertools.islice(names, count)),
+            batch_size=1000,
+        )
+        return self.saved_ids(model, objs)
+
+    def saved_ids(self, model, objs):
+        if objs and objs[0].pk is not None:
+            return [obj.pk for obj in objs]
+        # Backends that cannot return ids from a bulk insert: the new rows
+        # are the highest ids, in insertion order.
+        return sorted(
+            model.objects.using(self.using)
+            .order_by("-pk")
+            .values_list("pk", flat=True)[:len(objs)]
+        )
+
+    def pick(self, ids, weights, mean):
+        count = degree(self.rng, mean, len(ids))
+        return sorted(set(self.rng.choices(ids, cum_weights=weights, k=count)))
+
+    def create_dishes(self, plans, dish_type_ids, dish_counts):
+        """Insert one batch of dishes and their links; return the links."""
+        rng = self.rng
+        dishes = []
+        for cook_ids, ingredient_ids in plans:
+            dish_type_id = rng.choice(dish_type_ids)
+            main = self.ingredient_names[ingredient_ids[0]]
+            dishes.append(
+                Dish(
+                    name=(
+                        f"{rng.choice(STYLES)} {main} "
+                        f"{self.dish_type_names[dish_type_id]}"
+                    ),
+                    description=(
+                        "Made with "
+                        + ", ".join(
+                            self.ingredient_names[pk].lower()
+                            for pk in ingredient_ids
+                        )
+                        + "."
+                    ),
+                    price=Decimal(f"{rng.lognormvariate(2.5, 0.5):.2f}"),
+                    dish_type_id=dish_type_id,
+                    cook_count=len(cook_ids),
+                    ingredient_count=len(ingredient_ids),
+                )
+            )
+        with transaction.atomic(using=self.using):
+            dishes = Dish.objects.using(self.using).bulk_create(dishes)
+            dish_ids = self.saved_ids(Dish, dishes)
+            DishCook.objects.using(self.using).bulk_create(
+                (
+                    DishCook(dish_id=dish_id, cook_id=cook_id)
+                    for dish_id, (cook_ids, _) in zip(dish_ids, plans)
+                    for cook_id in cook_ids
+                ),
+                batch_size=10000,
+            )
+            DishIngredient.objects.using(self.using).bulk_create(
+                (
+                    DishIngredient(dish_id=dish_id, ingredient_id=pk)
+                    for dish_id, (_, ingredient_ids) in zip(dish_ids, plans)
+                    for pk in ingredient_ids
+                ),
+                batch_size=10000,
+            )
+            search.index_dishes(dish_ids, using=self.using)
+        for cook_ids, _ in plans:
+            for cook_id in cook_ids:
+                dish_counts[cook_id] += 1
+        return sum(
+            len(cook_ids) + len(ingredient_ids)
+            for cook_ids, ingredient_ids in plans
+        )
@@ -0,0 +1,133 @@
+"""
+Per-view request histograms, kept in process memory and rendered in the
+Prometheus text exposition format.
+"""
+import threading
+
+from django.conf import settings
+
+SECONDS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+UNRESOLVED_VIEW = "unresolved"
+
+
+def _label(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _bound(value):
+    return format(value, "g")
+
+
+class Histogram:
+    """A histogram with one series per view."""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, view, value):
+        with self._lock:
+            series = self._series.get(view)
+            if series is None:
+                series = self._series[view] = {
+                    "buckets": [0] * len(self.buckets),
+                    "sum": 0,
+                    "count": 0,
+                }
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                view: {**series, "buckets": list(series["buckets"])}
+                for view, series in self._series.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def exposition(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for view, series in sorted(self.snapshot().items()):
+            label = f'view="{_label(view)}"'
+            for bound, count in zip(self.buckets, series["buckets"]):
+                yield (
+                    f'{self.name}_bucket{{{label},le="{_bound(bound)}"}} '
+                    f"{count}"
+                )
+            yield f'{self.name}_bucket{{{label},le="+Inf"}} {series["count"]}'
+            yield f"{self.name}_sum{{{label}}} {series['sum']}"
+            yield f"{self.name}_count{{{label}}} {series['count']}"
+
+
+request_duration = Histogram(
+    "kitchen_request_duration_seconds",
+    "Wall time of requests by view.",
+    SECONDS_BUCKETS,
+)
+request_db_queries = Histogram(
+    "kitchen_request_db_queries",
+    "Database queries per request by view.",
+    QUERY_BUCKETS,
+)
+request_db_duration = Histogram(
+    "kitchen_request_db_duration_seconds",
+    "Time spent in database queries per request by view.",
+    SECONDS_BUCKETS,
+)
+request_template_duration = Histogram(
+    "kitchen_request_template_duration_seconds",
+    "Time spent rendering templates per request by view.",
+    SECONDS_BUCKETS,
+)
+HISTOGRAMS = (
+    request_duration,
+    request_db_queries,
+    request_db_duration,
+    request_template_duration,
+)
+
+
+def internal_ip(request):
+    return request.META.get("REMOTE_ADDR") in settings.INTERNAL_IPS
+
+
+def view_name(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else UNRESOLVED_VIEW
+
+
+def observe_request(view, state, elapsed):
+    request_duration.observe(view, elapsed)
+    request_db_queries.observe(view, state.db_queries)
+    request_db_duration.observe(view, state.db_seconds)
+    request_template_duration.observe(view, state.template_seconds)
+
+
+def render_metrics():
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.exposition())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    for histogram in HISTOGRAMS:
+        histogram.reset()
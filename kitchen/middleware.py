@@ -0,0 +1,132 @@
+import logging
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.utils.decorators import sync_and_async_middleware
+
+from kitchen.metrics import internal_ip, observe_request, view_name
+from kitchen.routers import pin_scope, read_replicas
+from kitchen.timing import server_timing, timing_scope
+
+logger = logging.getLogger(__name__)
+
+PIN_COOKIE = "kitchen_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+
+def _pinned(request):
+    return (
+        request.method not in SAFE_METHODS
+        or PIN_COOKIE in request.COOKIES
+    )
+
+
+def _remember_write(state, response):
+    if state.wrote and read_replicas():
+        response.set_cookie(
+            PIN_COOKIE,
+            "1",
+            max_age=getattr(settings, "KITCHEN_REPLICA_PIN_SECONDS", 10),
+            httponly=True,
+            samesite="Lax",
+        )
+    return response
+
+
+@sync_and_async_middleware
+def replica_pin_middleware(get_response):
+    """
+    Read from the primary on unsafe requests and for a while after the
+    client last wrote, so it always sees its own writes.
+    """
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            with pin_scope(_pinned(request)) as state:
+                response = await get_response(request)
+            return _remember_write(state, response)
+
+    else:
+
+        def middleware(request):
+            with pin_scope(_pinned(request)) as state:
+                response = get_response(request)
+            return _remember_write(state, response)
+
+    return middleware
+
+
+def _repeated_query_threshold():
+    return getattr(settings, "KITCHEN_REPEATED_QUERY_THRESHOLD", None)
+
+
+def _server_timing_wanted(request):
+    # Same audience as kitchen:metrics: internal IPs, then staff once the
+    # user is known.
+    if not getattr(settings, "KITCHEN_SERVER_TIMING", True):
+        return False
+    if internal_ip(request):
+        return True
+    user = getattr(request, "user", None)
+    return user is not None and user.is_staff
+
+
+async def _aserver_timing_wanted(request):
+    if not getattr(settings, "KITCHEN_SERVER_TIMING", True):
+        return False
+    if internal_ip(request):
+        return True
+    if not hasattr(request, "auser"):
+        return False
+    return (await request.auser()).is_staff
+
+
+def _report_timing(request, state, response, send_header):
+    elapsed = state.elapsed
+    view = view_name(request)
+    observe_request(view, state, elapsed)
+    threshold = _repeated_query_threshold()
+    for shape, count in state.repeated_queries(threshold):
+        logger.warning(
+            "Possible N+1 query in %s (%s), run %d times: %s",
+            view,
+            request.path,
+            count,
+            shape,
+        )
+    if send_header:
+        header = server_timing(state)
+        if response.has_header("Server-Timing"):
+            header = f"{response['Server-Timing']}, {header}"
+        response["Server-Timing"] = header
+    return response
+
+
+@sync_and_async_middleware
+def request_timing_middleware(get_response):
+    """
+    Time each request, its database queries and its template rendering,
+    send the totals back as ``Server-Timing`` to internal IPs and staff and
+    add them to the per-view histograms ``kitchen:metrics`` exposes. Log a
+    warning when one query shape runs ``KITCHEN_REPEATED_QUERY_THRESHOLD``
+    times or more.
+    """
+    if iscoroutinefunction(get_response):
+
+        async def middleware(request):
+            track_shapes = bool(_repeated_query_threshold())
+            with timing_scope(track_shapes) as state:
+                response = await get_response(request)
+            send_header = await _aserver_timing_wanted(request)
+            return _report_timing(request, state, response, send_header)
+
+    else:
+
+        def middleware(request):
+            track_shapes = bool(_repeated_query_threshold())
+            with timing_scope(track_shapes) as state:
+                response = get_response(request)
+            send_header = _server_timing_wanted(request)
+            return _report_timing(request, state, response, send_header)
+
+    return middleware
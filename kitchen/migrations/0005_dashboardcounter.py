@@ -0,0 +1,44 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:57
+
+from django.db import migrations, models
+
+
+def seed_counters(apps, schema_editor):
+    using = schema_editor.connection.alias
+    DashboardCounter = apps.get_model("kitchen", "DashboardCounter")
+    counted_models = {
+        "cooks": "Cook",
+        "dishes": "Dish",
+        "dish_types": "DishType",
+        "ingredients": "Ingredient",
+    }
+    DashboardCounter.objects.using(using).bulk_create(
+        DashboardCounter(
+            name=name,
+            value=apps.get_model("kitchen", model).objects.using(using).count(),
+        )
+        for name, model in counted_models.items()
+    )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kitchen", "0004_trigram_name_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DashboardCounter",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=32, primary_key=True, serialize=False),
+                ),
+                ("value", models.BigIntegerField(default=0)),
+            ],
+            options={
+                "ordering": ("name",),
+            },
+        ),
+        migrations.RunPython(seed_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-16 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kitchen", "0005_dashboardcounter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cook",
+            name="visit_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+    ]
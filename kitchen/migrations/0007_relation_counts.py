@@ -0,0 +1,73 @@
+# Generated by Django 5.2.7 on 2026-10-16 22:29
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def seed_relation_counts(apps, schema_editor):
+    using = schema_editor.connection.alias
+    Cook = apps.get_model("kitchen", "Cook")
+    Dish = apps.get_model("kitchen", "Dish")
+    relations = (
+        (Cook, "dish_count", Dish.cooks.through, "cook_id"),
+        (Dish, "cook_count", Dish.cooks.through, "dish_id"),
+        (Dish, "ingredient_count", Dish.ingredients.through, "dish_id"),
+    )
+    for model, field, through, column in relations:
+        rows = (
+            through.objects.filter(**{column: OuterRef("pk")})
+            .order_by()
+            .values(column)
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        model.objects.using(using).update(
+            **{field: Coalesce(Subquery(rows), 0)}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+        ("kitchen", "0006_cook_visit_count"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="cook",
+            name="dish_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="dish",
+            name="cook_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="dish",
+            name="ingredient_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="cook",
+            index=models.Index(
+                fields=["-dish_count", "id"], name="kitchen_cook_dish_count"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["-cook_count", "id"], name="kitchen_dish_cook_count"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["-ingredient_count", "id"],
+                name="kitchen_dish_ingredient_count",
+            ),
+        ),
+        migrations.RunPython(seed_relation_counts, migrations.RunPython.noop),
+    ]
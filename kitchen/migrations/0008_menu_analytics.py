@@ -0,0 +1,136 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:52
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Case, Count, Max, Min, Sum, Value, When
+
+# kitchen.analytics.PRICE_BUCKETS when this migration was written.
+PRICE_BUCKETS = (
+    1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 12, 14, 16, 18, 20, 25, 30, 35, 40,
+    50, 60, 80, 100, 150, 200, 300, 500, 1000,
+)
+
+
+def seed_menu_analytics(apps, schema_editor):
+    using = schema_editor.connection.alias
+    Dish = apps.get_model("kitchen", "Dish")
+    DishTypeStats = apps.get_model("kitchen", "DishTypeStats")
+    DishTypePriceBucket = apps.get_model("kitchen", "DishTypePriceBucket")
+    dishes = Dish.objects.using(using).order_by()
+    DishTypeStats.objects.using(using).bulk_create(
+        DishTypeStats(
+            dish_type_id=row["dish_type_id"],
+            dish_count=row["count"],
+            price_total=row["total"],
+            price_min=row["low"],
+            price_max=row["high"],
+        )
+        for row in dishes.values("dish_type_id").annotate(
+            count=Count("pk"),
+            total=Sum("price"),
+            low=Min("price"),
+            high=Max("price"),
+        )
+    )
+    bucket = Case(
+        *(
+            When(price__lte=Decimal(bound), then=Value(index))
+            for index, bound in enumerate(PRICE_BUCKETS)
+        ),
+        default=Value(len(PRICE_BUCKETS)),
+    )
+    DishTypePriceBucket.objects.using(using).bulk_create(
+        DishTypePriceBucket(
+            dish_type_id=row["dish_type_id"],
+            bucket=row["bucket"],
+            dish_count=row["count"],
+        )
+        for row in dishes.annotate(bucket=bucket)
+        .values("dish_type_id", "bucket")
+        .annotate(count=Count("pk"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kitchen", "0007_relation_counts"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DishTypePriceBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.PositiveSmallIntegerField()),
+                ("dish_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ("dish_type", "bucket"),
+            },
+        ),
+        migrations.CreateModel(
+            name="DishTypeStats",
+            fields=[
+                (
+                    "dish_type",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="kitchen.dishtype",
+                    ),
+                ),
+                ("dish_count", models.IntegerField(default=0)),
+                (
+                    "price_total",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=15),
+                ),
+                (
+                    "price_min",
+                    models.DecimalField(decimal_places=2, max_digits=7, null=True),
+                ),
+                (
+                    "price_max",
+                    models.DecimalField(decimal_places=2, max_digits=7, null=True),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "dish type stats",
+                "ordering": ("-dish_count", "dish_type"),
+            },
+        ),
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(
+                fields=["dish_type", "price"], name="kitchen_dish_type_price"
+            ),
+        ),
+        migrations.AddField(
+            model_name="dishtypepricebucket",
+            name="dish_type",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="price_buckets",
+                to="kitchen.dishtype",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="dishtypepricebucket",
+            constraint=models.UniqueConstraint(
+                fields=("dish_type", "bucket"), name="kitchen_price_bucket_unique"
+            ),
+        ),
+        migrations.RunPython(seed_menu_analytics, migrations.RunPython.noop),
+    ]
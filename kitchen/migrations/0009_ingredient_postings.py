@@ -0,0 +1,76 @@
+# Generated by Django 5.2.7 on 2026-10-16 23:59
+
+import sys
+from array import array
+from itertools import groupby
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def encode(dish_ids):
+    # kitchen.ingredient_index.encode() when this migration was written.
+    packed = array("q", sorted(dish_ids))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def seed_ingredient_postings(apps, schema_editor):
+    using = schema_editor.connection.alias
+    Dish = apps.get_model("kitchen", "Dish")
+    IngredientPostings = apps.get_model("kitchen", "IngredientPostings")
+    links = (
+        Dish.ingredients.through.objects.using(using)
+        .order_by("ingredient_id", "dish_id")
+        .values_list("ingredient_id", "dish_id")
+    )
+    postings = []
+    for ingredient_id, rows in groupby(
+        links.iterator(chunk_size=10000), key=lambda row: row[0]
+    ):
+        dish_ids = [dish_id for _, dish_id in rows]
+        postings.append(
+            IngredientPostings(
+                ingredient_id=ingredient_id,
+                dish_ids=encode(dish_ids),
+                dish_count=len(dish_ids),
+            )
+        )
+    IngredientPostings.objects.using(using).bulk_create(
+        postings, batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kitchen", "0008_menu_analytics"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngredientPostings",
+            fields=[
+                (
+                    "ingredient",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="postings",
+                        serialize=False,
+                        to="kitchen.ingredient",
+                    ),
+                ),
+                ("dish_ids", models.BinaryField(default=bytes)),
+                ("dish_count", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "ingredient postings",
+                "ordering": ("ingredient",),
+            },
+        ),
+        migrations.RunPython(
+            seed_ingredient_postings, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:05
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("kitchen", "0009_ingredient_postings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IngredientPostingDelta",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("dish_id", models.BigIntegerField()),
+                ("added", models.BooleanField()),
+                (
+                    "ingredient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="posting_deltas",
+                        to="kitchen.ingredient",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("ingredient", "pk"),
+            },
+        ),
+    ]
@@ -26,9 +26,16 @@ class Ingredient(models.Model):
 
 class Cook(AbstractUser):
     years_of_experience = models.IntegerField(default=0)
+    visit_count = models.IntegerField(default=0, editable=False)
+    dish_count = models.IntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ("username",)
+        indexes = [
+            models.Index(
+                fields=["-dish_count", "id"], name="kitchen_cook_dish_count"
+            ),
+        ]
         verbose_name = "cook"
         verbose_name_plural = "cooks"
 
@@ -48,10 +55,123 @@ class Dish(models.Model):
         settings.AUTH_USER_MODEL, related_name="dishes")
     ingredients = models.ManyToManyField(
         Ingredient, related_name="dish_ingredients")
+    cook_count = models.IntegerField(default=0, editable=False)
+    ingredient_count = models.IntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ("name",)
         verbose_name_plural = "dishes"
+        indexes = [
+            models.Index(
+                fields=["-cook_count", "id"], name="kitchen_dish_cook_count"
+            ),
+            models.Index(
+                fields=["-ingredient_count", "id"],
+                name="kitchen_dish_ingredient_count",
+            ),
+            models.Index(
+                fields=["dish_type", "price"], name="kitchen_dish_type_price"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.price})"
+
+
+class DishTypeStats(models.Model):
+    """Price summary of the dishes of one dish type, kept up to date."""
+
+    dish_type = models.OneToOneField(
+        DishType,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats",
+    )
+    dish_count = models.IntegerField(default=0)
+    price_total = models.DecimalField(
+        max_digits=15, decimal_places=2, default=0
+    )
+    price_min = models.DecimalField(
+        max_digits=7, decimal_places=2, null=True
+    )
+    price_max = models.DecimalField(
+        max_digits=7, decimal_places=2, null=True
+    )
+
+    class Meta:
+        ordering = ("-dish_count", "dish_type")
+        verbose_name_plural = "dish type stats"
+
+    def __str__(self):
+        return f"{self.dish_type_id}: {self.dish_count} dishes"
+
+
+class DishTypePriceBucket(models.Model):
+    """Dishes of one dish type in one bucket of the price histogram."""
+
+    dish_type = models.ForeignKey(
+        DishType, on_delete=models.CASCADE, related_name="price_buckets"
+    )
+    bucket = models.PositiveSmallIntegerField()
+    dish_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ("dish_type", "bucket")
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dish_type", "bucket"],
+                name="kitchen_price_bucket_unique",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.dish_type_id}/{self.bucket}: {self.dish_count}"
+
+
+class IngredientPostings(models.Model):
+    """Sorted ids of the dishes made with one ingredient, kept up to date."""
+
+    ingredient = models.OneToOneField(
+        Ingredient,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="postings",
+    )
+    dish_ids = models.BinaryField(default=bytes)
+    dish_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ("ingredient",)
+        verbose_name_plural = "ingredient postings"
+
+    def __str__(self):
+        return f"{self.ingredient_id}: {self.dish_count} dishes"
+
+
+class IngredientPostingDelta(models.Model):
+    """A link change not yet compacted into its ingredient's postings."""
+
+    ingredient = models.ForeignKey(
+        Ingredient, on_delete=models.CASCADE, related_name="posting_deltas"
+    )
+    # Not a foreign key: the delta recording a deleted dish outlives it.
+    dish_id = models.BigIntegerField()
+    added = models.BooleanField()
+
+    class Meta:
+        ordering = ("ingredient", "pk")
+
+    def __str__(self):
+        sign = "+" if self.added else "-"
+        return f"{self.ingredient_id}: {sign}{self.dish_id}"
+
+
+class DashboardCounter(models.Model):
+    name = models.CharField(max_length=32, primary_key=True)
+    value = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ("name",)
+
+    def __str__(self):
+        return f"{self.name}: {self.value}"
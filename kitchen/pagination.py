@@ -0,0 +1,206 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Q
+from django.http import Http404
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(values, direction):
+    payload = json.dumps(
+        {"v": list(values), "d": direction},
+        cls=DjangoJSONEncoder,
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values, direction = payload["v"], payload["d"]
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise InvalidCursor(cursor)
+    if direction not in ("next", "prev") or not isinstance(values, list):
+        raise InvalidCursor(cursor)
+    return values, direction
+
+
+class KeysetPage:
+    def __init__(self, object_list, paginator, next_values, previous_values):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = (
+            encode_cursor(next_values, "next") if next_values else None
+        )
+        self.previous_cursor = (
+            encode_cursor(previous_values, "prev") if previous_values else None
+        )
+
+    def __repr__(self):
+        return f"<KeysetPage of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by seeking past the last seen ordering values
+    instead of using OFFSET, so no page needs a COUNT(*) and deep pages
+    cost the same as the first one.
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = tuple(field.lstrip("-") for field in self.ordering)
+
+    def _seek(self, values, forward):
+        if len(values) != len(self.fields):
+            raise InvalidCursor(values)
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            descending = self.ordering[index].startswith("-")
+            lookup = "lt" if descending == forward else "gt"
+            step = Q(**{f"{field}__{lookup}": values[index]})
+            for previous, value in zip(self.fields[:index], values):
+                step &= Q(**{previous: value})
+            condition |= step
+        return condition
+
+    def _reversed_ordering(self):
+        return tuple(
+            field[1:] if field.startswith("-") else f"-{field}"
+            for field in self.ordering
+        )
+
+    def _values(self, obj):
+        if isinstance(obj, dict):
+            return [obj[field] for field in self.fields]
+        return [getattr(obj, field) for field in self.fields]
+
+    def _query(self, cursor):
+        queryset = self.queryset.order_by(*self.ordering)
+        forward = True
+        if cursor:
+            values, direction = decode_cursor(cursor)
+            forward = direction == "next"
+            try:
+                queryset = queryset.filter(self._seek(values, forward))
+            except (ValidationError, ValueError, TypeError):
+                # Well-formed JSON whose values don't fit the ordering
+                # fields, e.g. a string pk.
+                raise InvalidCursor(cursor)
+            if not forward:
+                queryset = queryset.order_by(*self._reversed_ordering())
+        return queryset[: self.per_page + 1], forward
+
+    def _page(self, rows, cursor, forward):
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if not forward:
+            rows.reverse()
+        if not rows:
+            return KeysetPage(rows, self, None, None)
+
+        if forward:
+            has_next, has_previous = has_more, bool(cursor)
+        else:
+            has_next, has_previous = True, has_more
+        return KeysetPage(
+            rows,
+            self,
+            self._values(rows[-1]) if has_next else None,
+            self._values(rows[0]) if has_previous else None,
+        )
+
+    def page(self, cursor=None):
+        queryset, forward = self._query(cursor)
+        return self._page(list(queryset), cursor, forward)
+
+    async def apage(self, cursor=None):
+        queryset, forward = self._query(cursor)
+        return self._page([row async for row in queryset], cursor, forward)
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin that swaps Django's OFFSET paginator for keyset
+    pagination over the model ordering plus pk as a tiebreaker.
+    """
+
+    cursor_kwarg = "cursor"
+
+    def get_keyset_ordering(self):
+        ordering = self.get_ordering() or self.model._meta.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        return tuple(ordering) + ("pk",)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator = KeysetPaginator(
+            queryset, page_size, self.get_keyset_ordering()
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that reads the planner's row estimate for an unfiltered
+    PostgreSQL table instead of running COUNT(*), once the table is past
+    ``exact_threshold`` rows. Filtered querysets and other backends are
+    counted exactly.
+    """
+
+    exact_threshold = 10000
+
+    def _estimate(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql" or queryset.query.where:
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples FROM pg_class WHERE oid = %s::regclass",
+                [queryset.model._meta.db_table],
+            )
+            row = cursor.fetchone()
+        return int(row[0]) if row else None
+
+    @cached_property
+    def count(self):
+        estimate = self._estimate()
+        if estimate is not None and estimate > self.exact_threshold:
+            return estimate
+        return super().count
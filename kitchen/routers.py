@@ -0,0 +1,89 @@
+"""
+Send reads of the kitchen models to the aliases in ``KITCHEN_READ_REPLICAS``.
+
+Writes always go to the primary. A write made while a pin scope is active
+(``kitchen.middleware.replica_pin_middleware`` opens one per request) moves
+the rest of the request to the primary, and the middleware keeps that
+client's reads there for ``KITCHEN_REPLICA_PIN_SECONDS`` so replication lag
+never hides their own writes from them.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+ROUTED_MODELS = {
+    "kitchen.cook",
+    "kitchen.dish",
+    "kitchen.dish_cooks",
+    "kitchen.dish_ingredients",
+    "kitchen.dishtype",
+    "kitchen.ingredient",
+}
+
+
+class PinState:
+    def __init__(self, primary=False):
+        self.primary = primary
+        self.wrote = False
+
+
+# Holds a mutable PinState rather than a flag, so writes made in a
+# sync_to_async thread are seen by the request that started them.
+_pin = ContextVar("kitchen_replica_pin", default=None)
+
+
+def read_replicas():
+    return list(getattr(settings, "KITCHEN_READ_REPLICAS", ()))
+
+
+def is_routed(model):
+    return model._meta.label_lower in ROUTED_MODELS
+
+
+@contextmanager
+def pin_scope(primary=False):
+    state = PinState(primary)
+    token = _pin.set(state)
+    try:
+        yield state
+    finally:
+        _pin.reset(token)
+
+
+def mark_write():
+    """Keep the rest of the current pin scope on the primary."""
+    state = _pin.get()
+    if state is not None:
+        state.primary = state.wrote = True
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = read_replicas()
+        if not replicas or not is_routed(model):
+            return None
+        state = _pin.get()
+        if state is not None and state.primary:
+            return DEFAULT_DB_ALIAS
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        if not is_routed(model):
+            return None
+        mark_write()
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db not in read_replicas():
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *read_replicas()}
+        if obj1._state.db in pool and obj2._state.db in pool:
+            return True
+        return None
@@ -0,0 +1,180 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "kitchen_dish_fts"
+CHUNK_SIZE = 500
+
+_INGREDIENT_NAMES_SQL = {
+    "postgresql": (
+        "(SELECT string_agg(i.name, ' ') "
+        "FROM kitchen_dish_ingredients di "
+        "JOIN kitchen_ingredient i ON i.id = di.ingredient_id "
+        "WHERE di.dish_id = d.id)"
+    ),
+    "sqlite": (
+        "(SELECT group_concat(i.name, ' ') "
+        "FROM kitchen_dish_ingredients di "
+        "JOIN kitchen_ingredient i ON i.id = di.ingredient_id "
+        "WHERE di.dish_id = d.id)"
+    ),
+}
+
+
+def create_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE kitchen_dish ADD COLUMN search_vector tsvector"
+        )
+        schema_editor.execute(
+            "CREATE INDEX kitchen_dish_search_vector_gin "
+            "ON kitchen_dish USING GIN (search_vector)"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "name, description, dish_type, ingredients, "
+            "tokenize = 'porter unicode61')"
+        )
+
+
+def drop_index(schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE kitchen_dish DROP COLUMN search_vector"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE {FTS_TABLE}")
+
+
+def _chunks(ids):
+    ids = sorted(set(ids))
+    for start in range(0, len(ids), CHUNK_SIZE):
+        yield ids[start:start + CHUNK_SIZE]
+
+
+def _placeholders(ids):
+    return ", ".join(["%s"] * len(ids))
+
+
+def index_dishes(dish_ids, using="default"):
+    """Recompute the search document for the given dishes."""
+    connection = connections[using]
+    vendor = connection.vendor
+    if vendor not in _INGREDIENT_NAMES_SQL:
+        return
+    ingredient_names = _INGREDIENT_NAMES_SQL[vendor]
+    with connection.cursor() as cursor:
+        for chunk in _chunks(dish_ids):
+            placeholders = _placeholders(chunk)
+            if vendor == "postgresql":
+                cursor.execute(
+                    "UPDATE kitchen_dish d SET search_vector = "
+                    "setweight(to_tsvector('english', d.name), 'A') || "
+                    "setweight(to_tsvector('english', t.name), 'B') || "
+                    "setweight(to_tsvector('english', "
+                    f"coalesce({ingredient_names}, '')), 'B') || "
+                    "setweight(to_tsvector('english', d.description), 'C') "
+                    "FROM kitchen_dishtype t "
+                    "WHERE t.id = d.dish_type_id "
+                    f"AND d.id IN ({placeholders})",
+                    chunk,
+                )
+            else:
+                cursor.execute(
+                    f"DELETE FROM {FTS_TABLE} "
+                    f"WHERE rowid IN ({placeholders})",
+                    chunk,
+                )
+                cursor.execute(
+                    f"INSERT INTO {FTS_TABLE} "
+                    "(rowid, name, description, dish_type, ingredients) "
+                    "SELECT d.id, d.name, d.description, t.name, "
+                    f"coalesce({ingredient_names}, '') "
+                    "FROM kitchen_dish d "
+                    "JOIN kitchen_dishtype t ON t.id = d.dish_type_id "
+                    f"WHERE d.id IN ({placeholders})",
+                    chunk,
+                )
+
+
+def unindex_dishes(dish_ids, using="default"):
+    connection = connections[using]
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for chunk in _chunks(dish_ids):
+            cursor.execute(
+                f"DELETE FROM {FTS_TABLE} "
+                f"WHERE rowid IN ({_placeholders(chunk)})",
+                chunk,
+            )
+
+
+def rebuild_index(using="default"):
+    connection = connections[using]
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT id FROM kitchen_dish")
+        dish_ids = [row[0] for row in cursor.fetchall()]
+    index_dishes(dish_ids, using=using)
+    return len(dish_ids)
+
+
+def _fts5_query(query):
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def search_dishes(queryset, query):
+    """
+    Filter a Dish queryset to full-text matches for ``query`` and
+    annotate each row with ``search_rank`` (higher is better).
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        tsquery = "websearch_to_tsquery('english', %s)"
+        return queryset.filter(
+            RawSQL(
+                f"kitchen_dish.search_vector @@ {tsquery}",
+                (query,),
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"ts_rank_cd(kitchen_dish.search_vector, {tsquery})",
+                (query,),
+                output_field=FloatField(),
+            )
+        )
+    if vendor == "sqlite":
+        match = _fts5_query(query)
+        if not match:
+            return queryset.none().annotate(
+                search_rank=Value(0.0, output_field=FloatField())
+            )
+        return queryset.filter(
+            RawSQL(
+                f"kitchen_dish.id IN (SELECT rowid FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s)",
+                (match,),
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            search_rank=RawSQL(
+                f"(SELECT -bm25({FTS_TABLE}, 10.0, 1.0, 4.0, 4.0) "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                "AND rowid = kitchen_dish.id)",
+                (match,),
+                output_field=FloatField(),
+            )
+        )
+    return queryset.filter(name__trigram_contains=query).annotate(
+        search_rank=Value(0.0, output_field=FloatField())
+    )
@@ -0,0 +1,288 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from kitchen import (
+    analytics,
+    counters,
+    ingredient_index,
+    routers,
+    search,
+    timing,
+    versioning,
+)
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+# Fields no cached fragment renders; saving only these keeps the version.
+UNRENDERED_FIELDS = frozenset({"last_login"})
+
+
+@receiver(post_save, sender=Dish)
+def index_saved_dish(sender, instance, using, **kwargs):
+    search.index_dishes([instance.pk], using=using)
+
+
+@receiver(post_delete, sender=Dish)
+def unindex_deleted_dish(sender, instance, using, **kwargs):
+    search.unindex_dishes([instance.pk], using=using)
+
+
+@receiver(m2m_changed, sender=Dish.ingredients.through)
+def reindex_dish_ingredients(
+    sender, instance, action, reverse, pk_set, using, **kwargs
+):
+    if reverse and action == "pre_clear":
+        instance._search_dish_ids = list(
+            instance.dish_ingredients.values_list("pk", flat=True)
+        )
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        dish_ids = [instance.pk]
+    elif action == "post_clear":
+        dish_ids = instance.__dict__.pop("_search_dish_ids", [])
+    else:
+        dish_ids = pk_set
+    search.index_dishes(dish_ids, using=using)
+
+
+@receiver(post_save, sender=Ingredient)
+def reindex_renamed_ingredient(sender, instance, created, using, **kwargs):
+    if not created:
+        search.index_dishes(
+            instance.dish_ingredients.values_list("pk", flat=True),
+            using=using,
+        )
+
+
+@receiver(pre_delete, sender=Ingredient)
+def remember_ingredient_dishes(sender, instance, **kwargs):
+    instance._search_dish_ids = list(
+        instance.dish_ingredients.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Ingredient)
+def reindex_deleted_ingredient(sender, instance, using, **kwargs):
+    search.index_dishes(
+        instance.__dict__.pop("_search_dish_ids", []), using=using
+    )
+
+
+@receiver(m2m_changed, sender=Dish.ingredients.through)
+def update_ingredient_postings(
+    sender, instance, action, reverse, pk_set, using, **kwargs
+):
+    if action == "pre_clear":
+        instance._cleared_postings = _ingredient_links(
+            instance,
+            reverse,
+            counters.related_ids(sender, reverse, instance.pk, using),
+        )
+    elif action == "post_add":
+        ingredient_index.add_links(
+            _ingredient_links(instance, reverse, pk_set), using=using
+        )
+    elif action == "post_remove":
+        ingredient_index.remove_links(
+            _ingredient_links(instance, reverse, pk_set), using=using
+        )
+    elif action == "post_clear":
+        ingredient_index.remove_links(
+            instance.__dict__.pop("_cleared_postings", []), using=using
+        )
+
+
+@receiver(pre_delete, sender=Dish)
+def remember_dish_postings(sender, instance, using, **kwargs):
+    # The cascade removes the through rows without sending m2m_changed;
+    # an ingredient's own postings go with it.
+    instance._deleted_postings = _ingredient_links(
+        instance,
+        False,
+        counters.related_ids(
+            Dish.ingredients.through, False, instance.pk, using
+        ),
+    )
+
+
+@receiver(post_delete, sender=Dish)
+def remove_dish_postings(sender, instance, using, **kwargs):
+    ingredient_index.remove_links(
+        instance.__dict__.pop("_deleted_postings", []), using=using
+    )
+
+
+@receiver(post_save, sender=DishType)
+def reindex_renamed_dish_type(sender, instance, created, using, **kwargs):
+    if not created:
+        search.index_dishes(
+            instance.dish_set.values_list("pk", flat=True), using=using
+        )
+
+
+ANALYTICS_FIELDS = {"dish_type", "dish_type_id", "price"}
+
+
+@receiver(pre_save, sender=Dish)
+def remember_dish_price(sender, instance, raw, using, update_fields, **kw):
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not ANALYTICS_FIELDS & update_fields:
+        return
+    instance._analytics_before = (
+        Dish.objects.using(using)
+        .filter(pk=instance.pk)
+        .values_list("dish_type_id", "price")
+        .first()
+    )
+
+
+@receiver(post_save, sender=Dish)
+def update_saved_dish_analytics(sender, instance, created, using, **kwargs):
+    after = (instance.dish_type_id, instance.price)
+    if created:
+        analytics.add_dish(*after, using=using)
+        return
+    before = instance.__dict__.pop("_analytics_before", None)
+    if before is not None:
+        analytics.move_dish(before, after, using=using)
+
+
+@receiver(post_delete, sender=Dish)
+def update_deleted_dish_analytics(sender, instance, using, **kwargs):
+    analytics.remove_dish(instance.dish_type_id, instance.price, using=using)
+
+
+@receiver(post_save, sender=Cook)
+@receiver(post_save, sender=Dish)
+@receiver(post_save, sender=DishType)
+@receiver(post_save, sender=Ingredient)
+def count_created(sender, created, using, **kwargs):
+    if created:
+        counters.adjust_counter(counters.counter_name(sender), 1, using)
+
+
+@receiver(post_delete, sender=Cook)
+@receiver(post_delete, sender=Dish)
+@receiver(post_delete, sender=DishType)
+@receiver(post_delete, sender=Ingredient)
+def count_deleted(sender, using, **kwargs):
+    counters.adjust_counter(counters.counter_name(sender), -1, using)
+
+
+@receiver(m2m_changed, sender=Dish.cooks.through)
+@receiver(m2m_changed, sender=Dish.ingredients.through)
+def count_related(
+    sender, instance, action, reverse, pk_set, using, **kwargs
+):
+    phase, _, kind = action.partition("_")
+    if phase == "pre":
+        # remove() reports every requested id, linked or not.
+        if kind in ("remove", "clear"):
+            instance._count_related_ids = counters.related_ids(
+                sender, reverse, instance.pk, using, among=pk_set
+            )
+        return
+    if kind == "add":
+        counters.adjust_relation_counts(
+            sender, reverse, instance, pk_set, 1, using
+        )
+    else:
+        counters.adjust_relation_counts(
+            sender,
+            reverse,
+            instance,
+            instance.__dict__.pop("_count_related_ids", pk_set),
+            -1,
+            using,
+        )
+
+
+@receiver(pre_delete, sender=Cook)
+@receiver(pre_delete, sender=Dish)
+@receiver(pre_delete, sender=Ingredient)
+def remember_counted_relations(sender, instance, using, **kwargs):
+    # The cascade removes the through rows without sending m2m_changed.
+    instance._counted_relations = {
+        (through, reverse): counters.related_ids(
+            through, reverse, instance.pk, using
+        )
+        for through, reverse in counters.counted_relations(sender)
+    }
+
+
+@receiver(post_delete, sender=Cook)
+@receiver(post_delete, sender=Dish)
+@receiver(post_delete, sender=Ingredient)
+def uncount_deleted_relations(sender, instance, using, **kwargs):
+    relations = instance.__dict__.pop("_counted_relations", {})
+    for (through, reverse), pk_set in relations.items():
+        counters.adjust_relation_counts(
+            through, reverse, instance, pk_set, -1, using
+        )
+
+
+@receiver(post_save, sender=Cook)
+@receiver(post_save, sender=Dish)
+@receiver(post_save, sender=DishType)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Cook)
+@receiver(post_delete, sender=Dish)
+@receiver(post_delete, sender=DishType)
+@receiver(post_delete, sender=Ingredient)
+def bump_model_version(sender, using, update_fields=None, **kwargs):
+    if update_fields and update_fields <= UNRENDERED_FIELDS:
+        # e.g. the last_login update on every login.
+        return
+    _bump_version(versioning.version_label(sender), using)
+
+
+@receiver(m2m_changed, sender=Dish.cooks.through)
+@receiver(m2m_changed, sender=Dish.ingredients.through)
+def bump_dish_version(sender, action, using, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        _bump_version("dish", using)
+
+
+@receiver(post_save, sender=Cook)
+@receiver(post_save, sender=Dish)
+@receiver(post_save, sender=DishType)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Cook)
+@receiver(post_delete, sender=Dish)
+@receiver(post_delete, sender=DishType)
+@receiver(post_delete, sender=Ingredient)
+@receiver(m2m_changed, sender=Dish.cooks.through)
+@receiver(m2m_changed, sender=Dish.ingredients.through)
+def pin_reads_to_primary(sender, **kwargs):
+    # Writes made with an explicit using() never reach the router.
+    routers.mark_write()
+
+
+@receiver(connection_created)
+def time_queries(sender, connection, **kwargs):
+    timing.install_query_timer(connection)
+
+
+def _ingredient_links(instance, reverse, pk_set):
+    if reverse:
+        return [(dish_id, instance.pk) for dish_id in pk_set or ()]
+    return [(instance.pk, ingredient_id) for ingredient_id in pk_set or ()]
+
+
+def _bump_version(label, using):
+    # Bump once now and again after commit: a request that renders the
+    # uncommitted state in between caches under the intermediate version,
+    # which the second bump retires.
+    versioning.bump_version(label)
+    transaction.on_commit(
+        lambda: versioning.bump_version(label), using=using
+    )
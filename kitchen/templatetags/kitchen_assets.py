@@ -0,0 +1,16 @@
+from django import template
+
+from kitchen.assets import asset_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def asset(name):
+    """
+    URL of a file under ``static/assets``, content-hashed once collected
+    in production. Usage::
+
+        <script src="{% asset 'js/autocomplete.js' %}"></script>
+    """
+    return asset_url(name)
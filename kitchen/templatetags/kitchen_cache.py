@@ -0,0 +1,54 @@
+from django import template
+from django.core.cache import cache
+
+from kitchen.versioning import fragment_key, fragment_timeout, record_lookup
+
+register = template.Library()
+
+
+class VersionedCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, labels, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.labels = labels
+        self.vary_on = vary_on
+
+    def render(self, context):
+        key = fragment_key(
+            self.fragment_name,
+            self.labels,
+            [var.resolve(context) for var in self.vary_on],
+        )
+        fragment = cache.get(key)
+        record_lookup(self.fragment_name, hit=fragment is not None)
+        if fragment is None:
+            fragment = self.nodelist.render(context)
+            cache.set(key, fragment, fragment_timeout())
+        return fragment
+
+
+@register.tag("versioned_cache")
+def do_versioned_cache(parser, token):
+    """
+    Cache a template fragment until one of the listed models changes.
+
+    Usage::
+
+        {% versioned_cache "dish-info" "dish dishtype" dish.pk %}
+            ...
+        {% endversioned_cache %}
+
+    The second argument lists model names whose version stamps form part
+    of the key; any further arguments are resolved and vary the key too.
+    """
+    bits = token.split_contents()
+    if len(bits) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{bits[0]}' tag requires a fragment name and model names."
+        )
+    nodelist = parser.parse(("endversioned_cache",))
+    parser.delete_first_token()
+    fragment_name = template.Variable(bits[1]).resolve({})
+    labels = template.Variable(bits[2]).resolve({}).split()
+    vary_on = [parser.compile_filter(bit) for bit in bits[3:]]
+    return VersionedCacheNode(nodelist, fragment_name, labels, vary_on)
@@ -0,0 +1,78 @@
+from django import template
+from django.conf import settings
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from kitchen.assets import asset_url
+from kitchen.images import (
+    BACKGROUND_WIDTH,
+    FORMATS,
+    MIME_TYPES,
+    load_manifest,
+    pick_variant,
+)
+
+register = template.Library()
+
+
+def _url(path):
+    # Variants are written after collectstatic and hash their own names.
+    return escape(f"{settings.ASSETS_ROOT}/{path}")
+
+
+def _source_url(source):
+    return escape(asset_url(source))
+
+
+@register.simple_tag
+def background_image(source, width=BACKGROUND_WIDTH):
+    """
+    Emit ``background-image`` declarations for an image under ASSETS_ROOT.
+
+    Browsers that understand ``image-set()`` get the smallest AVIF or WebP
+    variant covering ``width`` CSS pixels at 1x and 2x; the rest keep the
+    original image declared first. Usage::
+
+        <div style="{% background_image 'img/dish-menu.jpg' %}">
+    """
+    declaration = f"background-image: url('{_source_url(source)}');"
+    entry = load_manifest().get(source)
+    if not entry:
+        return mark_safe(declaration)
+    options = []
+    for fmt, _, mime in FORMATS:
+        seen = set()
+        for density in (1, 2):
+            variant = pick_variant(entry, int(width) * density, fmt)
+            if variant is None or variant["path"] in seen:
+                continue
+            seen.add(variant["path"])
+            options.append(
+                f"url('{_url(variant['path'])}') type('{mime}') {density}x"
+            )
+    options.append(f"url('{_source_url(source)}') 1x")
+    return mark_safe(
+        f"{declaration} background-image: image-set({', '.join(options)});"
+    )
+
+
+@register.simple_tag
+def image_srcset(source, fmt):
+    """
+    Emit a ``srcset`` value listing every ``fmt`` variant of an image by
+    width, or the original image if it has none. Usage::
+
+        <source srcset="{% image_srcset 'img/team-1.jpg' 'webp' %}">
+    """
+    entry = load_manifest().get(source)
+    if not entry or fmt not in MIME_TYPES:
+        return _source_url(source)
+    variants = sorted(
+        (v for v in entry["variants"] if v["format"] == fmt),
+        key=lambda variant: variant["width"],
+    )
+    if not variants:
+        return _source_url(source)
+    return mark_safe(
+        ", ".join(f"{_url(v['path'])} {v['width']}w" for v in variants)
+    )
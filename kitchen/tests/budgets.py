@@ -0,0 +1,103 @@
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+from kitchen import ingredient_index, search
+from kitchen.models import Cook, Dish, DishType, Ingredient
+
+
+def grow_menu(size):
+    """
+    Bring the menu up to ``size`` dishes, cooks and ingredients, every new
+    dish cooked by two cooks and made of two ingredients. Rows are bulk
+    inserted, so the stored relation counts are left at zero.
+    """
+    dish_type, _ = DishType.objects.get_or_create(name="Budget")
+    start = Cook.objects.count()
+    Cook.objects.bulk_create(
+        Cook(username=f"budget_cook_{index}", password="!")
+        for index in range(start, size)
+    )
+    start = Ingredient.objects.count()
+    Ingredient.objects.bulk_create(
+        Ingredient(name=f"Budget ingredient {index}")
+        for index in range(start, size)
+    )
+    start = Dish.objects.count()
+    dishes = Dish.objects.bulk_create(
+        Dish(
+            name=f"Budget dish {index}",
+            description="",
+            price=10,
+            dish_type=dish_type,
+        )
+        for index in range(start, size)
+    )
+    cook_ids = list(Cook.objects.values_list("pk", flat=True))
+    ingredient_ids = list(Ingredient.objects.values_list("pk", flat=True))
+    Dish.cooks.through.objects.bulk_create(
+        [
+            Dish.cooks.through(
+                dish_id=dish.pk,
+                cook_id=cook_ids[(index + step) % len(cook_ids)],
+            )
+            for index, dish in enumerate(dishes)
+            for step in range(2)
+        ],
+        ignore_conflicts=True,
+    )
+    ingredient_pairs = {
+        (dish.pk, ingredient_ids[(index + step) % len(ingredient_ids)])
+        for index, dish in enumerate(dishes)
+        for step in range(2)
+    }
+    Dish.ingredients.through.objects.bulk_create(
+        [
+            Dish.ingredients.through(dish_id=dish_id, ingredient_id=pk)
+            for dish_id, pk in ingredient_pairs
+        ],
+        ignore_conflicts=True,
+    )
+    ingredient_index.add_links(ingredient_pairs)
+    search.index_dishes([dish.pk for dish in dishes])
+
+
+class QueryBudgetMixin:
+    """
+    Assert that a view runs at most ``budget`` queries, and the same number
+    whether the data has 10 rows or 1,000 -- which an N+1 query breaks.
+    """
+
+    budget_sizes = (10, 1000)
+
+    def assertQueryBudget(
+        self, budget, request, grow=grow_menu, using=DEFAULT_DB_ALIAS
+    ):
+        """
+        For each of ``budget_sizes``, call ``grow(size)`` to bring the data
+        up to that many rows, clear the cache and count the queries
+        ``request()`` runs, including those of a streamed response.
+        """
+        counts = {}
+        for size in self.budget_sizes:
+            grow(size)
+            cache.clear()
+            with CaptureQueriesContext(connections[using]) as queries:
+                response = request()
+                if getattr(response, "streaming", False):
+                    b"".join(response.streaming_content)
+            if hasattr(response, "status_code"):
+                self.assertLess(response.status_code, 400)
+            self.assertLessEqual(
+                len(queries),
+                budget,
+                f"{len(queries)} queries with {size} rows, over the budget "
+                f"of {budget}:\n"
+                + "\n".join(query["sql"] for query in queries),
+            )
+            counts[size] = len(queries)
+        self.assertEqual(
+            len(set(counts.values())),
+            1,
+            f"Query count grows with the data: {counts}",
+        )
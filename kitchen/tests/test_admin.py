@@ -1,8 +1,12 @@
+from decimal import Decimal
+from unittest import mock
+
 from django.contrib.auth import get_user_model
 from django.test import TestCase, Client
 from django.urls import reverse
 
 from kitchen.models import DishType, Ingredient, Dish
+from kitchen.pagination import EstimatedCountPaginator
 
 
 class AdminSiteTests(TestCase):
@@ -85,15 +89,99 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
         self.assertContains(res, self.dish.name)
 
-    def test_dish_filter_horizontal_widgets(self):
+    def test_dish_autocomplete_widgets(self):
         """
-        Test that dish admin uses filter_horizontal for cooks and ingredients.
+        Test that dish admin uses autocomplete widgets for cooks and ingredients
+        and renders only the selected options.
         """
+        get_user_model().objects.create_user(username="unassigned_chef", password="p")
         url = reverse("admin:kitchen_dish_change", args=[self.dish.id])
         res = self.client.get(url)
-        # Проверяем наличие filter_horizontal виджетов
-        self.assertContains(res, "cooks")
-        self.assertContains(res, "ingredients")
+        self.assertContains(res, 'class="admin-autocomplete"', count=3)
+        self.assertContains(res, 'name="cooks"')
+        self.assertContains(res, 'name="ingredients"')
+        self.assertNotContains(res, "unassigned_chef")
+
+    def test_dish_changelist_queries_do_not_grow_with_rows(self):
+        """
+        Test that the dish changelist runs the same queries for one or many rows.
+        """
+        url = reverse("admin:kitchen_dish_changelist")
+        self.client.get(url)
+        with self.assertNumQueries(5):
+            self.client.get(url)
+        for index in range(5):
+            dish = Dish.objects.create(
+                name=f"dish {index}",
+                description="",
+                price=5,
+                dish_type=self.dish_type,
+            )
+            dish.cooks.add(self.cook, self.admin_user)
+        with self.assertNumQueries(5):
+            res = self.client.get(url)
+        self.assertContains(res, "admin, cook")
+
+    def test_estimated_count_paginator_counts_exactly_off_postgres(self):
+        """
+        Test that the estimated-count paginator falls back to COUNT(*).
+        """
+        paginator = EstimatedCountPaginator(Dish.objects.all(), 10)
+        self.assertEqual(paginator.count, 1)
+
+    def run_dish_action(self, action, **data):
+        url = reverse("admin:kitchen_dish_changelist")
+        return self.client.post(
+            url,
+            {"action": action, "_selected_action": [self.dish.pk], **data},
+            follow=True,
+        )
+
+    def test_retype_action(self):
+        """
+        Test that the retype action moves the selected dishes to a dish type.
+        """
+        soup = DishType.objects.create(name="Soup")
+        res = self.run_dish_action("retype_dishes", dish_type=soup.pk)
+        self.assertContains(res, "Moved 1 dishes")
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.dish_type, soup)
+
+    def test_reprice_action(self):
+        """
+        Test that the reprice action changes prices by a percentage in one UPDATE.
+        """
+        res = self.run_dish_action("reprice_dishes", price_change="-10")
+        self.assertContains(res, "Repriced 1 dishes")
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.price, Decimal("13.50"))
+
+    def test_reassign_action(self):
+        """
+        Test that the reassign action replaces the cooks of the selected dishes.
+        """
+        with mock.patch(
+            "kitchen.versioning.bump_version"
+        ) as bump_version, self.captureOnCommitCallbacks() as callbacks:
+            res = self.run_dish_action(
+                "reassign_dishes", cooks=[self.admin_user.pk]
+            )
+        self.assertContains(res, "Added 1 and removed 1 cook assignments.")
+        # One bump now and one on commit for both the removals and adds.
+        self.assertEqual(bump_version.call_count, 1)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(list(self.dish.cooks.all()), [self.admin_user])
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.cook_count, 1)
+
+    def test_action_without_input_changes_nothing(self):
+        """
+        Test that a bulk action without its input only shows a warning.
+        """
+        res = self.run_dish_action("reprice_dishes")
+        self.assertContains(res, "Enter a valid")
+        self.dish.refresh_from_db()
+        self.assertEqual(self.dish.price, 15)
 
     def test_dish_type_search_by_name(self):
         """
@@ -0,0 +1,139 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from kitchen.analytics import menu_analytics, rebuild_menu_analytics
+from kitchen.models import Dish, DishType, DishTypeStats
+from kitchen.visits import visit_buffer
+
+User = get_user_model()
+
+
+class MenuAnalyticsTests(TestCase):
+    def setUp(self):
+        self.soup = DishType.objects.create(name="Soup")
+        self.salad = DishType.objects.create(name="Salad")
+        self.dishes = [
+            Dish.objects.create(
+                name=f"Soup {price}",
+                description="",
+                price=price,
+                dish_type=self.soup,
+            )
+            for price in (4, 6, 8, 10, 30)
+        ]
+
+    def assertMatchesRebuild(self):
+        incremental = menu_analytics()
+        rebuild_menu_analytics()
+        self.assertEqual(incremental, menu_analytics())
+        return incremental
+
+    def row(self, dish_type):
+        for row in menu_analytics():
+            if row["dish_type_id"] == dish_type.pk:
+                return row
+        return None
+
+    def test_created_dishes_are_summarized(self):
+        [row] = self.assertMatchesRebuild()
+        self.assertEqual(row["dish_type"], "Soup")
+        self.assertEqual(row["dishes"], 5)
+        self.assertEqual(row["price_avg"], Decimal("11.60"))
+        self.assertEqual(row["price_min"], 4)
+        self.assertEqual(row["price_max"], 30)
+        quantiles = row["price_quantiles"]
+        self.assertTrue(7 <= quantiles["p50"] <= 8)  # the bucket of 8
+        self.assertTrue(
+            4 <= quantiles["p25"] <= quantiles["p75"] <= quantiles["p90"]
+            <= 30
+        )
+
+    def test_repricing_and_retyping(self):
+        cheapest, *_, dearest = self.dishes
+        cheapest.price = Decimal("5.50")
+        cheapest.save()
+        self.assertEqual(self.row(self.soup)["price_min"], Decimal("5.50"))
+
+        dearest.dish_type = self.salad
+        dearest.save()
+        self.assertEqual(self.row(self.soup)["price_max"], 10)
+        self.assertEqual(self.row(self.salad)["dishes"], 1)
+        self.assertMatchesRebuild()
+
+    def test_unrelated_saves_skip_the_lookup(self):
+        dish = self.dishes[0]
+        with self.assertNumQueries(3):  # the update and the search index
+            dish.save(update_fields=["name"])
+
+    def test_deleting_dishes_and_dish_types(self):
+        self.dishes[-1].delete()
+        self.assertEqual(self.row(self.soup)["price_max"], 10)
+        Dish.objects.filter(pk=self.dishes[0].pk).delete()
+        self.assertEqual(self.row(self.soup)["price_min"], 6)
+        self.assertMatchesRebuild()
+        for dish in self.dishes[1:-1]:
+            dish.delete()
+        self.assertIsNone(self.row(self.soup))
+        self.soup.delete()
+        self.assertFalse(DishTypeStats.objects.exists())
+
+    def test_admin_bulk_actions_rebuild_the_touched_types(self):
+        admin = User.objects.create_superuser(username="admin", password="p")
+        self.client.force_login(admin)
+        url = reverse("admin:kitchen_dish_changelist")
+        selected = [dish.pk for dish in self.dishes[:2]]
+        self.client.post(
+            url,
+            {
+                "action": "retype_dishes",
+                "_selected_action": selected,
+                "dish_type": self.salad.pk,
+            },
+        )
+        self.assertEqual(self.row(self.salad)["dishes"], 2)
+        self.client.post(
+            url,
+            {
+                "action": "reprice_dishes",
+                "_selected_action": selected,
+                "price_change": "50",
+            },
+        )
+        self.assertEqual(self.row(self.salad)["price_max"], 9)
+        self.assertMatchesRebuild()
+
+    def test_endpoint_and_dashboard_read_in_constant_queries(self):
+        self.client.force_login(
+            User.objects.create_user(username="anna", password="p")
+        )
+        url = reverse("kitchen:api-menu-analytics")
+        with self.assertNumQueries(4):  # session, user, stats, buckets
+            response = self.client.get(url)
+        [row] = response.json()["results"]
+        self.assertEqual(row["price_avg"], "11.60")
+
+        Dish.objects.bulk_create(
+            Dish(name="More", description="", price=7, dish_type=self.soup)
+            for _ in range(50)
+        )
+        rebuild_menu_analytics()
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.json()["results"][0]["dishes"], 55)
+
+        self.addCleanup(visit_buffer.flush)
+        response = self.client.get(reverse("kitchen:index"))
+        self.assertContains(response, "Prices by dish type")
+        self.assertContains(response, "<td>Soup</td>")
+
+    def test_rebuild_command(self):
+        DishTypeStats.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_menu_analytics", stdout=out)
+        self.assertIn("Summarized 1 dish types.", out.getvalue())
+        self.assertEqual(self.row(self.soup)["dishes"], 5)
@@ -0,0 +1,84 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from kitchen.models import DishType, Ingredient, Dish
+
+User = get_user_model()
+DISH_API_URL = reverse("kitchen:api-dish-list")
+
+
+class MenuApiTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="pos", password="p")
+        self.client.force_login(self.user)
+        self.dish_type = DishType.objects.create(name="Soup")
+        self.beet = Ingredient.objects.create(name="Beet")
+        self.dishes = []
+        for i in range(3):
+            dish = Dish.objects.create(
+                name=f"Borscht {i}",
+                description="",
+                price=8,
+                dish_type=self.dish_type,
+            )
+            dish.ingredients.add(self.beet)
+            self.dishes.append(dish)
+        self.dishes[0].cooks.add(self.user)
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertNotEqual(self.client.get(DISH_API_URL).status_code, 200)
+
+    def test_dish_list(self):
+        response = self.client.get(DISH_API_URL)
+        data = response.json()
+        self.assertIsNone(data["next"])
+        self.assertEqual(
+            data["results"][0],
+            {
+                "id": self.dishes[0].pk,
+                "name": "Borscht 0",
+                "description": "",
+                "price": "8.00",
+                "dish_type_id": self.dish_type.pk,
+                "ingredient_ids": [self.beet.pk],
+                "cook_ids": [self.user.pk],
+            },
+        )
+
+    def test_keyset_paging(self):
+        data = self.client.get(DISH_API_URL, {"limit": 2}).json()
+        self.assertEqual(len(data["results"]), 2)
+        data = self.client.get(
+            DISH_API_URL, {"limit": 2, "cursor": data["next"]}
+        ).json()
+        self.assertEqual(
+            [row["id"] for row in data["results"]], [self.dishes[2].pk]
+        )
+
+    def test_unchanged_poll_returns_304_without_queries(self):
+        etag = self.client.get(DISH_API_URL)["ETag"]
+        self.assertTrue(etag.startswith('"'))
+        with self.assertNumQueries(2):
+            # Only the session and user lookups of the login check.
+            response = self.client.get(DISH_API_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_etag_changes_with_data(self):
+        etag = self.client.get(DISH_API_URL)["ETag"]
+        self.beet.name = "Beetroot"
+        self.beet.save()
+        response = self.client.get(DISH_API_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_other_endpoints(self):
+        for name, key, value in (
+            ("kitchen:api-dish-type-list", "name", "Soup"),
+            ("kitchen:api-ingredient-list", "name", "Beet"),
+            ("kitchen:api-cook-list", "username", "pos"),
+        ):
+            data = self.client.get(reverse(name)).json()
+            self.assertEqual(data["results"][0][key], value)
@@ -0,0 +1,139 @@
+import shutil
+import tempfile
+from pathlib import Path
+
+from django.core.checks import run_checks
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from kitchen.assets import ReferencedAssetsFinder
+from kitchen.checks import check_template_assets
+
+
+def _templates(directory):
+    return [
+        {
+            "BACKEND": "django.template.backends.django.DjangoTemplates",
+            "DIRS": [directory],
+        }
+    ]
+
+
+class ReferencedAssetsTests(SimpleTestCase):
+    def collected(self):
+        return {
+            Path(path).as_posix()
+            for path, _ in ReferencedAssetsFinder().list(ignore_patterns=[])
+        }
+
+    def test_collects_only_referenced_files(self):
+        collected = self.collected()
+        self.assertIn("assets/css/soft-design-system.css", collected)
+        self.assertIn("assets/js/autocomplete.js", collected)
+        self.assertIn("assets/img/dish-menu.jpg", collected)
+        for unused in (
+            "assets/gulpfile.js",
+            "assets/package.json",
+            "assets/scss/soft-design-system.scss",
+            "assets/css/soft-design-system.min.css",
+            "assets/img/bruce-mars.jpg",
+        ):
+            self.assertNotIn(unused, collected)
+
+    def test_follows_stylesheet_references(self):
+        collected = self.collected()
+        self.assertIn("assets/fonts/nucleo-icons.woff2", collected)
+        self.assertIn("assets/css/soft-design-system.css.map", collected)
+        self.assertNotIn("assets/fonts/nucleo.woff2", collected)
+
+    def test_finder_still_finds_unreferenced_files(self):
+        self.assertTrue(ReferencedAssetsFinder().find("assets/gulpfile.js"))
+
+    def test_asset_tag(self):
+        self.assertEqual(
+            Template(
+                "{% load kitchen_assets %}{% asset 'js/autocomplete.js' %}"
+            ).render(Context()),
+            "/static/assets/js/autocomplete.js",
+        )
+
+
+class TemplateAssetCheckTests(SimpleTestCase):
+    def test_project_templates_pass(self):
+        self.assertEqual(check_template_assets(None), [])
+
+    def test_missing_asset_is_an_error(self):
+        templates = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, templates)
+        (templates / "page.html").write_text(
+            "{% load kitchen_assets %}{% load kitchen_images %}"
+            "<script src=\"{% asset 'js/autocomplete.js' %}\"></script>"
+            "<img src=\"{% asset 'img/missing.svg' %}\">"
+            "<div style=\"{% background_image 'img/gone.jpg' %}\"></div>"
+        )
+        with override_settings(TEMPLATES=_templates(templates)):
+            errors = run_checks(tags=["staticfiles"])
+        self.assertEqual(
+            [(error.id, error.obj) for error in errors],
+            [("kitchen.E001", "page.html")] * 2,
+        )
+        self.assertIn("'assets/img/missing.svg'", errors[0].msg)
+        self.assertIn("'assets/img/gone.jpg'", errors[1].msg)
+
+
+class HashedStaticFilesTests(TestCase):
+    def setUp(self):
+        root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, root)
+        (root / "templates").mkdir()
+        (root / "templates" / "page.html").write_text(
+            "{% load kitchen_assets %}"
+            "<link href=\"{% asset 'css/nucleo-icons.css' %}\">"
+        )
+        settings = override_settings(
+            STATIC_ROOT=root / "static",
+            TEMPLATES=_templates(root / "templates"),
+            STATICFILES_FINDERS=["kitchen.assets.ReferencedAssetsFinder"],
+            STORAGES={
+                "default": {
+                    "BACKEND": "django.core.files.storage.FileSystemStorage",
+                },
+                "staticfiles": {
+                    "BACKEND": "whitenoise.storage."
+                    "CompressedManifestStaticFilesStorage",
+                },
+            },
+            WHITENOISE_IMMUTABLE_FILE_TEST=r"\.[0-9a-f]{12}\.\w+$",
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        call_command("collectstatic", interactive=False, verbosity=0)
+        self.static_root = root / "static"
+
+    def test_writes_hashed_compressed_files(self):
+        url = Template(
+            "{% load kitchen_assets %}{% asset 'css/nucleo-icons.css' %}"
+        ).render(Context())
+        self.assertRegex(
+            url, r"^/static/assets/css/nucleo-icons\.\w{12}\.css$"
+        )
+        path = self.static_root / url.removeprefix("/static/")
+        for sibling in (".gz", ".br"):
+            self.assertTrue(Path(f"{path}{sibling}").exists())
+        self.assertRegex(
+            path.read_text(), r"\.\./fonts/nucleo-icons\.\w{12}\.woff2"
+        )
+        self.assertFalse((self.static_root / "assets/gulpfile.js").exists())
+
+    def test_hashed_files_are_served_immutable(self):
+        url = Template(
+            "{% load kitchen_assets %}{% asset 'css/nucleo-icons.css' %}"
+        ).render(Context())
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertIn("max-age=315360000", response["Cache-Control"])
+
+        response = self.client.get("/static/assets/css/nucleo-icons.css")
+        self.assertNotIn("immutable", response["Cache-Control"])
@@ -0,0 +1,161 @@
+import random
+import time
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from kitchen import assignments
+from kitchen.assignments import auto_assign, balance, bulk_assign
+from kitchen.counters import reconcile_relation_counts
+from kitchen.models import Dish, DishType
+
+User = get_user_model()
+
+
+class BalanceTests(SimpleTestCase):
+    def test_load_follows_experience(self):
+        needs = dict.fromkeys(range(300), 1)
+        cooks = {1: (0, 0), 2: (10, 0), 3: (20, 0)}
+        pairs = balance(needs, cooks)
+        loads = {cook_id: 0 for cook_id in cooks}
+        for _, cook_id in pairs:
+            loads[cook_id] += 1
+        # Capacities 1, 2 and 3.
+        self.assertEqual(loads, {1: 50, 2: 100, 3: 150})
+
+    def test_current_load_is_evened_out_first(self):
+        pairs = balance(dict.fromkeys(range(4), 1), {1: (0, 5), 2: (0, 1)})
+        self.assertEqual([cook_id for _, cook_id in pairs], [2, 2, 2, 2])
+
+    def test_no_cook_twice_on_a_dish(self):
+        pairs = balance({1: 2, 2: 3}, {7: (0, 0), 8: (0, 0)}, {1: {7}})
+        self.assertEqual(pairs, [(1, 8), (2, 7), (2, 8)])
+
+    def test_ten_thousand_dishes_over_a_thousand_cooks(self):
+        rng = random.Random(1)
+        needs = dict.fromkeys(range(10000), 2)
+        cooks = {
+            cook_id: (rng.randint(0, 40), rng.randint(0, 30))
+            for cook_id in range(1000)
+        }
+        started = time.perf_counter()
+        pairs = balance(needs, cooks)
+        self.assertLess(time.perf_counter() - started, 1)
+        self.assertEqual(len(set(pairs)), 20000)
+
+
+class AutoAssignTests(TestCase):
+    def setUp(self):
+        dish_type = DishType.objects.create(name="Main Course")
+        self.dishes = [
+            Dish.objects.create(
+                name=f"Dish {i}", description="", price=10, dish_type=dish_type
+            )
+            for i in range(6)
+        ]
+        self.junior = User.objects.create_user(
+            username="junior", password="p", years_of_experience=0
+        )
+        self.senior = User.objects.create_user(
+            username="senior", password="p", years_of_experience=10
+        )
+        User.objects.create_user(
+            username="retired", password="p", is_active=False
+        )
+        self.dishes[0].cooks.add(self.junior)
+
+    def test_dry_run_writes_nothing(self):
+        pairs = auto_assign(dry_run=True)
+        self.assertEqual(len(pairs), 5)
+        self.assertEqual(Dish.cooks.through.objects.count(), 1)
+
+    def test_assignment_is_balanced_and_counted(self):
+        pairs = auto_assign(cooks_per_dish=2)
+        self.assertEqual(len(pairs), 11)
+        self.assertEqual(
+            set(Dish.objects.values_list("cook_count", flat=True)), {2}
+        )
+        self.senior.refresh_from_db()
+        self.assertEqual(self.senior.dish_count, 6)
+        self.assertEqual(set(reconcile_relation_counts().values()), {0})
+        self.assertEqual(auto_assign(cooks_per_dish=2), [])
+
+    def test_view_previews_and_applies(self):
+        url = reverse("kitchen:dish-auto-assign")
+        self.client.force_login(self.junior)
+        self.assertEqual(self.client.post(url).status_code, 302)
+
+        self.client.force_login(
+            User.objects.create_superuser(username="admin", password="p")
+        )
+        dishes = [dish.pk for dish in self.dishes[:3]]
+        response = self.client.post(
+            url, {"dishes": dishes, "cooks_per_dish": 1, "dry_run": "on"}
+        )
+        self.assertEqual(
+            response.json(),
+            {
+                "dry_run": True,
+                "assigned": 2,
+                "dishes": 2,
+                "new_dishes_per_cook": {str(self.senior.pk): 2},
+            },
+        )
+        self.assertEqual(Dish.cooks.through.objects.count(), 1)
+        response = self.client.post(
+            url, {"dishes": dishes, "cooks_per_dish": 1}
+        )
+        self.assertEqual(response.json()["assigned"], 2)
+        self.assertEqual(Dish.cooks.through.objects.count(), 3)
+
+    def test_command(self):
+        out = StringIO()
+        call_command("auto_assign", "--dry-run", stdout=out)
+        self.assertIn("Would assign 5 dish cooks", out.getvalue())
+        call_command("auto_assign", stdout=out)
+        self.assertIn("Assigned 5 dish cooks", out.getvalue())
+        self.assertEqual(Dish.cooks.through.objects.count(), 6)
+
+    def test_stale_plan_writes_nothing(self):
+        # A pair linked between planning and applying fails the insert.
+        stale = mock.patch(
+            "kitchen.assignments.plan_auto_assignment",
+            return_value=[
+                (self.dishes[1].pk, self.senior.pk),
+                (self.dishes[0].pk, self.junior.pk),
+            ],
+        )
+        self.client.force_login(
+            User.objects.create_superuser(username="admin", password="p")
+        )
+        with stale:
+            response = self.client.post(
+                reverse("kitchen:dish-auto-assign"), {"cooks_per_dish": 1}
+            )
+            self.assertEqual(response.status_code, 409)
+            with self.assertRaisesMessage(CommandError, "run the command"):
+                call_command("auto_assign", stdout=StringIO())
+        self.assertEqual(Dish.cooks.through.objects.count(), 1)
+        self.assertEqual(set(reconcile_relation_counts().values()), {0})
+
+    def test_pair_linked_after_the_read_is_not_counted_twice(self):
+        dish = self.dishes[1]
+        real = assignments._existing_pairs
+
+        def raced(*args):
+            # A concurrent toggle links the pair right after the read.
+            existing = real(*args)
+            if not dish.cooks.exists():
+                dish.cooks.add(self.senior)
+            return existing
+
+        with mock.patch.object(assignments, "_existing_pairs", raced):
+            added = bulk_assign([self.senior.pk], [dish.pk])
+        self.assertEqual(added, 0)
+        dish.refresh_from_db()
+        self.assertEqual(dish.cook_count, 1)
+        self.assertEqual(set(reconcile_relation_counts().values()), {0})
@@ -0,0 +1,201 @@
+from importlib import import_module, reload
+import json
+from io import StringIO
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.urls import clear_url_caches, resolve, reverse
+
+import kitchen.urls
+from kitchen.exports import aiter_dishes, iter_dishes
+from kitchen.models import Dish, DishType, Ingredient
+from kitchen.pagination import encode_cursor
+from kitchen.visits import visit_buffer
+
+User = get_user_model()
+
+
+def reload_urls():
+    # The root URLconf holds resolvers for the old kitchen patterns.
+    reload(kitchen.urls)
+    reload(import_module(settings.ROOT_URLCONF))
+    clear_url_caches()
+
+
+@override_settings(KITCHEN_ASYNC_VIEWS=True)
+class AsyncViewsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Class cleanups run last first: registered before the settings
+        # override's own, this reload sees KITCHEN_ASYNC_VIEWS restored.
+        cls.addClassCleanup(reload_urls)
+        super().setUpClass()
+        reload_urls()
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="cook", password="p")
+        self.client.force_login(self.user)
+        self.dish_type = DishType.objects.create(name="Soup")
+        self.dishes = [
+            Dish.objects.create(
+                name=f"Dish {index}", price=10, dish_type=self.dish_type
+            )
+            for index in range(7)
+        ]
+
+    def test_views_are_async(self):
+        for url in (
+            reverse("kitchen:dish-list"),
+            reverse("kitchen:dish-type-list"),
+            reverse("kitchen:ingredient-list"),
+            reverse("kitchen:cook-list"),
+            reverse("kitchen:dish-detail", args=[self.dishes[0].pk]),
+            reverse("kitchen:cook-detail", args=[self.user.pk]),
+            reverse("kitchen:toggle-dish-assign", args=[self.dishes[0].pk]),
+            reverse("kitchen:dish-export"),
+        ):
+            self.assertTrue(iscoroutinefunction(resolve(url).func), url)
+
+    def test_login_required(self):
+        self.client.logout()
+        response = self.client.get(reverse("kitchen:dish-list"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_dish_list_paginates_with_cursor(self):
+        response = self.client.get(reverse("kitchen:dish-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, "kitchen/dish_list.html")
+        self.assertEqual(len(response.context["dish_list"]), 5)
+        page = response.context["page_obj"]
+        self.assertTrue(page.has_next())
+
+        response = self.client.get(
+            reverse("kitchen:dish-list"), {"cursor": page.next_cursor}
+        )
+        self.assertEqual(
+            [dish.name for dish in response.context["dish_list"]],
+            ["Dish 5", "Dish 6"],
+        )
+
+    def test_dish_list_invalid_cursor_404(self):
+        response = self.client.get(
+            reverse("kitchen:dish-list"), {"cursor": "nope"}
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            reverse("kitchen:dish-list"),
+            {"cursor": encode_cursor(["Soup", "abc"], "next")},
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_dish_list_ingredient_filter(self):
+        beet, dill = (
+            Ingredient.objects.create(name=name) for name in ("Beet", "Dill")
+        )
+        self.dishes[0].ingredients.add(beet)
+        self.dishes[1].ingredients.add(beet, dill)
+        response = self.client.get(
+            reverse("kitchen:dish-list"),
+            {"with_ingredients": [beet.pk], "without_ingredients": [dill.pk]},
+        )
+        self.assertEqual(list(response.context["dish_list"]), [self.dishes[0]])
+        self.assertEqual(
+            response.context["search_form"].initial["without_ingredients"],
+            [dill.pk],
+        )
+
+    def test_filtered_lists(self):
+        Ingredient.objects.create(name="Salt")
+        response = self.client.get(
+            reverse("kitchen:ingredient-list"), {"name": "sal"}
+        )
+        self.assertEqual(
+            list(response.context["ingredient_list"]),
+            list(Ingredient.objects.filter(name="Salt")),
+        )
+        response = self.client.get(
+            reverse("kitchen:cook-list"), {"username": "coo"}
+        )
+        self.assertEqual(list(response.context["cook_list"]), [self.user])
+        self.assertEqual(response.context["username"], "coo")
+
+    def test_dish_detail(self):
+        dish = self.dishes[0]
+        response = self.client.get(
+            reverse("kitchen:dish-detail", args=[dish.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["dish"], dish)
+        response = self.client.get(reverse("kitchen:dish-detail", args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_cook_detail(self):
+        self.dishes[0].cooks.add(self.user)
+        response = self.client.get(
+            reverse("kitchen:cook-detail", args=[self.user.pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Dish 0")
+
+    def test_toggle_assign(self):
+        dish = self.dishes[0]
+        url = reverse("kitchen:toggle-dish-assign", args=[dish.pk])
+        response = self.client.get(url, follow=True)
+        self.assertIn(self.user, dish.cooks.all())
+        self.assertContains(response, "You are now cooking")
+        self.client.get(url)
+        self.assertNotIn(self.user, dish.cooks.all())
+
+    async def test_export_streams_asynchronously(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(
+            reverse("kitchen:dish-export"), {"format": "jsonl"}
+        )
+        # An async iterator, which ASGI streams without buffering it.
+        self.assertTrue(response.is_async)
+        lines = [line async for line in response.streaming_content]
+        self.assertEqual(
+            [json.loads(line)["name"] for line in lines],
+            [dish.name for dish in self.dishes],
+        )
+
+    async def test_aiter_dishes_matches_iter_dishes(self):
+        # Seven dishes in chunks of three, and an exact multiple.
+        for chunk_size in (3, 7):
+            dishes = [
+                dish async for dish in aiter_dishes(chunk_size=chunk_size)
+            ]
+            self.assertEqual(
+                dishes, await sync_to_async(list)(iter_dishes())
+            )
+
+    async def test_async_client(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("kitchen:dish-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["dish_list"]), 5)
+
+
+class BenchmarkViewsTests(LiveServerTestCase):
+    def test_benchmark_against_live_server(self):
+        User.objects.create_user(username="bench", password="p")
+        # Logging in lands on the dashboard, which buffers a visit.
+        self.addCleanup(visit_buffer.flush)
+        out = StringIO()
+        call_command(
+            "benchmark_views",
+            "--wsgi-url", self.live_server_url,
+            "--asgi-url", self.live_server_url,
+            "--username", "bench",
+            "--password", "p",
+            "--requests", "8",
+            "--concurrency", "2",
+            stdout=out,
+        )
+        output = out.getvalue()
+        self.assertIn("0 errors", output)
+        self.assertIn("ASGI throughput is", output)
@@ -0,0 +1,344 @@
+import json
+import os
+import tempfile
+import time
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase
+
+from kitchen.counters import read_counters, reconcile_relation_counts
+from kitchen.ingredient_index import filter_dishes
+from kitchen.loadclient import Session
+from kitchen.management.commands.middleware_report import exclusive_times
+from kitchen.models import DishType, Ingredient, Dish
+from kitchen.search import search_dishes
+
+User = get_user_model()
+
+
+class ImportMenuTests(TestCase):
+    def setUp(self):
+        self.cook = User.objects.create_user(username="anna", password="p")
+        DishType.objects.create(name="Soup")
+
+    def import_file(self, suffix, content, *args):
+        handle, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(handle, "w", encoding="utf-8") as stream:
+            stream.write(content)
+        self.addCleanup(os.remove, path)
+        out, err = StringIO(), StringIO()
+        call_command("import_menu", path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_import_csv(self):
+        out, err = self.import_file(
+            ".csv",
+            "name,description,price,dish_type,ingredients,cooks\n"
+            "Borscht,Beet soup,8.50,Soup,Beet;Cabbage;Beet,anna;ghost\n"
+            "Kyiv cutlet,,12,Main,Chicken;Butter,\n"
+            ",Nameless,1,Soup,,\n",
+            "--batch-size", "2",
+        )
+        self.assertIn("Imported 2 dishes", out)
+        self.assertIn("rows/s", out)
+        self.assertIn("Row 3: skipped", err)
+
+        borscht = Dish.objects.get(name="Borscht")
+        self.assertEqual(borscht.dish_type.name, "Soup")
+        self.assertEqual(
+            sorted(borscht.ingredients.values_list("name", flat=True)),
+            ["Beet", "Cabbage"],
+        )
+        self.assertEqual(list(borscht.cooks.all()), [self.cook])
+        self.assertEqual(
+            (borscht.ingredient_count, borscht.cook_count), (2, 1)
+        )
+        self.cook.refresh_from_db()
+        self.assertEqual(self.cook.dish_count, 1)
+        self.assertEqual(set(reconcile_relation_counts().values()), {0})
+        self.assertEqual(DishType.objects.filter(name="Soup").count(), 1)
+        self.assertTrue(DishType.objects.filter(name="Main").exists())
+
+    def test_import_jsonl_keeps_derived_data_current(self):
+        Ingredient.objects.create(name="Beet")
+        rows = [
+            {
+                "name": f"Dish {i}",
+                "price": "9.99",
+                "dish_type": "Soup",
+                "ingredients": ["Beet", "Dill"],
+            }
+            for i in range(5)
+        ]
+        self.import_file(
+            ".jsonl", "\n".join(json.dumps(row) for row in rows) + "\n"
+        )
+        self.assertEqual(Ingredient.objects.count(), 2)
+        self.assertEqual(
+            read_counters(),
+            {"cooks": 1, "dishes": 5, "dish_types": 1, "ingredients": 2},
+        )
+        self.assertEqual(
+            len(search_dishes(Dish.objects.all(), "dill")), 5
+        )
+
+    def test_unknown_format(self):
+        with self.assertRaises(CommandError):
+            self.import_file(".txt", "")
+
+    def test_invalid_rows_are_skipped(self):
+        rows = [
+            [1, 2],
+            "x",
+            {"name": "Plain", "price": 1, "dish_type": "Soup"},
+            {"name": "x" * 256, "price": 1, "dish_type": "Soup"},
+            {"name": "Gold", "price": "123456.78", "dish_type": "Soup"},
+            {"name": "Odd", "price": 1, "dish_type": "Soup", "cooks": [1]},
+            {
+                "name": "Salad",
+                "price": "4.50",
+                "dish_type": "Starter",
+                "ingredients": "Tomato; Basil",
+            },
+        ]
+        out, err = self.import_file(
+            ".jsonl",
+            "\n".join(json.dumps(row) for row in rows) + "\n",
+            "--batch-size", "10",
+        )
+        self.assertIn("Imported 2 dishes", out)
+        self.assertIn("skipped 5 rows", out)
+        self.assertIn("Row 1: skipped (Not an object.)", err)
+        self.assertIn("Row 2: skipped (Not an object.)", err)
+        self.assertIn("Row 4: skipped (name: Ensure this value", err)
+        self.assertIn("Row 5: skipped (price: Ensure", err)
+        self.assertIn("Row 6: skipped (cooks:", err)
+        salad = Dish.objects.get(name="Salad")
+        self.assertEqual(
+            sorted(salad.ingredients.values_list("name", flat=True)),
+            ["Basil", "Tomato"],
+        )
+        self.assertEqual(
+            read_counters(),
+            {"cooks": 1, "dishes": 2, "dish_types": 2, "ingredients": 2},
+        )
+
+    def test_malformed_json(self):
+        with self.assertRaises(CommandError):
+            self.import_file(".jsonl", "{not json}\n")
+
+
+class ExportMenuTests(TestCase):
+    def setUp(self):
+        self.cook = User.objects.create_user(username="anna", password="p")
+        soup = DishType.objects.create(name="Soup")
+        beet = Ingredient.objects.create(name="Beet")
+        for i in range(3):
+            dish = Dish.objects.create(
+                name=f"Borscht {i}",
+                description="Beet soup, with dill",
+                price=8,
+                dish_type=soup,
+            )
+            dish.ingredients.add(beet)
+        dish.cooks.add(self.cook)
+
+    def export(self, *args):
+        out = StringIO()
+        call_command("export_menu", *args, stdout=out)
+        return out.getvalue()
+
+    def test_export_jsonl(self):
+        lines = self.export("--format", "jsonl").splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(
+            json.loads(lines[-1]),
+            {
+                "id": Dish.objects.get(name="Borscht 2").pk,
+                "name": "Borscht 2",
+                "description": "Beet soup, with dill",
+                "price": "8.00",
+                "dish_type": "Soup",
+                "ingredients": ["Beet"],
+                "cooks": ["anna"],
+            },
+        )
+
+    def test_export_batches_queries_per_chunk(self):
+        with self.assertNumQueries(1 + 2 * 3):
+            self.export("--chunk-size", "1")
+        with self.assertNumQueries(3):
+            self.export("--chunk-size", "100")
+
+    def test_csv_export_round_trips_through_import(self):
+        handle, path = tempfile.mkstemp(suffix=".csv")
+        os.close(handle)
+        self.addCleanup(os.remove, path)
+        call_command("export_menu", "--output", path)
+        Dish.objects.all().delete()
+
+        call_command("import_menu", path, stdout=StringIO())
+        dish = Dish.objects.get(name="Borscht 2")
+        self.assertEqual(dish.description, "Beet soup, with dill")
+        self.assertEqual(list(dish.cooks.all()), [self.cook])
+        self.assertEqual(Ingredient.objects.count(), 1)
+
+
+class MiddlewareReportTests(SimpleTestCase):
+    def test_exclusive_times(self):
+        # Outer middleware took 1 + 1, inner 2 + 3, innermost answered.
+        marks = [[0, 10], [1, 9], [3, 6]]
+        self.assertEqual(exclusive_times(marks, 3), [2, 5, 3])
+        self.assertEqual(exclusive_times(marks[:1], 2), [10, 0])
+
+    def test_reports_every_middleware(self):
+        out = StringIO()
+        call_command("middleware_report", requests=3, stdout=out)
+        output = out.getvalue()
+        for entry in settings.MIDDLEWARE:
+            self.assertRegex(output, rf"{entry}\s+\d+\.\d\s+-?\d+\.\d")
+        self.assertIn("DebugToolbarMiddleware", output)
+        self.assertIn(f"{len(settings.MIDDLEWARE)} middleware add", output)
+
+
+class LoadClientTests(SimpleTestCase):
+    def test_cookies_expire(self):
+        session = Session("http://testserver", 1)
+        session._store_cookies("sessionid=abc; Path=/")
+        session._store_cookies("kitchen_primary=1; Max-Age=10; Path=/")
+        self.assertEqual(session.cookie("kitchen_primary"), "1")
+        with mock.patch("time.monotonic", return_value=time.monotonic() + 11):
+            self.assertIsNone(session.cookie("kitchen_primary"))
+        self.assertEqual(session.cookie("sessionid"), "abc")
+
+        session._store_cookies("kitchen_primary=1; Max-Age=10")
+        session._store_cookies(
+            'kitchen_primary=""; expires=Thu, 01 Jan 1970 00:00:00 GMT; '
+            "Max-Age=0; Path=/"
+        )
+        session._store_cookies(
+            "sessionid=; expires=Thu, 01 Jan 1970 00:00:00 GMT; Path=/"
+        )
+        self.assertEqual(session.cookies, {})
+
+
+class LoadtestTests(LiveServerTestCase):
+    def test_loadtest_against_live_server(self):
+        for username in ("anna", "boris"):
+            User.objects.create_user(username=username, password="p")
+        dish_type = DishType.objects.create(name="Soup")
+        Dish.objects.create(
+            name="Borscht", description="", price=8, dish_type=dish_type
+        )
+        out = StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "run.json")
+            call_command(
+                "loadtest",
+                "--url", self.live_server_url,
+                "--password", "p",
+                "--requests", "40",
+                # The live server threads share one in-memory SQLite
+                # connection, which concurrent writes would trip over.
+                "--concurrency", "1",
+                "--output", path,
+                stdout=out,
+            )
+            with open(path, encoding="utf-8") as stream:
+                report = json.load(stream)
+        self.assertIn("40 requests in", out.getvalue())
+        self.assertEqual(report["users"], 2)
+        self.assertEqual(report["total"]["requests"], 40)
+        self.assertEqual(report["total"]["errors"], 0)
+        self.assertEqual(
+            sum(row["requests"] for row in report["urls"].values()), 40
+        )
+        self.assertLessEqual(
+            report["urls"]["kitchen:dish-list"]["p50_ms"],
+            report["urls"]["kitchen:dish-list"]["p99_ms"],
+        )
+
+    def test_unknown_scenario(self):
+        with self.assertRaisesMessage(CommandError, "Unknown scenario"):
+            call_command(
+                "loadtest", "--password", "p", "--mix", "kitchen:nope=1"
+            )
+
+
+class SeedKitchenTests(TestCase):
+    def seed(self, *args):
+        out = StringIO()
+        call_command(
+            "seed_kitchen",
+            "--cooks", "20",
+            "--dish-types", "5",
+            "--ingredients", "40",
+            "--dishes", "300",
+            "--batch-size", "128",
+            *args,
+            stdout=out,
+        )
+        return out.getvalue()
+
+    def snapshot(self):
+        return (
+            list(Dish.objects.order_by("pk").values_list("name", "price")),
+            list(
+                Dish.ingredients.through.objects.order_by("pk").values_list(
+                    "dish__name", "ingredient__name"
+                )
+            ),
+        )
+
+    def test_seed_is_consistent(self):
+        output = self.seed()
+        self.assertIn("Seeded 20 cooks, 5 dish types, 40 ingredients", output)
+        self.assertEqual(Dish.objects.count(), 300)
+        self.assertTrue(
+            self.client.login(username="seed_cook_00", password="kitchen")
+        )
+        self.assertEqual(set(reconcile_relation_counts().values()), {0})
+        self.assertEqual(read_counters()["dishes"], 300)
+        self.assertEqual(
+            search_dishes(Dish.objects.all(), "soup").count(),
+            Dish.objects.filter(dish_type__name="Soup").count(),
+        )
+        popular = list(
+            Ingredient.objects.order_by("pk").values_list("pk", flat=True)[:2]
+        )
+        self.assertEqual(
+            set(filter_dishes(Dish.objects.all(), all_of=popular)),
+            set(
+                Dish.objects.filter(ingredients=popular[0]).filter(
+                    ingredients=popular[1]
+                )
+            ),
+        )
+        with self.assertRaisesMessage(CommandError, "already seeded"):
+            self.seed()
+
+    def test_degrees_are_skewed(self):
+        self.seed("--skew", "1.5")
+        counts = list(
+            User.objects.order_by("-dish_count").values_list(
+                "dish_count", flat=True
+            )
+        )
+        self.assertGreater(counts[0], 5 * counts[len(counts) // 2])
+
+    def test_same_seed_same_data(self):
+        def reseed(*args):
+            for model in (Dish, User, DishType, Ingredient):
+                model.objects.all().delete()
+            self.seed(*args)
+
+        self.seed()
+        first = self.snapshot()
+        reseed()
+        self.assertEqual(self.snapshot(), first)
+        reseed("--seed", "7")
+        self.assertNotEqual(self.snapshot()[0], first[0])
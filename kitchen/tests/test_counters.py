@@ -0,0 +1,213 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from kitchen.assignments import (
+    bulk_assign,
+    bulk_unassign,
+    toggle_assignment,
+)
+from kitchen.counters import read_counters, reconcile_relation_counts
+from kitchen.models import DashboardCounter, DishType, Ingredient, Dish
+
+User = get_user_model()
+
+
+class DashboardCounterTests(TestCase):
+    def setUp(self):
+        self.dish_type = DishType.objects.create(name="Soup")
+
+    def test_counters_follow_creates_and_deletes(self):
+        Ingredient.objects.create(name="Tomato")
+        beet = Ingredient.objects.create(name="Beet")
+        Dish.objects.create(
+            name="Borscht", description="", price=8, dish_type=self.dish_type
+        )
+        User.objects.create_user(username="cook", password="pass")
+        beet.delete()
+        self.assertEqual(
+            read_counters(),
+            {"cooks": 1, "dishes": 1, "dish_types": 1, "ingredients": 1},
+        )
+
+    def test_cascade_delete_updates_dish_counter(self):
+        Dish.objects.create(
+            name="Borscht", description="", price=8, dish_type=self.dish_type
+        )
+        self.dish_type.delete()
+        counters = read_counters()
+        self.assertEqual(counters["dishes"], 0)
+        self.assertEqual(counters["dish_types"], 0)
+
+    def test_updates_do_not_change_counters(self):
+        self.dish_type.name = "Soups"
+        self.dish_type.save()
+        self.assertEqual(read_counters()["dish_types"], 1)
+
+    def test_read_counters_is_one_query(self):
+        with self.assertNumQueries(1):
+            read_counters()
+
+    def test_reconcile_command_fixes_drift(self):
+        Ingredient.objects.bulk_create(
+            [Ingredient(name="Salt"), Ingredient(name="Pepper")]
+        )
+        DashboardCounter.objects.filter(name="dish_types").update(value=42)
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertEqual(
+            read_counters(),
+            {"cooks": 0, "dishes": 0, "dish_types": 1, "ingredients": 2},
+        )
+        self.assertIn("dish_types: 1 (drift -41)", out.getvalue())
+
+    def test_missing_counter_is_recounted(self):
+        DashboardCounter.objects.filter(name="dish_types").delete()
+        self.assertEqual(read_counters()["dish_types"], 1)
+
+    def test_index_uses_counters(self):
+        user = User.objects.create_user(username="cook", password="pass")
+        self.client.force_login(user)
+        response = self.client.get(reverse("kitchen:index"))
+        self.assertEqual(response.context["num_cooks"], 1)
+        self.assertEqual(response.context["num_dish_types"], 1)
+
+
+class RelationCountTests(TestCase):
+    def setUp(self):
+        dish_type = DishType.objects.create(name="Soup")
+        self.borscht = Dish.objects.create(
+            name="Borscht", description="", price=8, dish_type=dish_type
+        )
+        self.solyanka = Dish.objects.create(
+            name="Solyanka", description="", price=9, dish_type=dish_type
+        )
+        self.anna = User.objects.create_user(username="anna", password="p")
+        self.ivan = User.objects.create_user(username="ivan", password="p")
+        self.beet = Ingredient.objects.create(name="Beet")
+        self.salt = Ingredient.objects.create(name="Salt")
+
+    def assertCounts(self, dish, cook_count, ingredient_count):
+        dish.refresh_from_db()
+        self.assertEqual(
+            (dish.cook_count, dish.ingredient_count),
+            (cook_count, ingredient_count),
+        )
+
+    def assertDishCount(self, cook, dish_count):
+        cook.refresh_from_db()
+        self.assertEqual(cook.dish_count, dish_count)
+
+    def test_forward_add_remove_and_clear(self):
+        self.borscht.cooks.add(self.anna, self.ivan)
+        self.borscht.ingredients.add(self.beet, self.salt)
+        self.assertEqual(self.borscht.cook_count, 2)
+        self.assertCounts(self.borscht, 2, 2)
+        self.assertDishCount(self.anna, 1)
+
+        self.borscht.cooks.remove(self.anna)
+        self.borscht.ingredients.clear()
+        self.assertCounts(self.borscht, 1, 0)
+        self.assertDishCount(self.anna, 0)
+        self.assertDishCount(self.ivan, 1)
+
+    def test_reverse_add_remove_and_clear(self):
+        self.anna.dishes.add(self.borscht, self.solyanka)
+        self.assertDishCount(self.anna, 2)
+        self.assertCounts(self.solyanka, 1, 0)
+
+        self.beet.dish_ingredients.add(self.borscht)
+        self.beet.dish_ingredients.clear()
+        self.anna.dishes.clear()
+        self.assertDishCount(self.anna, 0)
+        self.assertCounts(self.borscht, 0, 0)
+
+    def test_adding_twice_and_removing_unlinked_rows_do_not_drift(self):
+        self.borscht.cooks.add(self.anna)
+        self.borscht.cooks.add(self.anna)
+        self.borscht.cooks.remove(self.anna, self.ivan)
+        self.assertCounts(self.borscht, 0, 0)
+        self.assertDishCount(self.anna, 0)
+        self.assertDishCount(self.ivan, 0)
+
+    def test_save_after_change_keeps_count(self):
+        self.borscht.cooks.add(self.anna)
+        self.borscht.name = "Red borscht"
+        self.borscht.save()
+        self.assertCounts(self.borscht, 1, 0)
+
+    def test_deletes_update_the_other_side(self):
+        self.borscht.cooks.add(self.anna, self.ivan)
+        self.borscht.ingredients.add(self.beet)
+        self.solyanka.cooks.add(self.anna)
+
+        self.ivan.delete()
+        self.beet.delete()
+        self.assertCounts(self.borscht, 1, 0)
+
+        self.borscht.delete()
+        self.assertDishCount(self.anna, 1)
+        self.solyanka.dish_type.delete()
+        self.assertDishCount(self.anna, 0)
+
+    def test_assignment_helpers(self):
+        toggle_assignment(self.anna.pk, self.borscht.pk)
+        bulk_assign(
+            [self.anna.pk, self.ivan.pk],
+            [self.borscht.pk, self.solyanka.pk],
+        )
+        self.assertDishCount(self.anna, 2)
+        self.assertCounts(self.borscht, 2, 0)
+
+        bulk_unassign([self.ivan.pk], [self.borscht.pk, self.solyanka.pk])
+        toggle_assignment(self.anna.pk, self.borscht.pk)
+        self.assertDishCount(self.anna, 1)
+        self.assertDishCount(self.ivan, 0)
+        self.assertCounts(self.borscht, 0, 0)
+        self.assertCounts(self.solyanka, 1, 0)
+        self.assertEqual(set(reconcile_relation_counts().values()), {0})
+
+    def test_reconcile_fixes_drift(self):
+        self.borscht.cooks.add(self.anna)
+        Dish.objects.filter(pk=self.borscht.pk).update(
+            cook_count=5, ingredient_count=3
+        )
+        User.objects.filter(pk=self.ivan.pk).update(dish_count=1)
+        self.assertEqual(
+            reconcile_relation_counts(),
+            {
+                "dish.cook_count": 1,
+                "cook.dish_count": 1,
+                "dish.ingredient_count": 1,
+            },
+        )
+        self.assertCounts(self.borscht, 1, 0)
+        self.assertDishCount(self.ivan, 0)
+        out = StringIO()
+        call_command("reconcile_counters", stdout=out)
+        self.assertIn("dish.cook_count: 0 rows fixed", out.getvalue())
+
+    def test_lists_sort_by_counts(self):
+        self.solyanka.cooks.add(self.anna, self.ivan)
+        self.solyanka.ingredients.add(self.beet)
+        self.ivan.dishes.add(self.borscht)
+        self.client.force_login(self.anna)
+
+        response = self.client.get(
+            reverse("kitchen:dish-list"), {"sort": "cooks"}
+        )
+        self.assertEqual(
+            list(response.context["dish_list"]),
+            [self.solyanka, self.borscht],
+        )
+        self.assertContains(response, "<td>2</td>")
+
+        response = self.client.get(
+            reverse("kitchen:cook-list"), {"sort": "dishes"}
+        )
+        self.assertEqual(
+            list(response.context["cook_list"]), [self.ivan, self.anna]
+        )
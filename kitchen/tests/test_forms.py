@@ -134,13 +134,43 @@ class DishFormTests(TestCase):
     def test_form_widgets(self):
         form = DishForm()
         self.assertEqual(
-            form.fields["cooks"].widget.__class__.__name__, "CheckboxSelectMultiple"
+            form.fields["cooks"].widget.__class__.__name__,
+            "AutocompleteSelectMultiple",
         )
         self.assertEqual(
             form.fields["ingredients"].widget.__class__.__name__,
-            "CheckboxSelectMultiple",
+            "AutocompleteSelectMultiple",
         )
 
+    def test_widget_renders_only_selected_options(self):
+        dish = Dish.objects.create(
+            name="Salad",
+            description="",
+            price=5,
+            dish_type=self.dish_type,
+        )
+        dish.ingredients.add(self.ingredient1)
+        html = str(DishForm(instance=dish)["ingredients"])
+        self.assertIn("Tomato", html)
+        self.assertNotIn("Cheese", html)
+        self.assertIn('data-autocomplete-url="/kitchen/ingredients/autocomplete/"', html)
+        self.assertNotIn("cook1", str(DishForm(instance=dish)["cooks"]))
+
+    def test_form_rejects_unknown_ids(self):
+        form_data = {
+            "name": "Test Dish",
+            "description": "Test description",
+            "price": 15.50,
+            "dish_type": self.dish_type.id,
+            "ingredients": [self.ingredient1.id, 999999],
+        }
+        form = DishForm(data=form_data)
+        self.assertFalse(form.is_valid())
+        self.assertIn("ingredients", form.errors)
+        html = str(form["ingredients"])
+        self.assertIn(f'value="{self.ingredient1.id}" selected', html)
+        self.assertNotIn('value="999999"', html)
+
     def test_form_required_fields(self):
         form = DishForm()
         self.assertFalse(form.fields["cooks"].required)
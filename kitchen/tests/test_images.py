@@ -0,0 +1,146 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from kitchen.images import build_variants, load_manifest, manifest_path
+
+
+class ImageVariantTests(SimpleTestCase):
+    def setUp(self):
+        self.static_root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.static_root)
+        self.templates = self.static_root / "templates"
+        self.templates.mkdir()
+        img = self.static_root / "assets" / "img"
+        (img / "icons").mkdir(parents=True)
+        Image.new("RGB", (1000, 500), "red").save(img / "hero.jpg")
+        Image.new("RGBA", (300, 200), (0, 0, 0, 0)).save(img / "icons/a.png")
+
+        settings = override_settings(
+            STATIC_ROOT=self.static_root,
+            TEMPLATES=[
+                {
+                    "BACKEND": "django.template.backends.django."
+                    "DjangoTemplates",
+                    "DIRS": [self.templates],
+                }
+            ],
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(load_manifest.cache_clear)
+        load_manifest.cache_clear()
+
+    def render(self, source):
+        return Template(source).render(Context())
+
+    def test_builds_variants_and_manifest(self):
+        manifest = build_variants()
+        self.assertEqual(json.loads(manifest_path().read_text()), manifest)
+        hero = manifest["img/hero.jpg"]
+        self.assertEqual(hero["width"], 1000)
+        self.assertEqual(
+            sorted({variant["width"] for variant in hero["variants"]}),
+            [480, 960, 1000],
+        )
+        self.assertEqual(
+            {variant["format"] for variant in hero["variants"]},
+            {"avif", "webp"},
+        )
+        for variant in hero["variants"]:
+            path = self.static_root / "assets" / variant["path"]
+            self.assertEqual(path.stat().st_size, variant["bytes"])
+            with Image.open(path) as image:
+                self.assertEqual(image.width, variant["width"])
+        icon = manifest["img/icons/a.png"]
+        self.assertRegex(
+            icon["variants"][0]["path"],
+            r"^img/variants/icons/a-300\.[0-9a-f]{12}\.avif$",
+        )
+
+    def test_up_to_date_variants_are_not_reencoded(self):
+        manifest = build_variants()
+        variant = self.static_root / "assets" / manifest["img/hero.jpg"][
+            "variants"
+        ][0]["path"]
+        mtime = variant.stat().st_mtime_ns
+        self.assertEqual(build_variants(), manifest)
+        self.assertEqual(variant.stat().st_mtime_ns, mtime)
+
+    def test_changed_source_gets_new_names_and_old_ones_are_deleted(self):
+        old = build_variants()["img/hero.jpg"]["variants"][0]["path"]
+        img = self.static_root / "assets" / "img"
+        Image.new("RGB", (1000, 500), "blue").save(img / "hero.jpg")
+        # The hashed copy collectstatic writes next to the original.
+        shutil.copy(img / "hero.jpg", img / "hero.0123456789ab.jpg")
+        manifest = build_variants()
+        self.assertEqual(set(manifest), {"img/hero.jpg", "img/icons/a.png"})
+        new = manifest["img/hero.jpg"]["variants"][0]["path"]
+        self.assertNotEqual(new, old)
+        self.assertTrue((self.static_root / "assets" / new).exists())
+        self.assertFalse((self.static_root / "assets" / old).exists())
+
+    def test_background_image_without_manifest(self):
+        self.assertEqual(
+            self.render(
+                "{% load kitchen_images %}"
+                "{% background_image 'img/hero.jpg' %}"
+            ),
+            "background-image: url('/static/assets/img/hero.jpg');",
+        )
+
+    def test_background_image_uses_smallest_covering_variants(self):
+        build_variants()
+        output = self.render(
+            "{% load kitchen_images %}"
+            "{% background_image 'img/hero.jpg' 600 %}"
+        )
+        self.assertRegex(
+            output,
+            r"url\('/static/assets/img/variants/hero-960\.\w{12}\.avif'\) "
+            r"type\('image/avif'\) 1x, "
+            r"url\('/static/assets/img/variants/hero-1000\.\w{12}\.avif'\) "
+            r"type\('image/avif'\) 2x",
+        )
+        self.assertRegex(output, r"hero-960\.\w{12}\.webp")
+        self.assertNotIn("hero-480", output)
+        self.assertTrue(
+            output.endswith("url('/static/assets/img/hero.jpg') 1x);")
+        )
+
+    def test_image_srcset(self):
+        build_variants()
+        self.assertRegex(
+            self.render(
+                "{% load kitchen_images %}"
+                "{% image_srcset 'img/hero.jpg' 'webp' %}"
+            ),
+            r"^/static/assets/img/variants/hero-480\.\w{12}\.webp 480w, "
+            r"/static/assets/img/variants/hero-960\.\w{12}\.webp 960w, "
+            r"/static/assets/img/variants/hero-1000\.\w{12}\.webp 1000w$",
+        )
+        self.assertEqual(
+            self.render(
+                "{% load kitchen_images %}"
+                "{% image_srcset 'img/missing.jpg' 'webp' %}"
+            ),
+            "/static/assets/img/missing.jpg",
+        )
+
+    def test_command_reports_bytes_saved_per_page(self):
+        (self.templates / "page.html").write_text(
+            "<div style=\"{% background_image 'img/hero.jpg' 480 %}\">"
+        )
+        out = StringIO()
+        call_command("optimize_images", stdout=out)
+        output = out.getvalue()
+        self.assertIn("2 images, 8 variants", output)
+        self.assertRegex(output, r"page\.html: .* -> .* \(saved .*\)")
+        self.assertIn("Pages load", output)
@@ -0,0 +1,189 @@
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kitchen import ingredient_index
+from kitchen.ingredient_index import (
+    compact_ingredient_index,
+    decode,
+    encode,
+    filter_dishes,
+    matching_dish_ids,
+    rebuild_ingredient_index,
+)
+from kitchen.models import (
+    Dish,
+    DishType,
+    Ingredient,
+    IngredientPostingDelta,
+    IngredientPostings,
+)
+
+User = get_user_model()
+
+
+def postings():
+    compact_ingredient_index()
+    return {
+        row.ingredient_id: list(decode(row.dish_ids))
+        for row in IngredientPostings.objects.all()
+    }
+
+
+class IngredientIndexTests(TestCase):
+    def setUp(self):
+        soup = DishType.objects.create(name="Soup")
+        self.tomato, self.garlic, self.cream = (
+            Ingredient.objects.create(name=name)
+            for name in ("Tomato", "Garlic", "Cream")
+        )
+        self.gazpacho, self.bisque, self.borscht = (
+            Dish.objects.create(
+                name=name, description="", price=8, dish_type=soup
+            )
+            for name in ("Gazpacho", "Bisque", "Borscht")
+        )
+        self.gazpacho.ingredients.add(self.tomato, self.garlic)
+        self.bisque.ingredients.add(self.tomato, self.cream)
+        self.borscht.ingredients.add(self.garlic, self.cream)
+
+    def match(self, all_of=(), none_of=()):
+        return set(
+            filter_dishes(
+                Dish.objects.all(),
+                all_of=[ingredient.pk for ingredient in all_of],
+                none_of=[ingredient.pk for ingredient in none_of],
+            )
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = postings()
+        rebuild_ingredient_index()
+        self.assertEqual(incremental, postings())
+
+    def test_all_of_and_none_of(self):
+        self.assertEqual(
+            self.match([self.tomato]), {self.gazpacho, self.bisque}
+        )
+        self.assertEqual(
+            self.match([self.tomato, self.garlic]), {self.gazpacho}
+        )
+        self.assertEqual(
+            self.match([self.tomato], [self.cream]), {self.gazpacho}
+        )
+        self.assertEqual(self.match(none_of=[self.tomato]), {self.borscht})
+        self.assertEqual(
+            self.match([self.tomato, self.garlic, self.cream]), set()
+        )
+        unused = Ingredient.objects.create(name="Saffron")
+        self.assertEqual(self.match([unused]), set())
+        self.assertEqual(len(self.match(none_of=[unused])), 3)
+
+    def test_intersection_runs_in_memory(self):
+        # The postings, their pending deltas, then the dishes.
+        with self.assertNumQueries(3):
+            self.match([self.tomato, self.garlic], [self.cream])
+
+    def test_unselective_filters_fall_back_to_semi_joins(self):
+        with mock.patch.object(ingredient_index, "MAX_ID_LIST", 1):
+            self.assertEqual(
+                self.match([self.tomato], [self.cream]), {self.gazpacho}
+            )
+            self.assertEqual(
+                self.match(none_of=[self.tomato]), {self.borscht}
+            )
+
+    def test_index_follows_link_changes(self):
+        self.gazpacho.ingredients.remove(self.garlic)
+        self.assertEqual(self.match([self.garlic]), {self.borscht})
+        self.tomato.dish_ingredients.add(self.borscht)
+        self.assertEqual(len(self.match([self.tomato])), 3)
+        self.cream.dish_ingredients.clear()
+        self.assertEqual(self.match([self.cream]), set())
+        self.bisque.ingredients.set([self.garlic])
+        self.assertEqual(
+            self.match([self.garlic]), {self.bisque, self.borscht}
+        )
+        self.assertMatchesRebuild()
+
+    def test_index_follows_deletes(self):
+        self.bisque.delete()
+        self.assertEqual(self.match([self.cream]), {self.borscht})
+        Dish.objects.filter(pk=self.borscht.pk).delete()
+        self.assertEqual(self.match([self.cream]), set())
+        self.garlic.delete()
+        self.assertEqual(set(postings()), {self.tomato.pk})
+        self.assertMatchesRebuild()
+
+    def test_link_changes_do_not_rewrite_large_postings(self):
+        packed = [self.gazpacho.pk, self.bisque.pk]
+        packed += range(10**6, 10**6 + 100000)
+        rebuild_ingredient_index(ingredient_ids=[self.tomato.pk])
+        IngredientPostings.objects.filter(pk=self.tomato.pk).update(
+            dish_ids=encode(packed), dish_count=len(packed)
+        )
+        with CaptureQueriesContext(connection) as queries:
+            self.tomato.dish_ingredients.add(self.borscht)
+            self.tomato.dish_ingredients.remove(self.gazpacho)
+        # Each change appends a delta; nothing reads or writes the 800 kB
+        # of packed postings.
+        self.assertFalse(
+            [q for q in queries if "ingredientpostings" in q["sql"]]
+        )
+        self.assertLess(sum(len(q["sql"]) for q in queries), 10000)
+        dish_ids, _ = matching_dish_ids([self.tomato.pk])
+        self.assertEqual(len(dish_ids), 100002)
+        self.assertIn(self.borscht.pk, dish_ids)
+        self.assertNotIn(self.gazpacho.pk, dish_ids)
+
+    def test_pending_deltas_are_compacted(self):
+        with mock.patch.object(ingredient_index, "COMPACT_AFTER", 3):
+            self.borscht.ingredients.add(self.tomato)
+        self.assertFalse(
+            IngredientPostingDelta.objects.filter(ingredient=self.tomato)
+        )
+        row = IngredientPostings.objects.get(pk=self.tomato.pk)
+        self.assertEqual(
+            list(decode(row.dish_ids)),
+            sorted([self.gazpacho.pk, self.bisque.pk, self.borscht.pk]),
+        )
+        self.assertTrue(
+            IngredientPostingDelta.objects.filter(ingredient=self.garlic)
+        )
+        out = StringIO()
+        call_command("compact_ingredient_index", stdout=out)
+        self.assertIn("Compacted 2 ingredients.", out.getvalue())
+        self.assertFalse(IngredientPostingDelta.objects.exists())
+
+    def test_rebuild_command(self):
+        IngredientPostings.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_ingredient_index", stdout=out)
+        self.assertIn("Indexed 3 ingredients.", out.getvalue())
+        self.assertEqual(
+            postings()[self.tomato.pk],
+            sorted([self.gazpacho.pk, self.bisque.pk]),
+        )
+
+    def test_dish_list_filter(self):
+        self.client.force_login(
+            User.objects.create_user(username="anna", password="p")
+        )
+        response = self.client.get(
+            reverse("kitchen:dish-list"),
+            {
+                "with_ingredients": [self.tomato.pk, "junk"],
+                "without_ingredients": [self.garlic.pk],
+            },
+        )
+        self.assertEqual(list(response.context["dish_list"]), [self.bisque])
+        self.assertEqual(
+            response.context["search_form"].initial["with_ingredients"],
+            [self.tomato.pk],
+        )
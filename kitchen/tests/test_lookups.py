@@ -0,0 +1,36 @@
+from django.test import TestCase
+
+from kitchen.models import Ingredient
+
+
+class TrigramContainsLookupTests(TestCase):
+    def setUp(self):
+        Ingredient.objects.create(name="Tomato")
+        Ingredient.objects.create(name="Potato")
+        Ingredient.objects.create(name="100% Cocoa")
+
+    def test_case_insensitive_substring(self):
+        names = Ingredient.objects.filter(
+            name__trigram_contains="TOMAT"
+        ).values_list("name", flat=True)
+        self.assertEqual(list(names), ["Tomato"])
+
+    def test_matches_like_icontains(self):
+        for term in ("ato", "o", "xyz"):
+            self.assertEqual(
+                list(Ingredient.objects.filter(name__trigram_contains=term)),
+                list(Ingredient.objects.filter(name__icontains=term)),
+            )
+
+    def test_wildcards_are_escaped(self):
+        names = Ingredient.objects.filter(
+            name__trigram_contains="0%"
+        ).values_list("name", flat=True)
+        self.assertEqual(list(names), ["100% Cocoa"])
+        self.assertFalse(Ingredient.objects.filter(name__trigram_contains="_"))
+
+    def test_startswith(self):
+        names = Ingredient.objects.filter(
+            name__trigram_startswith="pot"
+        ).values_list("name", flat=True)
+        self.assertEqual(list(names), ["Potato"])
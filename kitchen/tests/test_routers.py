@@ -0,0 +1,118 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from kitchen.middleware import PIN_COOKIE
+from kitchen.models import DashboardCounter, Dish, DishType
+from kitchen.routers import ReplicaRouter, pin_scope
+
+User = get_user_model()
+
+
+@override_settings(KITCHEN_READ_REPLICAS=["replica"])
+class ReplicaRouterTests(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.router = ReplicaRouter()
+        DishType.objects.using("replica").create(name="Replica")
+
+    def names(self):
+        return list(DishType.objects.values_list("name", flat=True))
+
+    def test_reads_go_to_replica(self):
+        self.assertEqual(self.names(), ["Replica"])
+        self.assertEqual(self.router.db_for_read(Dish), "replica")
+        self.assertEqual(
+            self.router.db_for_read(Dish.cooks.through), "replica"
+        )
+
+    def test_other_models_are_not_routed(self):
+        self.assertIsNone(self.router.db_for_read(DashboardCounter))
+        self.assertIsNone(self.router.db_for_write(DashboardCounter))
+
+    @override_settings(KITCHEN_READ_REPLICAS=[])
+    def test_without_replicas_reads_use_default(self):
+        self.assertEqual(self.names(), [])
+
+    def test_writes_go_to_primary(self):
+        dish_type = DishType.objects.get(name="Replica")
+        dish_type.name = "Renamed"
+        dish_type.save()
+        self.assertEqual(dish_type._state.db, "default")
+        self.assertTrue(
+            DishType.objects.using("default").filter(name="Renamed").exists()
+        )
+        self.assertTrue(
+            DishType.objects.using("replica").filter(name="Replica").exists()
+        )
+
+    def test_write_pins_scope_to_primary(self):
+        with pin_scope() as state:
+            self.assertEqual(self.names(), ["Replica"])
+            DishType.objects.create(name="Primary")
+            self.assertTrue(state.wrote)
+            self.assertEqual(self.names(), ["Primary"])
+        self.assertEqual(self.names(), ["Replica"])
+
+    def test_explicit_using_write_pins_scope(self):
+        with pin_scope():
+            DishType.objects.using("default").create(name="Primary")
+            self.assertEqual(self.names(), ["Primary"])
+
+    def test_relations_across_primary_and_replica(self):
+        primary = DishType.objects.create(name="Primary")
+        replica = DishType.objects.get(name="Replica")
+        self.assertTrue(self.router.allow_relation(primary, replica))
+
+
+@override_settings(KITCHEN_READ_REPLICAS=["replica"])
+class ReplicaPinMiddlewareTests(TestCase):
+    databases = {"default", "replica"}
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="cook", password="p")
+        self.user.save(using="replica", force_insert=True)
+        self.client.force_login(self.user)
+        DishType.objects.using("replica").create(name="Replica")
+        self.url = reverse("kitchen:dish-type-list")
+
+    def names(self):
+        response = self.client.get(self.url)
+        return [
+            dish_type.name for dish_type in response.context["dish_type_list"]
+        ]
+
+    def test_safe_requests_read_replica(self):
+        response = self.client.get(self.url)
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.names(), ["Replica"])
+
+    def test_client_reads_primary_after_writing(self):
+        response = self.client.post(
+            reverse("kitchen:dish-type-create"), {"name": "Fresh"}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertEqual(self.names(), ["Fresh"])
+
+        # Once the pin cookie expires the client reads the replica again.
+        del self.client.cookies[PIN_COOKIE]
+        self.assertEqual(self.names(), ["Replica"])
+
+    def test_toggle_assignment_pins_reads(self):
+        dish_type = DishType.objects.get(name="Replica")
+        dish_type.save(using="default", force_insert=True)
+        dish = Dish(name="Borscht", price=5, dish_type=dish_type)
+        dish.save(using="default")
+        dish.save(using="replica", force_insert=True)
+        response = self.client.get(
+            reverse("kitchen:toggle-dish-assign", args=[dish.pk])
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertTrue(
+            Dish.cooks.through.objects.using("default")
+            .filter(dish=dish, cook=self.user)
+            .exists()
+        )
@@ -0,0 +1,81 @@
+from django.test import TestCase
+
+from kitchen.models import DishType, Ingredient, Dish
+from kitchen.search import rebuild_index, search_dishes
+
+
+def search(query):
+    return list(
+        search_dishes(Dish.objects.all(), query).order_by("-search_rank")
+    )
+
+
+class DishSearchTests(TestCase):
+    def setUp(self):
+        self.soup = DishType.objects.create(name="Soup")
+        self.dessert = DishType.objects.create(name="Dessert")
+        self.tomato = Ingredient.objects.create(name="Tomato")
+        self.borscht = Dish.objects.create(
+            name="Borscht",
+            description="Beetroot soup served with sour cream",
+            price=8,
+            dish_type=self.soup,
+        )
+        self.gazpacho = Dish.objects.create(
+            name="Gazpacho",
+            description="Cold Andalusian classic",
+            price=9,
+            dish_type=self.soup,
+        )
+        self.gazpacho.ingredients.add(self.tomato)
+
+    def test_search_covers_all_fields(self):
+        self.assertEqual(search("beetroot"), [self.borscht])
+        self.assertEqual(search("tomato"), [self.gazpacho])
+        self.assertEqual(set(search("soup")), {self.borscht, self.gazpacho})
+
+    def test_search_ranks_name_matches_first(self):
+        Dish.objects.create(
+            name="Cream Puff",
+            description="Choux pastry",
+            price=4,
+            dish_type=self.dessert,
+        )
+        self.assertEqual(search("cream")[0].name, "Cream Puff")
+
+    def test_index_follows_dish_updates(self):
+        self.borscht.name = "Solyanka"
+        self.borscht.save()
+        self.assertEqual(search("solyanka"), [self.borscht])
+        self.assertEqual(search("borscht"), [])
+
+        self.borscht.delete()
+        self.assertEqual(search("solyanka"), [])
+
+    def test_index_follows_ingredient_changes(self):
+        self.tomato.name = "Cucumber"
+        self.tomato.save()
+        self.assertEqual(search("cucumber"), [self.gazpacho])
+
+        self.tomato.dish_ingredients.clear()
+        self.assertEqual(search("cucumber"), [])
+
+        self.borscht.ingredients.add(self.tomato)
+        self.assertEqual(search("cucumber"), [self.borscht])
+
+        self.tomato.delete()
+        self.assertEqual(search("cucumber"), [])
+
+    def test_index_follows_dish_type_rename(self):
+        self.dessert.name = "Sweets"
+        self.dessert.save()
+        self.borscht.dish_type = self.dessert
+        self.borscht.save()
+        self.assertEqual(search("sweets"), [self.borscht])
+
+    def test_rebuild_index(self):
+        self.assertEqual(rebuild_index(), 2)
+        self.assertEqual(search("gazpacho"), [self.gazpacho])
+
+    def test_blank_query(self):
+        self.assertEqual(search("  !! "), [])
@@ -0,0 +1,197 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.template import engines
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kitchen.metrics import Histogram, request_db_queries, reset_metrics
+from kitchen.middleware import request_timing_middleware
+from kitchen.models import Dish, DishType
+from kitchen.timing import record_query, sql_shape, timing_scope
+
+User = get_user_model()
+
+SERVER_TIMING = re.compile(
+    r'total;dur=[\d.]+, db;dur=[\d.]+;desc="(\d+) queries", '
+    r"template;dur=([\d.]+)"
+)
+
+
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        reset_metrics()
+        self.addCleanup(reset_metrics)
+        dish_type = DishType.objects.create(name="Soup")
+        Dish.objects.create(
+            name="Borscht", description="", price=8, dish_type=dish_type
+        )
+        self.user = User.objects.create_user(username="anna", password="p")
+
+    def test_server_timing_header(self):
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("kitchen:dish-list"))
+        match = SERVER_TIMING.fullmatch(response["Server-Timing"])
+        self.assertIsNotNone(match)
+        self.assertEqual(int(match[1]), len(queries))
+        self.assertGreater(float(match[2]), 0)
+
+    async def test_async_requests_count_queries_from_worker_threads(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(reverse("kitchen:dish-list"))
+        match = SERVER_TIMING.fullmatch(response["Server-Timing"])
+        self.assertGreater(int(match[1]), 0)
+
+    def test_server_timing_only_for_internal_ips_and_staff(self):
+        url = reverse("kitchen:dish-list")
+        self.client.force_login(self.user)
+        response = self.client.get(url, REMOTE_ADDR="10.0.0.1")
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.client.force_login(
+            User.objects.create_user(
+                username="boss", password="p", is_staff=True
+            )
+        )
+        response = self.client.get(url, REMOTE_ADDR="10.0.0.1")
+        self.assertTrue(response.has_header("Server-Timing"))
+
+    @override_settings(INTERNAL_IPS=[])
+    async def test_async_server_timing_only_for_staff(self):
+        url = reverse("kitchen:dish-list")
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(url)
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.user.is_staff = True
+        await self.user.asave()
+        response = await self.async_client.get(url)
+        self.assertTrue(response.has_header("Server-Timing"))
+
+    def test_requests_are_observed_per_view(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("kitchen:dish-list"))
+        self.client.get(reverse("kitchen:dish-list"))
+        self.client.get("/no-such-page/")
+        series = request_db_queries.snapshot()
+        self.assertEqual(series["kitchen:dish-list"]["count"], 2)
+        self.assertEqual(series["unresolved"]["count"], 1)
+
+    def test_metrics_endpoint(self):
+        url = reverse("kitchen:metrics")
+        self.client.get(reverse("kitchen:index"))
+        self.assertEqual(
+            self.client.get(url, REMOTE_ADDR="10.0.0.1").status_code, 403
+        )
+        response = self.client.get(url)
+        self.assertEqual(
+            response["Content-Type"], "text/plain; version=0.0.4"
+        )
+        body = response.content.decode()
+        self.assertIn(
+            "# TYPE kitchen_request_duration_seconds histogram", body
+        )
+        self.assertIn(
+            'kitchen_request_db_queries_count{view="kitchen:index"} 1', body
+        )
+
+        staff = User.objects.create_user(
+            username="boss", password="p", is_staff=True
+        )
+        self.client.force_login(staff)
+        self.assertEqual(
+            self.client.get(url, REMOTE_ADDR="10.0.0.1").status_code, 200
+        )
+
+
+class TimingScopeTests(TestCase):
+    def test_template_renders_are_timed(self):
+        engine = engines["django"]
+        with timing_scope() as state:
+            engine.from_string("{{ value }}").render({"value": 1})
+            first = state.template_seconds
+            engine.from_string(
+                "{% include 'includes/pagination.html' %}"
+            ).render({})
+        self.assertGreater(first, 0)
+        self.assertGreater(state.template_seconds, first)
+
+    def test_queries_outside_a_request_are_not_counted(self):
+        self.assertIn(record_query, connection.execute_wrappers)
+        DishType.objects.count()
+        with timing_scope() as state:
+            DishType.objects.count()
+            DishType.objects.exists()
+        self.assertEqual(state.db_queries, 2)
+        self.assertGreater(state.db_seconds, 0)
+
+    def test_query_shapes_are_counted_when_tracked(self):
+        with timing_scope() as state:
+            DishType.objects.filter(pk=1).exists()
+        self.assertIsNone(state.shapes)
+        with timing_scope(track_shapes=True) as state:
+            for pk in range(3):
+                DishType.objects.filter(pk=pk).exists()
+            DishType.objects.count()
+        self.assertEqual(sorted(state.shapes.values()), [1, 3])
+        [(shape, count)] = state.repeated_queries(3)
+        self.assertEqual(count, 3)
+        self.assertIn('"kitchen_dishtype"."id" = %s', shape)
+
+
+class RepeatedQueryTests(TestCase):
+    def test_sql_shape_folds_literals(self):
+        self.assertEqual(
+            sql_shape(
+                "SELECT * FROM t WHERE a = 'it''s' AND b = 4.5\n"
+                "  AND c IN (%s, %s, %s) AND d IN (1, 2)"
+            ),
+            "SELECT * FROM t WHERE a = ? AND b = ? AND c IN (...) "
+            "AND d IN (...)",
+        )
+
+    def dish_type_per_dish(self, request):
+        for pk in range(3):
+            DishType.objects.filter(pk=pk).first()
+        return HttpResponse()
+
+    @override_settings(KITCHEN_REPEATED_QUERY_THRESHOLD=3)
+    def test_repeated_query_is_logged(self):
+        middleware = request_timing_middleware(self.dish_type_per_dish)
+        with self.assertLogs("kitchen.middleware", "WARNING") as logs:
+            middleware(RequestFactory().get("/menu/"))
+        [message] = logs.output
+        self.assertIn("(/menu/), run 3 times", message)
+        self.assertIn('FROM "kitchen_dishtype"', message)
+
+    @override_settings(KITCHEN_REPEATED_QUERY_THRESHOLD=None)
+    def test_detector_can_be_turned_off(self):
+        middleware = request_timing_middleware(self.dish_type_per_dish)
+        with self.assertNoLogs("kitchen.middleware", "WARNING"):
+            middleware(RequestFactory().get("/menu/"))
+
+
+class HistogramTests(SimpleTestCase):
+    def test_exposition(self):
+        histogram = Histogram("test_seconds", "Test.", (0.1, 1))
+        histogram.observe('a"b', 0.05)
+        histogram.observe('a"b', 0.5)
+        self.assertEqual(
+            list(histogram.exposition()),
+            [
+                "# HELP test_seconds Test.",
+                "# TYPE test_seconds histogram",
+                'test_seconds_bucket{view="a\\"b",le="0.1"} 1',
+                'test_seconds_bucket{view="a\\"b",le="1"} 2',
+                'test_seconds_bucket{view="a\\"b",le="+Inf"} 2',
+                'test_seconds_sum{view="a\\"b"} 0.55',
+                'test_seconds_count{view="a\\"b"} 2',
+            ],
+        )
@@ -0,0 +1,140 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.template import Context, Template
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kitchen.assignments import bulk_assign, toggle_assignment
+from kitchen.models import DishType, Ingredient, Dish
+from kitchen.versioning import (
+    bump_version,
+    fragment_stats,
+    get_versions,
+    reset_fragment_stats,
+)
+
+User = get_user_model()
+
+TEMPLATE = Template(
+    "{% load kitchen_cache %}"
+    '{% versioned_cache "test-fragment" "dish ingredient" key %}'
+    "{{ value }}"
+    "{% endversioned_cache %}"
+)
+
+
+def render(value, key=1):
+    return TEMPLATE.render(Context({"value": value, "key": key}))
+
+
+class VersionedCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_fragment_stats()
+        self.dish_type = DishType.objects.create(name="Soup")
+
+    def test_fragment_served_from_cache_until_version_bump(self):
+        self.assertEqual(render("first"), "first")
+        self.assertEqual(render("second"), "first")
+        bump_version("ingredient")
+        self.assertEqual(render("third"), "third")
+        self.assertEqual(
+            fragment_stats()["test-fragment"], {"hits": 1, "misses": 2}
+        )
+
+    def test_vary_on_arguments(self):
+        self.assertEqual(render("first", key=1), "first")
+        self.assertEqual(render("second", key=2), "second")
+
+    def test_model_changes_bump_versions(self):
+        before = get_versions(["dish", "ingredient"])
+        dish = Dish.objects.create(
+            name="Borscht", description="", price=8, dish_type=self.dish_type
+        )
+        self.assertNotEqual(get_versions(["dish"]), before[:1])
+
+        before = get_versions(["dish"])
+        dish.ingredients.add(Ingredient.objects.create(name="Beet"))
+        self.assertNotEqual(get_versions(["dish"]), before)
+
+    def test_through_table_writes_bump_dish_version(self):
+        cook = User.objects.create_user(username="cook", password="pass")
+        dish = Dish.objects.create(
+            name="Borscht", description="", price=8, dish_type=self.dish_type
+        )
+        before = get_versions(["dish"])
+        toggle_assignment(cook.pk, dish.pk)
+        self.assertNotEqual(get_versions(["dish"]), before)
+
+        before = get_versions(["dish"])
+        self.assertEqual(bulk_assign([cook.pk], [dish.pk]), 0)
+        self.assertEqual(get_versions(["dish"]), before)
+
+    def test_versions_bump_again_on_commit(self):
+        before = get_versions(["dishtype"])
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.dish_type.name = "Soups"
+            self.dish_type.save()
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(get_versions(["dishtype"])[0], before[0] + 2)
+
+    def test_dish_detail_reflects_rename(self):
+        user = User.objects.create_user(username="cook", password="pass")
+        self.client.force_login(user)
+        dish = Dish.objects.create(
+            name="Borscht", description="", price=8, dish_type=self.dish_type
+        )
+        url = reverse("kitchen:dish-detail", args=[dish.pk])
+        self.client.get(url)
+        self.assertEqual(fragment_stats()["dish-info"]["misses"], 1)
+        self.client.get(url)
+        self.assertEqual(fragment_stats()["dish-info"]["hits"], 1)
+
+        self.dish_type.name = "Cold Soup"
+        self.dish_type.save()
+        self.assertContains(self.client.get(url), "Cold Soup")
+
+    def test_login_keeps_cook_version(self):
+        user = User.objects.create_user(username="cook", password="pass")
+        before = get_versions(["cook"])
+        self.client.login(username="cook", password="pass")
+        self.assertEqual(get_versions(["cook"]), before)
+        user.first_name = "Anna"
+        user.save()
+        self.assertNotEqual(get_versions(["cook"]), before)
+
+    def test_cached_fragments_skip_their_queries(self):
+        user = User.objects.create_user(username="cook", password="pass")
+        self.client.force_login(user)
+        dish = Dish.objects.create(
+            name="Borscht", description="", price=8, dish_type=self.dish_type
+        )
+        dish.cooks.add(user)
+        dish.ingredients.add(Ingredient.objects.create(name="Beet"))
+        # The dish page's cooks and ingredients, the cook page's dishes.
+        for url, skipped in (
+            (reverse("kitchen:dish-detail", args=[dish.pk]), 2),
+            (reverse("kitchen:cook-detail", args=[user.pk]), 1),
+        ):
+            with CaptureQueriesContext(connection) as cold:
+                self.client.get(url)
+            with CaptureQueriesContext(connection) as warm:
+                response = self.client.get(url)
+            self.assertContains(response, "Borscht")
+            self.assertEqual(len(warm), len(cold) - skipped)
+
+    def test_stats_view_requires_staff(self):
+        user = User.objects.create_user(username="cook", password="pass")
+        self.client.force_login(user)
+        url = reverse("kitchen:fragment-cache-stats")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        user.is_staff = True
+        user.save()
+        render("value")
+        response = self.client.get(url)
+        self.assertEqual(
+            response.json()["test-fragment"], {"hits": 0, "misses": 1}
+        )
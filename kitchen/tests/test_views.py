@@ -2,7 +2,9 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase, Client
 from django.urls import reverse
 
-from kitchen.models import DishType, Ingredient, Dish
+from kitchen.models import Cook, DishType, Ingredient, Dish
+from kitchen.pagination import encode_cursor
+from kitchen.tests.budgets import QueryBudgetMixin, grow_menu
 
 User = get_user_model()
 
@@ -60,6 +62,55 @@ class PrivateIngredientTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(len(response.context["ingredient_list"]), 5)
 
+    def test_cursor_pagination(self):
+        for i in range(12):
+            Ingredient.objects.create(name=f"ingredient{i:02d}")
+        response = self.client.get(INGREDIENT_URL)
+        page = response.context["page_obj"]
+        self.assertFalse(page.has_previous())
+        self.assertTrue(page.has_next())
+
+        response = self.client.get(INGREDIENT_URL, {"cursor": page.next_cursor})
+        page = response.context["page_obj"]
+        self.assertEqual(
+            [ingredient.name for ingredient in page.object_list],
+            [f"ingredient{i:02d}" for i in range(5, 10)],
+        )
+        self.assertTrue(page.has_previous())
+
+        response = self.client.get(
+            INGREDIENT_URL, {"cursor": page.previous_cursor}
+        )
+        page = response.context["page_obj"]
+        self.assertEqual(
+            [ingredient.name for ingredient in page.object_list],
+            [f"ingredient{i:02d}" for i in range(5)],
+        )
+        self.assertFalse(page.has_previous())
+
+    def test_cursor_pagination_duplicate_names(self):
+        for _ in range(7):
+            Ingredient.objects.create(name="salt")
+        response = self.client.get(INGREDIENT_URL)
+        first = list(response.context["ingredient_list"])
+        response = self.client.get(
+            INGREDIENT_URL,
+            {"cursor": response.context["page_obj"].next_cursor},
+        )
+        second = list(response.context["ingredient_list"])
+        self.assertEqual(len(second), 2)
+        self.assertFalse(set(first) & set(second))
+
+    def test_invalid_cursor(self):
+        response = self.client.get(INGREDIENT_URL, {"cursor": "garbage"})
+        self.assertEqual(response.status_code, 404)
+        # Valid JSON, but values that don't fit the name and pk fields.
+        for values in (["tomato", "abc"], ["tomato", [1]], [None, None]):
+            response = self.client.get(
+                INGREDIENT_URL, {"cursor": encode_cursor(values, "next")}
+            )
+            self.assertEqual(response.status_code, 404)
+
     def test_search_functionality(self):
         Ingredient.objects.create(name="tomato")
         Ingredient.objects.create(name="potato")
@@ -69,6 +120,47 @@ class PrivateIngredientTests(TestCase):
         self.assertEqual(response.context["ingredient_list"][0].name, "tomato")
 
 
+class IngredientAutocompleteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="test123",
+        )
+        self.client.force_login(self.user)
+        self.url = reverse("kitchen:ingredient-autocomplete")
+
+    def test_login_required(self):
+        self.client.logout()
+        response = self.client.get(self.url)
+        self.assertNotEqual(response.status_code, 200)
+
+    def test_prefix_search_is_paginated(self):
+        for i in range(12):
+            Ingredient.objects.create(name=f"Pepper {i:02d}")
+        Ingredient.objects.create(name="Bell pepper")
+        data = self.client.get(self.url, {"term": "pep"}).json()
+        self.assertEqual(len(data["results"]), 10)
+        self.assertEqual(data["results"][0]["text"], "Pepper 00")
+
+        data = self.client.get(
+            self.url, {"term": "pep", "cursor": data["next"]}
+        ).json()
+        self.assertEqual(
+            [item["text"] for item in data["results"]],
+            ["Pepper 10", "Pepper 11"],
+        )
+        self.assertIsNone(data["next"])
+
+    def test_cook_autocomplete(self):
+        User.objects.create_user(
+            username="chef", password="pass", first_name="Anna"
+        )
+        data = self.client.get(
+            reverse("kitchen:cook-autocomplete"), {"term": "CH"}
+        ).json()
+        self.assertEqual(data["results"][0]["text"], "chef (Anna )")
+
+
 # ===== DISH TESTS =====
 DISH_URL = reverse("kitchen:dish-list")
 
@@ -114,6 +206,34 @@ class PrivateDishTests(TestCase):
         )
         self.assertTemplateUsed(response, "kitchen/dish_list.html")
 
+    def test_total_counts_every_page(self):
+        for index in range(7):
+            Dish.objects.create(
+                name=f"Dish {index}",
+                description="",
+                price=10,
+                dish_type=self.dish_type,
+            )
+        response = self.client.get(DISH_URL, {"name": "Dish 1"})
+        self.assertContains(response, "Total: 7 dishes on the menu")
+
+    def test_sort_links_keep_the_filters(self):
+        dish = Dish.objects.create(
+            name="Pasta", description="", price=15, dish_type=self.dish_type
+        )
+        flour = Ingredient.objects.create(name="flour")
+        egg = Ingredient.objects.create(name="egg")
+        dish.ingredients.add(flour, egg)
+        response = self.client.get(
+            DISH_URL,
+            {"q": "pasta", "with_ingredients": [flour.pk, egg.pk]},
+        )
+        self.assertContains(
+            response,
+            f'href="?q=pasta&amp;with_ingredients={flour.pk}'
+            f'&amp;with_ingredients={egg.pk}&amp;sort=cooks"',
+        )
+
     def test_dish_ordering(self):
         Dish.objects.create(
             name="Pizza",
@@ -166,6 +286,71 @@ class PrivateDishTests(TestCase):
         self.assertEqual(len(response.context["dish_list"]), 1)
         self.assertEqual(response.context["dish_list"][0].name, "Margherita Pizza")
 
+    def test_full_text_search(self):
+        Dish.objects.create(
+            name="Borscht",
+            description="Beetroot soup",
+            price=8.00,
+            dish_type=self.dish_type,
+        )
+        Dish.objects.create(
+            name="Beetroot Salad",
+            description="Fresh salad",
+            price=6.00,
+            dish_type=self.dish_type,
+        )
+        response = self.client.get(DISH_URL + "?q=beetroot")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [dish.name for dish in response.context["dish_list"]],
+            ["Beetroot Salad", "Borscht"],
+        )
+
+    def test_pagination_links_keep_search_term(self):
+        for i in range(7):
+            Dish.objects.create(
+                name=f"Pizza {i}",
+                description=f"Description {i}",
+                price=10.00 + i,
+                dish_type=self.dish_type,
+            )
+        response = self.client.get(DISH_URL + "?name=Pizza")
+        next_cursor = response.context["page_obj"].next_cursor
+        self.assertContains(response, f"?cursor={next_cursor}&name=Pizza")
+
+
+class DishExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="test123",
+        )
+        self.client.force_login(self.user)
+        dish_type = DishType.objects.create(name="Main Course")
+        for i in range(3):
+            Dish.objects.create(
+                name=f"Dish {i}",
+                description="",
+                price=10,
+                dish_type=dish_type,
+            )
+
+    def test_export_streams_csv(self):
+        response = self.client.get(reverse("kitchen:dish-export"))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            lines[0], "id,name,description,price,dish_type,ingredients,cooks"
+        )
+        self.assertEqual(len(lines), 4)
+
+    def test_export_unknown_format(self):
+        response = self.client.get(
+            reverse("kitchen:dish-export"), {"format": "xml"}
+        )
+        self.assertEqual(response.status_code, 404)
+
 
 # ===== COOK TESTS =====
 COOK_URL = reverse("kitchen:cook-list")
@@ -201,6 +386,13 @@ class PrivateCookTests(TestCase):
         )
         self.assertTemplateUsed(response, "kitchen/cook_list.html")
 
+    def test_total_counts_every_page(self):
+        for index in range(6):
+            User.objects.create_user(username=f"cook{index}", password="p")
+        response = self.client.get(COOK_URL)
+        self.assertEqual(len(response.context["cook_list"]), 5)
+        self.assertContains(response, "Total: 7 cooks in the kitchen")
+
     def test_cook_ordering(self):
         User.objects.create_user(username="bcook", password="pass1")
         User.objects.create_user(username="acook", password="pass2")
@@ -301,3 +493,245 @@ class PrivateCookDetailTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.context["cook"], self.cook)
         self.assertTemplateUsed(response, "kitchen/cook_detail.html")
+
+
+# ===== ASSIGNMENT TESTS =====
+class ToggleAssignTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="test123",
+        )
+        self.client.force_login(self.user)
+        self.dish = Dish.objects.create(
+            name="Test Dish",
+            description="Test description",
+            price=15.00,
+            dish_type=DishType.objects.create(name="Main Course"),
+        )
+        self.url = reverse("kitchen:toggle-dish-assign", args=[self.dish.id])
+
+    def test_toggle_assigns_and_unassigns(self):
+        response = self.client.post(self.url)
+        self.assertRedirects(
+            response, reverse("kitchen:dish-detail", args=[self.dish.id])
+        )
+        self.assertIn(self.user, self.dish.cooks.all())
+
+        self.client.post(self.url)
+        self.assertNotIn(self.user, self.dish.cooks.all())
+
+    def test_toggle_missing_dish(self):
+        response = self.client.post(
+            reverse("kitchen:toggle-dish-assign", args=[999999])
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class BulkAssignTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="test123",
+            is_staff=True,
+        )
+        self.client.force_login(self.user)
+        dish_type = DishType.objects.create(name="Main Course")
+        self.dishes = [
+            Dish.objects.create(
+                name=f"Dish {i}",
+                description="",
+                price=10,
+                dish_type=dish_type,
+            )
+            for i in range(3)
+        ]
+        self.cooks = [
+            User.objects.create_user(username=f"cook{i}", password="pass")
+            for i in range(2)
+        ]
+        self.url = reverse("kitchen:dish-bulk-assign")
+
+    def post(self, action, cooks, dishes):
+        return self.client.post(
+            self.url,
+            {
+                "action": action,
+                "cooks": [cook.pk for cook in cooks],
+                "dishes": [dish.pk for dish in dishes],
+            },
+        )
+
+    def test_bulk_assign_skips_existing_pairs(self):
+        self.dishes[0].cooks.add(self.cooks[0])
+        response = self.post("assign", self.cooks, self.dishes)
+        self.assertEqual(response.json(), {"assigned": 5})
+        for dish in self.dishes:
+            self.assertEqual(set(dish.cooks.all()), set(self.cooks))
+
+    def test_bulk_unassign(self):
+        for dish in self.dishes:
+            dish.cooks.add(*self.cooks)
+        response = self.post("unassign", self.cooks[:1], self.dishes[:2])
+        self.assertEqual(response.json(), {"unassigned": 2})
+        self.assertEqual(list(self.dishes[0].cooks.all()), self.cooks[1:])
+        self.assertEqual(set(self.dishes[2].cooks.all()), set(self.cooks))
+
+    def test_bulk_assign_validates_ids(self):
+        response = self.client.post(
+            self.url,
+            {"action": "assign", "cooks": [999999], "dishes": [999999]},
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("cooks", response.json()["errors"])
+
+    def test_bulk_assign_requires_post(self):
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+    def test_bulk_assign_requires_staff(self):
+        self.client.force_login(
+            User.objects.create_user(username="cook", password="pass")
+        )
+        response = self.post("assign", self.cooks, self.dishes)
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Dish.cooks.through.objects.exists())
+
+
+# ===== QUERY BUDGETS =====
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser",
+            password="test123",
+        )
+        self.client.force_login(self.user)
+
+    def get(self, url, **params):
+        return lambda: self.client.get(url, params)
+
+    def test_ingredient_list(self):
+        self.assertQueryBudget(3, self.get(INGREDIENT_URL))
+        self.assertQueryBudget(3, self.get(INGREDIENT_URL, name="budget"))
+
+    def test_autocomplete(self):
+        self.assertQueryBudget(
+            3,
+            self.get(
+                reverse("kitchen:ingredient-autocomplete"), term="budget"
+            ),
+        )
+        self.assertQueryBudget(
+            3, self.get(reverse("kitchen:cook-autocomplete"), term="budget")
+        )
+
+    def test_dish_list(self):
+        # Includes the dashboard counters read for the total.
+        self.assertQueryBudget(4, self.get(DISH_URL))
+        self.assertQueryBudget(4, self.get(DISH_URL, name="dish"))
+        self.assertQueryBudget(4, self.get(DISH_URL, q="budget"))
+        self.assertQueryBudget(4, self.get(DISH_URL, sort="cooks"))
+
+    def test_dish_list_ingredient_filter(self):
+        grow_menu(10)
+        first, second = Ingredient.objects.values_list("pk", flat=True)[:2]
+        # The postings and their pending deltas, and the selected
+        # ingredients shown in the form.
+        self.assertQueryBudget(
+            8,
+            self.get(
+                DISH_URL,
+                with_ingredients=[first],
+                without_ingredients=[second],
+            ),
+        )
+
+    def test_dish_export(self):
+        url = reverse("kitchen:dish-export")
+        self.assertQueryBudget(5, self.get(url))
+        self.assertQueryBudget(5, self.get(url, format="jsonl"))
+
+    def test_cook_list(self):
+        self.assertQueryBudget(4, self.get(COOK_URL))
+        self.assertQueryBudget(4, self.get(COOK_URL, sort="dishes"))
+
+    def test_dish_detail(self):
+        dish = Dish.objects.create(
+            name="Feast",
+            description="",
+            price=99,
+            dish_type=DishType.objects.create(name="Banquet"),
+        )
+
+        def grow(size):
+            grow_menu(size)
+            dish.cooks.set(Cook.objects.all())
+            dish.ingredients.set(Ingredient.objects.all())
+
+        # Whether the user cooks the dish is checked on its own, so the
+        # cached cooks fragment can skip reading the cooks.
+        self.assertQueryBudget(
+            6,
+            self.get(reverse("kitchen:dish-detail", args=[dish.id])),
+            grow,
+        )
+
+    def test_cook_detail(self):
+        def grow(size):
+            grow_menu(size)
+            self.user.dishes.set(Dish.objects.all())
+
+        self.assertQueryBudget(
+            4,
+            self.get(reverse("kitchen:cook-detail", args=[self.user.id])),
+            grow,
+        )
+
+    def test_toggle_assign(self):
+        grow_menu(1)
+        dish = Dish.objects.first()
+        url = reverse("kitchen:toggle-dish-assign", args=[dish.id])
+
+        def grow(size):
+            grow_menu(size)
+            dish.cooks.set(Cook.objects.exclude(pk=self.user.pk))
+
+        def toggle_twice():
+            self.client.post(url)
+            return self.client.post(url)
+
+        # pre_remove reads the linked cooks before the delete.
+        self.assertQueryBudget(21, toggle_twice, grow)
+
+    def test_bulk_assign(self):
+        url = reverse("kitchen:dish-bulk-assign")
+        self.user.is_staff = True
+        self.user.save()
+
+        def grow(size, assigned):
+            # Every posted dish gains or loses cooks, so each request does
+            # the same work per dish whatever the table sizes.
+            grow_menu(size)
+            for dish in Dish.objects.all()[:2]:
+                dish.cooks.set(Cook.objects.all() if assigned else [])
+
+        def post(action):
+            return lambda: self.client.post(
+                url,
+                {
+                    "action": action,
+                    # Few enough pairs for a single SQLite insert batch.
+                    "cooks": list(
+                        Cook.objects.values_list("pk", flat=True)[:200]
+                    ),
+                    "dishes": list(
+                        Dish.objects.values_list("pk", flat=True)[:2]
+                    ),
+                },
+            )
+
+        self.assertQueryBudget(
+            14, post("assign"), lambda size: grow(size, assigned=False)
+        )
+        self.assertQueryBudget(
+            16, post("unassign"), lambda size: grow(size, assigned=True)
+        )
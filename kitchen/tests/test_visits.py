@@ -0,0 +1,71 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from kitchen.visits import VisitBuffer, visit_buffer
+
+User = get_user_model()
+INDEX_URL = reverse("kitchen:index")
+
+
+@override_settings(VISIT_FLUSH_INTERVAL=3600, VISIT_FLUSH_MAX_PENDING=3)
+class VisitBufferTests(TestCase):
+    def setUp(self):
+        self.buffer = VisitBuffer()
+        self.cook = User.objects.create_user(username="cook", password="p")
+        self.other = User.objects.create_user(username="other", password="p")
+
+    def test_visits_are_buffered_until_threshold(self):
+        self.assertEqual(self.buffer.record(self.cook.pk), 1)
+        self.assertEqual(self.buffer.record(self.other.pk), 1)
+        self.cook.refresh_from_db()
+        self.assertEqual(self.cook.visit_count, 0)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(self.buffer.record(self.cook.pk), 2)
+        self.cook.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.cook.visit_count, 2)
+        self.assertEqual(self.other.visit_count, 1)
+        self.assertEqual(self.buffer.pending(self.cook.pk), 0)
+
+    @override_settings(VISIT_FLUSH_INTERVAL=0)
+    def test_interval_forces_flush(self):
+        self.buffer.record(self.cook.pk)
+        self.cook.refresh_from_db()
+        self.assertEqual(self.cook.visit_count, 1)
+
+    def test_flush_without_pending_visits(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(self.buffer.flush(), 0)
+
+
+@override_settings(VISIT_FLUSH_INTERVAL=3600, VISIT_FLUSH_MAX_PENDING=1000)
+class IndexVisitCountTests(TestCase):
+    def setUp(self):
+        visit_buffer.flush()
+        self.cook = User.objects.create_user(username="cook", password="p")
+        self.client.force_login(self.cook)
+
+    def tearDown(self):
+        visit_buffer.flush()
+
+    def test_index_shows_per_user_visits(self):
+        self.client.get(INDEX_URL)
+        response = self.client.get(INDEX_URL)
+        self.assertEqual(response.context["num_visits"], 2)
+        self.assertContains(response, "visited this page 2 times")
+
+        visit_buffer.flush()
+        response = self.client.get(INDEX_URL)
+        self.assertEqual(response.context["num_visits"], 3)
+
+    def test_index_does_not_write_session(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(INDEX_URL)
+        self.assertFalse(
+            [q for q in queries if q["sql"].startswith("UPDATE \"django_session\"")]
+        )
+        self.assertNotIn("num_visits", self.client.session)
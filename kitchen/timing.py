@@ -0,0 +1,135 @@
+"""
+Where the time of the current request goes.
+
+``request_timing_middleware`` opens a ``RequestTiming`` for every request.
+While it is open, ``record_query`` (installed on each database connection
+as an execute wrapper) adds up query count and time, and templates
+rendered through ``TimedTemplates`` add up render time. The state lives in
+a context variable, so queries the async views run in worker threads
+count towards the request that issued them.
+
+With ``KITCHEN_REPEATED_QUERY_THRESHOLD`` set, the scope also counts the
+shape of every query (its SQL with literals and ``IN`` lists folded), so
+the middleware can flag a shape that one request runs over and over -- the
+signature of an N+1 query.
+"""
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates
+
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN \((?:(?:%s|\?), )*(?:%s|\?)\)")
+_SPACE = re.compile(r"\s+")
+
+
+def sql_shape(sql):
+    """``sql`` with its literals and parameter lists folded to ``?``."""
+    sql = _STRING.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    return _SPACE.sub(" ", sql).strip()
+
+
+class RequestTiming:
+    def __init__(self, track_shapes=False):
+        self.started = time.perf_counter()
+        self.db_queries = 0
+        self.db_seconds = 0.0
+        self.template_seconds = 0.0
+        self.rendering = False
+        self.shapes = Counter() if track_shapes else None
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def repeated_queries(self, threshold):
+        """``(shape, count)`` of query shapes run ``threshold`` times."""
+        return [
+            (shape, count)
+            for shape, count in (self.shapes or {}).items()
+            if count >= threshold
+        ]
+
+
+_current = ContextVar("kitchen_request_timing", default=None)
+
+
+@contextmanager
+def timing_scope(track_shapes=False):
+    state = RequestTiming(track_shapes)
+    token = _current.set(state)
+    try:
+        yield state
+    finally:
+        _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    state = _current.get()
+    if state is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        state.db_seconds += time.perf_counter() - started
+        state.db_queries += 1
+        if state.shapes is not None:
+            state.shapes[sql_shape(sql)] += 1
+
+
+def install_query_timer(connection):
+    # What connection.execute_wrapper() does for one block, for the
+    # lifetime of the connection.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class TimedTemplate:
+    """Template wrapper that adds its render time to the request's."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        state = _current.get()
+        if state is None or state.rendering:
+            # Templates rendered inside another are part of its time.
+            return self.template.render(context, request)
+        state.rendering = True
+        started = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            state.rendering = False
+            state.template_seconds += time.perf_counter() - started
+
+
+class TimedTemplates(DjangoTemplates):
+    """``DjangoTemplates`` whose renders count towards request timing."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+def server_timing(state):
+    """``Server-Timing`` header value for a finished request, in ms."""
+    return (
+        f"total;dur={state.elapsed * 1000:.1f}, "
+        f"db;dur={state.db_seconds * 1000:.1f};"
+        f'desc="{state.db_queries} queries", '
+        f"template;dur={state.template_seconds * 1000:.1f}"
+    )
@@ -1,4 +1,14 @@
+from django.conf import settings
 from django.urls import path
+
+from . import async_views
+from .api import (
+    CookApiView,
+    DishApiView,
+    DishTypeApiView,
+    IngredientApiView,
+    MenuAnalyticsApiView,
+)
 from .views import (
     index,
     DishListView,
@@ -19,12 +29,52 @@ from .views import (
     IngredientCreateView,
     IngredientUpdateView,
     IngredientDeleteView,
+    CookAutocompleteView,
+    IngredientAutocompleteView,
     toggle_assign_to_dish,
+    bulk_assign_cooks,
+    auto_assign_cooks,
+    export_menu,
+    fragment_cache_stats,
+    metrics,
 )
 
+
+def _view(sync_view, async_view):
+    # Under ASGI the native async views avoid a thread hop per request.
+    return async_view if settings.KITCHEN_ASYNC_VIEWS else sync_view
+
+
 urlpatterns = [
     path("", index, name="index"),
-    path("dish-types/", DishTypeListView.as_view(), name="dish-type-list"),
+    path("api/dishes/", DishApiView.as_view(), name="api-dish-list"),
+    path(
+        "api/dish-types/",
+        DishTypeApiView.as_view(),
+        name="api-dish-type-list",
+    ),
+    path(
+        "api/ingredients/",
+        IngredientApiView.as_view(),
+        name="api-ingredient-list",
+    ),
+    path("api/cooks/", CookApiView.as_view(), name="api-cook-list"),
+    path(
+        "api/menu-analytics/",
+        MenuAnalyticsApiView.as_view(),
+        name="api-menu-analytics",
+    ),
+    path(
+        "cache-stats/",
+        fragment_cache_stats,
+        name="fragment-cache-stats",
+    ),
+    path("metrics/", metrics, name="metrics"),
+    path(
+        "dish-types/",
+        _view(DishTypeListView.as_view(), async_views.dish_type_list),
+        name="dish-type-list",
+    ),
     path("dish-types/create/",
          DishTypeCreateView.as_view(),
          name="dish-type-create"),
@@ -38,7 +88,11 @@ urlpatterns = [
         DishTypeDeleteView.as_view(),
         name="dish-type-delete",
     ),
-    path("ingredients/", IngredientListView.as_view(), name="ingredient-list"),
+    path(
+        "ingredients/",
+        _view(IngredientListView.as_view(), async_views.ingredient_list),
+        name="ingredient-list",
+    ),
     path(
         "ingredients/create/",
         IngredientCreateView.as_view(),
@@ -54,8 +108,21 @@ urlpatterns = [
         IngredientDeleteView.as_view(),
         name="ingredient-delete",
     ),
-    path("dishes/", DishListView.as_view(), name="dish-list"),
-    path("dishes/<int:pk>/", DishDetailView.as_view(), name="dish-detail"),
+    path(
+        "dishes/",
+        _view(DishListView.as_view(), async_views.dish_list),
+        name="dish-list",
+    ),
+    path(
+        "dishes/export/",
+        _view(export_menu, async_views.export_menu),
+        name="dish-export",
+    ),
+    path(
+        "dishes/<int:pk>/",
+        _view(DishDetailView.as_view(), async_views.dish_detail),
+        name="dish-detail",
+    ),
     path("dishes/create/", DishCreateView.as_view(), name="dish-create"),
     path("dishes/<int:pk>/update/",
          DishUpdateView.as_view(),
@@ -65,11 +132,39 @@ urlpatterns = [
          name="dish-delete"),
     path(
         "dishes/<int:pk>/toggle-assign/",
-        toggle_assign_to_dish,
+        _view(toggle_assign_to_dish, async_views.toggle_assign_to_dish),
         name="toggle-dish-assign",
     ),
-    path("cooks/", CookListView.as_view(), name="cook-list"),
-    path("cooks/<int:pk>/", CookDetailView.as_view(), name="cook-detail"),
+    path(
+        "ingredients/autocomplete/",
+        IngredientAutocompleteView.as_view(),
+        name="ingredient-autocomplete",
+    ),
+    path(
+        "cooks/autocomplete/",
+        CookAutocompleteView.as_view(),
+        name="cook-autocomplete",
+    ),
+    path(
+        "dishes/bulk-assign/",
+        bulk_assign_cooks,
+        name="dish-bulk-assign",
+    ),
+    path(
+        "dishes/auto-assign/",
+        auto_assign_cooks,
+        name="dish-auto-assign",
+    ),
+    path(
+        "cooks/",
+        _view(CookListView.as_view(), async_views.cook_list),
+        name="cook-list",
+    ),
+    path(
+        "cooks/<int:pk>/",
+        _view(CookDetailView.as_view(), async_views.cook_detail),
+        name="cook-detail",
+    ),
     path("cooks/create/", CookCreateView.as_view(), name="cook-create"),
     path(
         "cooks/<int:pk>/update/",
@@ -0,0 +1,69 @@
+import hashlib
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = "kitchen:version:{}"
+FRAGMENT_KEY = "kitchen:fragment:{}:{}"
+
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+
+def _new_version():
+    # Start from the clock so a version lost to eviction never reuses
+    # a number that may still have fragments cached under it.
+    return time.time_ns() // 1000
+
+
+def version_label(model):
+    return model._meta.model_name
+
+
+def get_versions(labels):
+    keys = [VERSION_KEY.format(label) for label in labels]
+    versions = cache.get_many(keys)
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def bump_version(label):
+    key = VERSION_KEY.format(label)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def fragment_key(fragment_name, labels, vary_on=()):
+    parts = [*get_versions(labels), *vary_on]
+    digest = hashlib.md5(
+        ":".join(str(part) for part in parts).encode(),
+        usedforsecurity=False,
+    ).hexdigest()
+    return FRAGMENT_KEY.format(fragment_name, digest)
+
+
+def fragment_timeout():
+    return getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 600)
+
+
+def record_lookup(fragment_name, hit):
+    with _stats_lock:
+        _stats[fragment_name]["hits" if hit else "misses"] += 1
+
+
+def fragment_stats():
+    with _stats_lock:
+        return {name: dict(counts) for name, counts in _stats.items()}
+
+
+def reset_fragment_stats():
+    with _stats_lock:
+        _stats.clear()
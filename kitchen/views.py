@@ -1,13 +1,43 @@
+from collections import Counter
+
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.http import HttpResponseRedirect
+from django.core.exceptions import PermissionDenied
+from django.db import IntegrityError
+from django.http import (
+    Http404,
+    HttpResponse,
+    HttpResponseRedirect,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.views.decorators.http import require_POST
 from django.shortcuts import render, get_object_or_404
 from django.urls import reverse_lazy
 from django.views import generic
 from django.contrib.auth.mixins import LoginRequiredMixin
 
+from .analytics import menu_analytics
+from .assignments import (
+    auto_assign,
+    bulk_assign,
+    bulk_unassign,
+    toggle_assignment,
+)
+from .counters import read_counters
+from .exports import WRITERS, iter_dishes
+from .ingredient_index import filter_dishes
+from .metrics import internal_ip, render_metrics
 from .models import Cook, Dish, DishType, Ingredient
+from .pagination import InvalidCursor, KeysetPaginationMixin, KeysetPaginator
+from .search import search_dishes
+from .versioning import fragment_stats
+from .visits import visit_buffer
 from .forms import (
+    AutoAssignmentForm,
+    BulkAssignmentForm,
     CookCreationForm,
     CookExperienceUpdateForm,
     DishForm,
@@ -17,31 +47,53 @@ from .forms import (
     IngredientSearchForm,
 )
 
+# Dish types, most dishes first, in the dashboard price table.
+DASHBOARD_DISH_TYPES = 8
+
 
 @login_required
 def index(request):
     """View function for the home page of the site."""
 
-    num_cooks = Cook.objects.count()
-    num_dishes = Dish.objects.count()
-    num_dish_types = DishType.objects.count()
-    num_ingredients = Ingredient.objects.count()
+    counters = read_counters()
 
-    num_visits = request.session.get("num_visits", 0)
-    request.session["num_visits"] = num_visits + 1
+    num_visits = request.user.visit_count + visit_buffer.record(
+        request.user.pk
+    )
 
     context = {
-        "num_cooks": num_cooks,
-        "num_dishes": num_dishes,
-        "num_dish_types": num_dish_types,
-        "num_ingredients": num_ingredients,
-        "num_visits": num_visits + 1,
+        "num_cooks": counters["cooks"],
+        "num_dishes": counters["dishes"],
+        "num_dish_types": counters["dish_types"],
+        "num_ingredients": counters["ingredients"],
+        "num_visits": num_visits,
+        "menu_analytics": menu_analytics(limit=DASHBOARD_DISH_TYPES),
     }
 
     return render(request, "kitchen/index.html", context=context)
 
 
-class DishTypeListView(LoginRequiredMixin, generic.ListView):
+@staff_member_required
+def fragment_cache_stats(request):
+    """Hit and miss counts per cached template fragment in this process."""
+    return JsonResponse(fragment_stats())
+
+
+def metrics(request):
+    """
+    Per-view request histograms of this process in the Prometheus text
+    format, for scrapers on an internal IP and for staff.
+    """
+    if not (internal_ip(request) or request.user.is_staff):
+        raise PermissionDenied
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4"
+    )
+
+
+class DishTypeListView(
+    LoginRequiredMixin, KeysetPaginationMixin, generic.ListView
+):
     model = DishType
     context_object_name = "dish_type_list"
     template_name = "kitchen/dish_type_list.html"
@@ -58,7 +110,7 @@ class DishTypeListView(LoginRequiredMixin, generic.ListView):
         queryset = super().get_queryset()
         dish_type_name = self.request.GET.get("name")
         if dish_type_name:
-            return queryset.filter(name__icontains=dish_type_name)
+            return queryset.filter(name__trigram_contains=dish_type_name)
         return queryset
 
 
@@ -79,7 +131,9 @@ class DishTypeDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("kitchen:dish-type-list")
 
 
-class IngredientListView(LoginRequiredMixin, generic.ListView):
+class IngredientListView(
+    LoginRequiredMixin, KeysetPaginationMixin, generic.ListView
+):
     model = Ingredient
     context_object_name = "ingredient_list"
     template_name = "kitchen/ingredient_list.html"
@@ -96,7 +150,7 @@ class IngredientListView(LoginRequiredMixin, generic.ListView):
         queryset = super().get_queryset()
         ingredient_name = self.request.GET.get("name")
         if ingredient_name:
-            return queryset.filter(name__icontains=ingredient_name)
+            return queryset.filter(name__trigram_contains=ingredient_name)
         return queryset
 
 
@@ -117,31 +171,99 @@ class IngredientDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("kitchen:ingredient-list")
 
 
-class DishListView(LoginRequiredMixin, generic.ListView):
+# ?sort= values for the lists, each served by an index on the stored count.
+DISH_SORTS = {
+    "cooks": ("-cook_count",),
+    "ingredients": ("-ingredient_count",),
+}
+COOK_SORTS = {"dishes": ("-dish_count",)}
+
+
+def ingredient_ids(request, name):
+    """The ingredient ids given as repeated ``name`` query parameters."""
+    return sorted(
+        {int(pk) for pk in request.GET.getlist(name) if pk.isdigit()}
+    )
+
+
+class DishListView(
+    LoginRequiredMixin, KeysetPaginationMixin, generic.ListView
+):
     model = Dish
     paginate_by = 5
 
     def get_context_data(self, **kwargs):
         context = super(DishListView, self).get_context_data(**kwargs)
+        # A keyset page doesn't know the total; the maintained counter does.
+        context["total_dishes"] = read_counters()["dishes"]
         dish_name = self.request.GET.get("name", "")
-        context["search_form"] = DishSearchForm(initial={"name": dish_name})
+        query = self.request.GET.get("q", "")
+        context["search_form"] = DishSearchForm(
+            initial={
+                "name": dish_name,
+                "q": query,
+                "with_ingredients": ingredient_ids(
+                    self.request, "with_ingredients"
+                ),
+                "without_ingredients": ingredient_ids(
+                    self.request, "without_ingredients"
+                ),
+            }
+        )
         return context
 
+    def get_ordering(self):
+        if self.request.GET.get("q"):
+            return ("-search_rank",)
+        sort = self.request.GET.get("sort")
+        if sort in DISH_SORTS:
+            return DISH_SORTS[sort]
+        return super().get_ordering()
+
     def get_queryset(self):
-        queryset = Dish.objects.select_related("dish_type").prefetch_related(
-            "ingredients", "cooks"
+        # The table shows the stored relation counts, not the relations.
+        queryset = Dish.objects.select_related("dish_type")
+        queryset = filter_dishes(
+            queryset,
+            all_of=ingredient_ids(self.request, "with_ingredients"),
+            none_of=ingredient_ids(self.request, "without_ingredients"),
         )
+        query = self.request.GET.get("q")
+        if query:
+            queryset = search_dishes(queryset, query)
         dish_name = self.request.GET.get("name")
         if dish_name:
-            return queryset.filter(name__icontains=dish_name)
+            return queryset.filter(name__trigram_contains=dish_name)
         return queryset
 
 
+@login_required
+def export_menu(request):
+    """Stream every dish as CSV or JSON Lines without buffering the menu."""
+    fmt = request.GET.get("format", "csv")
+    if fmt not in WRITERS:
+        raise Http404("Unknown export format.")
+    writer, content_type = WRITERS[fmt]
+    response = StreamingHttpResponse(
+        writer(iter_dishes()), content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="menu.{fmt}"'
+    return response
+
+
 class DishDetailView(LoginRequiredMixin, generic.DetailView):
     model = Dish
-    queryset = Dish.objects.select_related("dish_type").prefetch_related(
-        "ingredients", "cooks"
-    )
+    queryset = Dish.objects.select_related("dish_type")
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Left lazy: only a fragment cache miss fetches them.
+        context["cooks"] = self.object.cooks.all()
+        context["ingredients"] = self.object.ingredients.all()
+        context["is_cooking"] = self.object.cooks.filter(
+            pk=self.request.user.pk
+        ).exists()
+        return context
 
 
 class DishCreateView(LoginRequiredMixin, generic.CreateView):
@@ -161,30 +283,43 @@ class DishDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("kitchen:dish-list")
 
 
-class CookListView(LoginRequiredMixin, generic.ListView):
+class CookListView(
+    LoginRequiredMixin, KeysetPaginationMixin, generic.ListView
+):
     model = Cook
     paginate_by = 5
 
     def get_context_data(self, **kwargs):
         context = super(CookListView, self).get_context_data(**kwargs)
+        context["total_cooks"] = read_counters()["cooks"]
         username = self.request.GET.get("username", "")
         context["username"] = username
         context["search_form"] = CookSearchForm(initial={"username": username})
         return context
 
+    def get_ordering(self):
+        sort = self.request.GET.get("sort")
+        if sort in COOK_SORTS:
+            return COOK_SORTS[sort]
+        return super().get_ordering()
+
     def get_queryset(self):
         queryset = super().get_queryset()
         username = self.request.GET.get("username")
         if username:
-            return queryset.filter(username__icontains=username)
+            return queryset.filter(username__trigram_contains=username)
         return queryset
 
 
 class CookDetailView(LoginRequiredMixin, generic.DetailView):
     model = Cook
-    queryset = Cook.objects.all().prefetch_related(
-        "dishes__dish_type", "dishes__ingredients"
-    )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Left lazy like the dish detail's related rows. The template shows
+        # each dish's stored ingredient count, so no ingredients are needed.
+        context["dishes"] = self.object.dishes.select_related("dish_type")
+        return context
 
 
 class CookCreateView(LoginRequiredMixin, generic.CreateView):
@@ -204,16 +339,110 @@ class CookDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("kitchen:cook-list")
 
 
+class AutocompleteView(LoginRequiredMixin, generic.View):
+    """
+    JSON endpoint for autocomplete widgets: a small page of objects whose
+    search field starts with ``term``, keyset-paginated by ``cursor``.
+    """
+
+    model = None
+    search_field = "name"
+    only_fields = ("name",)
+    page_size = 10
+
+    def get(self, request, *args, **kwargs):
+        queryset = self.model.objects.only(*self.only_fields)
+        term = request.GET.get("term", "").strip()
+        if term:
+            queryset = queryset.filter(
+                **{f"{self.search_field}__trigram_startswith": term}
+            )
+        paginator = KeysetPaginator(
+            queryset, self.page_size, (self.search_field, "pk")
+        )
+        try:
+            page = paginator.page(request.GET.get("cursor"))
+        except InvalidCursor:
+            raise Http404("Invalid cursor.")
+        return JsonResponse(
+            {
+                "results": [
+                    {"id": obj.pk, "text": str(obj)} for obj in page
+                ],
+                "next": page.next_cursor,
+            }
+        )
+
+
+class CookAutocompleteView(AutocompleteView):
+    model = Cook
+    search_field = "username"
+    only_fields = ("username", "first_name", "last_name")
+
+
+class IngredientAutocompleteView(AutocompleteView):
+    model = Ingredient
+
+
 @login_required
 def toggle_assign_to_dish(request, pk):
-    cook = Cook.objects.get(id=request.user.id)
-    dish = get_object_or_404(Dish, id=pk)
+    dish = get_object_or_404(Dish.objects.only("name"), id=pk)
 
-    if dish in cook.dishes.all():
-        cook.dishes.remove(dish)
-        messages.success(request, f"You are no longer cooking '{dish.name}'")
-    else:
-        cook.dishes.add(dish)
+    if toggle_assignment(request.user.id, dish.id):
         messages.success(request, f"You are now cooking '{dish.name}'")
+    else:
+        messages.success(request, f"You are no longer cooking '{dish.name}'")
 
     return HttpResponseRedirect(reverse_lazy("kitchen:dish-detail", args=[pk]))
+
+
+@staff_member_required
+@require_POST
+def bulk_assign_cooks(request):
+    """Assign or unassign many cooks to many dishes in one transaction."""
+    form = BulkAssignmentForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+
+    cook_ids = [cook.pk for cook in form.cleaned_data["cooks"]]
+    dish_ids = [dish.pk for dish in form.cleaned_data["dishes"]]
+    if form.cleaned_data["action"] == BulkAssignmentForm.ASSIGN:
+        return JsonResponse({"assigned": bulk_assign(cook_ids, dish_ids)})
+    return JsonResponse({"unassigned": bulk_unassign(cook_ids, dish_ids)})
+
+
+@staff_member_required
+@require_POST
+def auto_assign_cooks(request):
+    """
+    Staff the dishes that lack cooks, balancing the load across cooks by
+    experience. With ``dry_run``, return the plan without writing it.
+    """
+    form = AutoAssignmentForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({"errors": form.errors}, status=400)
+
+    data = form.cleaned_data
+    try:
+        pairs = auto_assign(
+            dish_ids=[dish.pk for dish in data["dishes"]] or None,
+            cook_ids=[cook.pk for cook in data["cooks"]] or None,
+            cooks_per_dish=data["cooks_per_dish"],
+            dry_run=data["dry_run"],
+        )
+    except IntegrityError:
+        # Someone linked one of the planned pairs in the meantime.
+        return JsonResponse(
+            {"errors": {"__all__": ["The plan is stale; retry."]}},
+            status=409,
+        )
+    return JsonResponse(
+        {
+            "dry_run": data["dry_run"],
+            "assigned": len(pairs),
+            "dishes": len({dish_id for dish_id, _ in pairs}),
+            "new_dishes_per_cook": Counter(
+                cook_id for _, cook_id in pairs
+            ),
+        }
+    )
@@ -0,0 +1,81 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError
+from django.db.models import Case, F, When
+
+from kitchen.models import Cook
+
+logger = logging.getLogger(__name__)
+
+
+class VisitBuffer:
+    """
+    Collect home page visits in process memory and write them to
+    ``Cook.visit_count`` in one bulk UPDATE once enough visits are pending
+    or the flush interval has passed.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._last_flush = time.monotonic()
+
+    @property
+    def flush_interval(self):
+        return getattr(settings, "VISIT_FLUSH_INTERVAL", 30)
+
+    @property
+    def max_pending(self):
+        return getattr(settings, "VISIT_FLUSH_MAX_PENDING", 100)
+
+    def pending(self, user_id):
+        with self._lock:
+            return self._pending[user_id]
+
+    def record(self, user_id):
+        """
+        Count one visit and return how many of this user's visits are not
+        yet reflected in ``Cook.visit_count``.
+        """
+        with self._lock:
+            self._pending[user_id] += 1
+            pending = self._pending[user_id]
+            due = (
+                sum(self._pending.values()) >= self.max_pending
+                or time.monotonic() - self._last_flush >= self.flush_interval
+            )
+        if due:
+            self.flush()
+        return pending
+
+    def flush(self, using=DEFAULT_DB_ALIAS):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._last_flush = time.monotonic()
+        if not pending:
+            return 0
+        try:
+            Cook.objects.using(using).filter(pk__in=pending).update(
+                visit_count=Case(
+                    *(
+                        When(pk=user_id, then=F("visit_count") + visits)
+                        for user_id, visits in pending.items()
+                    ),
+                    default=F("visit_count"),
+                )
+            )
+        except DatabaseError:
+            logger.exception("Could not flush %d visits", len(pending))
+            with self._lock:
+                self._pending.update(pending)
+            return 0
+        return sum(pending.values())
+
+
+visit_buffer = VisitBuffer()
+atexit.register(visit_buffer.flush)
@@ -11,6 +11,8 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "restaurant_mate.settings")
+os.environ.setdefault(
+    "DJANGO_SETTINGS_MODULE", "restaurant_mate.settings.asgi"
+)
 
 application = get_asgi_application()
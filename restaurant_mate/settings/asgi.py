@@ -0,0 +1,14 @@
+from .prod import *
+
+# Production settings for running under an ASGI server, e.g.
+# gunicorn restaurant_mate.asgi:application -k uvicorn.workers.UvicornWorker
+
+ASGI_APPLICATION = "restaurant_mate.asgi.application"
+
+KITCHEN_ASYNC_VIEWS = True
+
+# Persistent connections are tied to the thread that opened them, and
+# async ORM calls run in short-lived executor threads, so close them at
+# the end of each request instead of leaking one per thread.
+for database in DATABASES.values():
+    database["CONN_MAX_AGE"] = 0
@@ -35,7 +35,6 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
-    "debug_toolbar",
     "kitchen",
     "crispy_forms",
     "crispy_bootstrap4",
@@ -44,7 +43,8 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
-    "debug_toolbar.middleware.DebugToolbarMiddleware",
+    "kitchen.middleware.request_timing_middleware",
+    "kitchen.middleware.replica_pin_middleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -57,7 +57,8 @@ ROOT_URLCONF = "restaurant_mate.urls"
 
 TEMPLATES = [
     {
-        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "BACKEND": "kitchen.timing.TimedTemplates",
+        "NAME": "django",
         "DIRS": [BASE_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
@@ -73,6 +74,22 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "restaurant_mate.wsgi.application"
 
+DATABASE_ROUTERS = ["kitchen.routers.ReplicaRouter"]
+
+# Database aliases that serve kitchen model reads, and how many seconds a
+# client's reads stay on the primary after it writes.
+KITCHEN_READ_REPLICAS = []
+KITCHEN_REPLICA_PIN_SECONDS = 10
+
+# Send each response's total, database and template time back as a
+# Server-Timing header. Like kitchen:metrics, only clients on INTERNAL_IPS
+# and staff get it.
+KITCHEN_SERVER_TIMING = True
+
+# Warn when one request runs the same query shape this many times, which
+# usually means an N+1 query. None turns the check off.
+KITCHEN_REPEATED_QUERY_THRESHOLD = None
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -122,6 +139,13 @@ STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
 
+# Collect only the files templates reference (see kitchen.assets); lookups
+# by name still see the whole tree.
+STATICFILES_FINDERS = [
+    "kitchen.assets.ReferencedAssetsFinder",
+    "django.contrib.staticfiles.finders.AppDirectoriesFinder",
+]
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -139,3 +163,11 @@ INTERNAL_IPS = [
 ]
 
 CRISPY_TEMPLATE_PACK = "bootstrap4"
+
+# Seconds a versioned template fragment stays cached. Fragments are also
+# retired as soon as a model they depend on changes.
+FRAGMENT_CACHE_TIMEOUT = 600
+
+# Serve the native async list, detail and toggle views. Only worth it
+# under an ASGI server; see settings/asgi.py.
+KITCHEN_ASYNC_VIEWS = False
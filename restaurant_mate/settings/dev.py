@@ -6,6 +6,20 @@ DEBUG = os.environ.get("DJANGO_DEBUG", "") != "False"
 ALLOWED_HOSTS = ["127.0.0.1"]
 
 
+# Application definition
+# Debug tooling is only installed in development.
+
+INSTALLED_APPS = [*INSTALLED_APPS, "debug_toolbar"]
+
+MIDDLEWARE = [*MIDDLEWARE]
+MIDDLEWARE.insert(
+    MIDDLEWARE.index("kitchen.middleware.replica_pin_middleware") + 1,
+    "debug_toolbar.middleware.DebugToolbarMiddleware",
+)
+
+KITCHEN_REPEATED_QUERY_THRESHOLD = 5
+
+
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
@@ -13,5 +27,15 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
-    }
+    },
+    # Stands in for a read replica. Nothing copies data into it: seed it
+    # with `cp db.sqlite3 db.replica.sqlite3`, then run with
+    # DJANGO_READ_REPLICA=True to send kitchen reads to it.
+    "replica": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.replica.sqlite3",
+    },
 }
+
+if os.environ.get("DJANGO_READ_REPLICA", "") == "True":
+    KITCHEN_READ_REPLICAS = ["replica"]
@@ -27,3 +27,47 @@ DATABASES = {
         "PORT": int(os.environ["POSTGRES_DB_PORT"]),
     }
 }
+
+# Read replicas share the primary's credentials, e.g.
+# POSTGRES_REPLICA_HOSTS=replica-1:5432,replica-2
+for index, address in enumerate(
+    filter(None, os.environ.get("POSTGRES_REPLICA_HOSTS", "").split(",")), 1
+):
+    host, _, port = address.strip().partition(":")
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": int(port) if port else DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+KITCHEN_READ_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+
+
+# Cache
+# Fragment versions must be shared by every worker process. Redis keeps
+# the fragment lookups off the database the cached fragments spare.
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
+}
+
+
+# Static files
+# collectstatic writes content-hashed names with gzip and Brotli siblings;
+# WhiteNoise serves names carrying a 12 character hash, including the
+# image variants written by optimize_images, as immutable for ten years.
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
+WHITENOISE_IMMUTABLE_FILE_TEST = r"\.[0-9a-f]{12}\.\w+$"
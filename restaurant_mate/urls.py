@@ -10,5 +10,7 @@ urlpatterns = [
     path("kitchen/", include("kitchen.urls", namespace="kitchen")),
     path("", RedirectView.as_view(pattern_name='kitchen:index')),
     path("accounts/", include("django.contrib.auth.urls")),
-    path("__debug__/", include("debug_toolbar.urls")),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
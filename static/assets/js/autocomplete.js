@@ -0,0 +1,81 @@
+// Remote autocomplete for <select multiple data-autocomplete-url="...">.
+// Only the selected options are rendered by the server; everything else
+// is fetched a page at a time from the JSON endpoint as the user types,
+// and the next page is requested when the dropdown is scrolled to the end.
+(function () {
+  "use strict";
+
+  function debounce(fn, wait) {
+    var timer;
+    return function () {
+      var args = arguments;
+      clearTimeout(timer);
+      timer = setTimeout(function () { fn.apply(null, args); }, wait);
+    };
+  }
+
+  function fetchPage(url, term, cursor) {
+    var query = new URLSearchParams({ term: term });
+    if (cursor) {
+      query.set("cursor", cursor);
+    }
+    return fetch(url + "?" + query.toString(), {
+      credentials: "same-origin",
+      headers: { Accept: "application/json" },
+    }).then(function (response) {
+      return response.ok ? response.json() : { results: [], next: null };
+    });
+  }
+
+  document.querySelectorAll("select[data-autocomplete-url]").forEach(function (select) {
+    var url = select.dataset.autocompleteUrl;
+    var choices = new Choices(select, {
+      removeItemButton: true,
+      shouldSort: false,
+      // The server pages the results; show every page that was loaded.
+      searchResultLimit: -1,
+      searchFloor: 1,
+      placeholderValue: "Type to search",
+    });
+
+    var term = "";
+    var next = null;
+    var loading = false;
+
+    function show(append) {
+      var cursor = append ? next : null;
+      loading = true;
+      return fetchPage(url, term, cursor).then(function (data) {
+        // Drop the answer to a search the user has already replaced.
+        if (append && cursor !== next) {
+          return;
+        }
+        next = data.next;
+        choices.setChoices(data.results, "id", "text", !append);
+      }).finally(function () {
+        loading = false;
+      });
+    }
+
+    var load = debounce(function (value) {
+      term = value;
+      next = null;
+      show(false);
+    }, 200);
+
+    select.addEventListener("search", function (event) {
+      load(event.detail.value);
+    });
+    select.addEventListener("showDropdown", function () {
+      load("");
+    });
+
+    var list = choices.dropdown.element.querySelector(".choices__list");
+    list.addEventListener("scroll", function () {
+      var atEnd = list.scrollTop + list.clientHeight >= list.scrollHeight - 20;
+      if (atEnd && next && !loading) {
+        show(true);
+      }
+    });
+  });
+})();